@@ -0,0 +1,298 @@
+"""
+Motores de almacenamiento para VetCare v3.
+
+funciones_persistencia.cargar_datos / guardar_datos delegan en uno de estos
+motores, que comparten la misma interfaz:
+
+    cargar()                  -> (citas, historial)
+    guardar(citas, historial) -> escribe el estado completo
+    anotar_alta(cita)         -> avisa que se agregó una cita (opcional)
+    anotar_baja(id, fecha, horario, en_historial=True)
+                              -> avisa que se quitó una cita (opcional)
+
+- AlmacenamientoJSON: el formato original (citas.json + historial.json).
+  Cada guardado reescribe ambos archivos completos; se escribe primero a un
+  archivo temporal y luego se reemplaza, para no dejar un JSON a medias.
+- AlmacenamientoSQLite: una base SQLite (vetcare.db). Solo escribe las
+  filas que cambiaron y cada guardado es una transacción: si el programa se
+  cae a mitad de camino, queda el estado anterior completo.
+"""
+import json
+import os
+import sqlite3
+
+
+def clave_cita(cita):
+    """Identifica una cita: una mascota en una fecha y horario."""
+    return (cita['id'], cita['fecha'], cita['horario'])
+
+
+class AlmacenamientoJSON:
+    """Guarda todo en dos archivos JSON (comportamiento original de v3)."""
+
+    nombre = 'json'
+
+    def __init__(self, data_dir):
+        self.data_dir = data_dir
+        self.archivo_citas = os.path.join(data_dir, "citas.json")
+        self.archivo_historial = os.path.join(data_dir, "historial.json")
+
+    @property
+    def archivos(self):
+        return [self.archivo_citas, self.archivo_historial]
+
+    def _leer(self, ruta, vacio):
+        if not os.path.exists(ruta):
+            return vacio
+        try:
+            with open(ruta, 'r', encoding='utf-8') as archivo:
+                return json.load(archivo)
+        except (json.JSONDecodeError, FileNotFoundError):
+            print(f"Error al leer {os.path.basename(ruta)}, se inicia vacío")
+            return vacio
+
+    def _escribir(self, ruta, datos):
+        temporal = ruta + '.tmp'
+        with open(temporal, 'w', encoding='utf-8') as archivo:
+            json.dump(datos, archivo, indent=2, ensure_ascii=False)
+            archivo.flush()
+            os.fsync(archivo.fileno())
+        os.replace(temporal, ruta)
+
+    def cargar(self):
+        return self._leer(self.archivo_citas, []), self._leer(self.archivo_historial, {})
+
+    def guardar(self, citas, historial):
+        self._escribir(self.archivo_citas, citas)
+        self._escribir(self.archivo_historial, historial)
+
+    def anotar_alta(self, cita):
+        pass
+
+    def anotar_baja(self, id_mascota, fecha, horario, en_historial=True):
+        pass
+
+
+class AlmacenamientoSQLite:
+    """
+    Guarda citas e historial en SQLite con escrituras incrementales.
+
+    registrar_cita y cancelar_cita anotan sus cambios con anotar_alta /
+    anotar_baja; guardar() aplica solo esos cambios. Si la lista se modificó
+    por otro camino (por ejemplo limpiar_citas_pasadas), guardar() compara
+    contra lo que hay en la base y escribe solo las diferencias.
+    """
+
+    nombre = 'sqlite'
+
+    # PRAGMA user_version de la base: 0 = recién creada, los JSON aún no se importaron
+    VERSION_IMPORTADA = 1
+
+    ESQUEMA = """
+        CREATE TABLE IF NOT EXISTS citas (
+            posicion INTEGER PRIMARY KEY AUTOINCREMENT,
+            id TEXT NOT NULL,
+            fecha TEXT NOT NULL,
+            horario TEXT NOT NULL,
+            datos TEXT NOT NULL,
+            UNIQUE (id, fecha, horario)
+        );
+        CREATE TABLE IF NOT EXISTS historial (
+            posicion INTEGER PRIMARY KEY AUTOINCREMENT,
+            id TEXT NOT NULL,
+            fecha TEXT NOT NULL,
+            horario TEXT NOT NULL,
+            datos TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS historial_clave ON historial (id, fecha, horario);
+    """
+
+    def __init__(self, data_dir, nombre_archivo="vetcare.db"):
+        self.data_dir = data_dir
+        self.archivo = os.path.join(data_dir, nombre_archivo)
+        self.conexion = sqlite3.connect(self.archivo)
+        self.conexion.execute("PRAGMA journal_mode=WAL")
+        self.conexion.executescript(self.ESQUEMA)
+        # Claves guardadas en la base y cambios aún no escritos
+        self._citas_guardadas = None
+        self._historial_guardado = None
+        self._altas = []
+        self._bajas = []
+
+    @property
+    def archivos(self):
+        return [self.archivo]
+
+    def _version(self):
+        return self.conexion.execute("PRAGMA user_version").fetchone()[0]
+
+    def _importar_json(self):
+        """
+        Copia una sola vez los datos de los JSON de versiones anteriores. Que la
+        base quede vacía después (por ejemplo al cancelar todas las citas) no
+        vuelve a importarlos: lo que decide es la marca, no si hay filas.
+        """
+        vacia = self.conexion.execute(
+            "SELECT NOT EXISTS (SELECT 1 FROM citas) AND NOT EXISTS (SELECT 1 FROM historial)"
+        ).fetchone()[0]
+        citas, historial = AlmacenamientoJSON(self.data_dir).cargar() if vacia else ([], {})
+        if citas or historial:
+            print("Importando datos existentes desde los archivos JSON...")
+            self._escribir_todo(citas, historial)
+        else:
+            # Base con datos de antes de la marca, o sin JSON que importar
+            with self.conexion:
+                self.conexion.execute(f"PRAGMA user_version = {self.VERSION_IMPORTADA}")
+
+    def _escribir_todo(self, citas, historial):
+        """Reemplaza todo el contenido y deja la marca de importación en la misma transacción."""
+        with self.conexion:
+            self.conexion.execute("DELETE FROM citas")
+            self.conexion.execute("DELETE FROM historial")
+            self.conexion.execute(f"PRAGMA user_version = {self.VERSION_IMPORTADA}")
+            self.conexion.executemany(
+                "INSERT OR REPLACE INTO citas (id, fecha, horario, datos) VALUES (?, ?, ?, ?)",
+                (clave_cita(c) + (json.dumps(c, ensure_ascii=False),) for c in citas)
+            )
+            self.conexion.executemany(
+                "INSERT INTO historial (id, fecha, horario, datos) VALUES (?, ?, ?, ?)",
+                ((id_mascota, c['fecha'], c['horario'], json.dumps(c, ensure_ascii=False))
+                 for id_mascota, citas_mascota in historial.items() for c in citas_mascota)
+            )
+
+    def cargar(self):
+        if self._version() < self.VERSION_IMPORTADA:
+            self._importar_json()
+
+        citas = [json.loads(datos) for (datos,) in
+                 self.conexion.execute("SELECT datos FROM citas ORDER BY posicion")]
+        historial = {}
+        for id_mascota, datos in self.conexion.execute(
+                "SELECT id, datos FROM historial ORDER BY posicion"):
+            historial.setdefault(id_mascota, []).append(json.loads(datos))
+
+        self._citas_guardadas = {clave_cita(c) for c in citas}
+        self._historial_guardado = {
+            (id_mascota, c['fecha'], c['horario'])
+            for id_mascota, citas_mascota in historial.items() for c in citas_mascota
+        }
+        self._altas, self._bajas = [], []
+        return citas, historial
+
+    def anotar_alta(self, cita):
+        self._altas.append(cita)
+
+    def anotar_baja(self, id_mascota, fecha, horario, en_historial=True):
+        self._bajas.append(((id_mascota, fecha, horario), en_historial))
+
+    def _cambios_anotados_coinciden(self, citas):
+        """True si las altas/bajas anotadas explican el tamaño actual de la lista."""
+        if self._citas_guardadas is None:
+            return False
+        altas = {clave_cita(c) for c in self._altas}
+        bajas_citas = sum(1 for clave, _ in self._bajas
+                          if clave in self._citas_guardadas or clave in altas)
+        return len(self._citas_guardadas) + len(self._altas) - bajas_citas == len(citas)
+
+    def _aplicar_anotados(self):
+        with self.conexion:
+            for cita in self._altas:
+                self.conexion.execute(
+                    "INSERT OR REPLACE INTO citas (id, fecha, horario, datos) VALUES (?, ?, ?, ?)",
+                    clave_cita(cita) + (json.dumps(cita, ensure_ascii=False),)
+                )
+                self.conexion.execute(
+                    "INSERT INTO historial (id, fecha, horario, datos) VALUES (?, ?, ?, ?)",
+                    clave_cita(cita) + (json.dumps(cita, ensure_ascii=False),)
+                )
+                self._citas_guardadas.add(clave_cita(cita))
+                self._historial_guardado.add(clave_cita(cita))
+            for clave, en_historial in self._bajas:
+                self.conexion.execute(
+                    "DELETE FROM citas WHERE id = ? AND fecha = ? AND horario = ?", clave
+                )
+                self._citas_guardadas.discard(clave)
+                if en_historial:
+                    self.conexion.execute(
+                        "DELETE FROM historial WHERE posicion = (SELECT MIN(posicion) FROM historial "
+                        "WHERE id = ? AND fecha = ? AND horario = ?)", clave
+                    )
+                    self._historial_guardado.discard(clave)
+
+    def _aplicar_diferencias(self, citas, historial):
+        """Compara el estado en memoria con el guardado y escribe solo lo distinto."""
+        actuales = {clave_cita(c): c for c in citas}
+        en_historial = {
+            (id_mascota, c['fecha'], c['horario']): c
+            for id_mascota, citas_mascota in historial.items() for c in citas_mascota
+        }
+        if self._citas_guardadas is None:
+            self._citas_guardadas = {
+                fila for fila in self.conexion.execute("SELECT id, fecha, horario FROM citas")
+            }
+            self._historial_guardado = {
+                fila for fila in self.conexion.execute("SELECT id, fecha, horario FROM historial")
+            }
+
+        with self.conexion:
+            self.conexion.executemany(
+                "DELETE FROM citas WHERE id = ? AND fecha = ? AND horario = ?",
+                self._citas_guardadas - actuales.keys()
+            )
+            self.conexion.executemany(
+                "INSERT OR REPLACE INTO citas (id, fecha, horario, datos) VALUES (?, ?, ?, ?)",
+                (clave + (json.dumps(actuales[clave], ensure_ascii=False),)
+                 for clave in actuales.keys() - self._citas_guardadas)
+            )
+            self.conexion.executemany(
+                "DELETE FROM historial WHERE id = ? AND fecha = ? AND horario = ?",
+                self._historial_guardado - en_historial.keys()
+            )
+            self.conexion.executemany(
+                "INSERT INTO historial (id, fecha, horario, datos) VALUES (?, ?, ?, ?)",
+                (clave + (json.dumps(en_historial[clave], ensure_ascii=False),)
+                 for clave in en_historial.keys() - self._historial_guardado)
+            )
+
+        self._citas_guardadas = set(actuales)
+        self._historial_guardado = set(en_historial)
+
+    def guardar(self, citas, historial):
+        if (self._altas or self._bajas) and self._cambios_anotados_coinciden(citas):
+            self._aplicar_anotados()
+        else:
+            self._aplicar_diferencias(citas, historial)
+        self._altas, self._bajas = [], []
+
+    def respaldar(self, destino):
+        """Copia consistente de la base (API de backup de SQLite)."""
+        copia = sqlite3.connect(destino)
+        with copia:
+            self.conexion.backup(copia)
+        copia.close()
+
+    def restaurar_desde(self, origen):
+        """Reemplaza el contenido de la base por el de `origen` sin cerrar la conexión."""
+        copia = sqlite3.connect(origen)
+        copia.backup(self.conexion)
+        copia.close()
+        self._citas_guardadas = None
+        self._historial_guardado = None
+        self._altas, self._bajas = [], []
+
+
+MOTORES = {
+    'json': AlmacenamientoJSON,
+    'sqlite': AlmacenamientoSQLite,
+}
+
+
+def crear_almacenamiento(data_dir, nombre=None):
+    """
+    Crea el motor indicado por `nombre` o por la variable de entorno
+    VETCARE_ALMACENAMIENTO ('sqlite' por defecto).
+    """
+    nombre = nombre or os.environ.get('VETCARE_ALMACENAMIENTO', 'sqlite')
+    if nombre not in MOTORES:
+        raise ValueError(f"Motor de almacenamiento desconocido: {nombre}. Use uno de: {', '.join(MOTORES)}")
+    return MOTORES[nombre](data_dir)
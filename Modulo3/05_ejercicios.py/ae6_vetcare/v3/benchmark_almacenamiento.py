@@ -0,0 +1,108 @@
+"""
+Benchmark de los motores de almacenamiento de VetCare v3.
+
+Genera N citas sintéticas y mide, para cada motor, el tiempo de guardar
+después de registrar una cita y después de cancelar otra (que es lo que
+hace el menú en cada operación), además del tiempo de carga inicial.
+
+Uso:
+    python benchmark_almacenamiento.py            # 100.000 citas
+    python benchmark_almacenamiento.py 300000 20  # citas, repeticiones
+"""
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from almacenamiento import MOTORES, clave_cita
+
+HORARIOS = ["09:00", "10:00", "11:00", "12:00", "14:00", "15:00", "16:00", "17:00"]
+MOTIVOS = ["urgencia", "consulta", "control", "vacunacion", "cirugia"]
+
+
+def generar_citas(cantidad, inicio=0):
+    """Citas futuras, una por horario, repartidas en días consecutivos."""
+    manana = datetime.now() + timedelta(days=1)
+    citas = []
+    for n in range(inicio, inicio + cantidad):
+        dia, horario = divmod(n, len(HORARIOS))
+        id_mascota = f"M{n % (cantidad // 3 + 1):06d}"
+        citas.append({
+            "id": id_mascota,
+            "nombre_mascota": f"Mascota {id_mascota}",
+            "fecha": (manana + timedelta(days=dia)).strftime('%d/%m/%y'),
+            "motivo": random.choice(MOTIVOS),
+            "tutor": f"Tutor {n % 997}",
+            "horario": HORARIOS[horario],
+            "fecha_registro": datetime.now().strftime('%d/%m/%y %H:%M:%S')
+        })
+    return citas
+
+
+def armar_historial(citas):
+    historial = {}
+    for cita in citas:
+        historial.setdefault(cita['id'], []).append(cita)
+    return historial
+
+
+def mediana_ms(tiempos):
+    tiempos = sorted(tiempos)
+    return tiempos[len(tiempos) // 2] * 1000
+
+
+def medir(nombre, cantidad, repeticiones):
+    with tempfile.TemporaryDirectory() as data_dir:
+        motor = MOTORES[nombre](data_dir)
+        citas = generar_citas(cantidad)
+        historial = armar_historial(citas)
+
+        inicio = time.perf_counter()
+        motor.guardar(citas, historial)
+        inicial = time.perf_counter() - inicio
+
+        motor = MOTORES[nombre](data_dir)
+        inicio = time.perf_counter()
+        citas, historial = motor.cargar()
+        carga = time.perf_counter() - inicio
+
+        nuevas = generar_citas(repeticiones, inicio=cantidad)
+        registro, cancelacion = [], []
+        for cita in nuevas:
+            # Igual que registrar_cita
+            citas.append(cita)
+            historial.setdefault(cita['id'], []).append(cita)
+            motor.anotar_alta(cita)
+            inicio = time.perf_counter()
+            motor.guardar(citas, historial)
+            registro.append(time.perf_counter() - inicio)
+
+            # Igual que cancelar_cita
+            cancelada = citas.pop()
+            historial[cancelada['id']].remove(cancelada)
+            motor.anotar_baja(*clave_cita(cancelada))
+            inicio = time.perf_counter()
+            motor.guardar(citas, historial)
+            cancelacion.append(time.perf_counter() - inicio)
+
+        if hasattr(motor, 'conexion'):
+            motor.conexion.close()
+
+    print(f"{nombre:>7} | guardado inicial: {inicial * 1000:9.1f} ms | carga: {carga * 1000:8.1f} ms | "
+          f"registrar+guardar: {mediana_ms(registro):8.2f} ms | "
+          f"cancelar+guardar: {mediana_ms(cancelacion):8.2f} ms")
+
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    repeticiones = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    random.seed(7)
+
+    print(f"Benchmark de almacenamiento VetCare: {cantidad} citas, {repeticiones} repeticiones")
+    print("-" * 110)
+    for nombre in MOTORES:
+        medir(nombre, cantidad, repeticiones)
+
+
+if __name__ == "__main__":
+    main()
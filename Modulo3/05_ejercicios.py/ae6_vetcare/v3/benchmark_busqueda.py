@@ -0,0 +1,105 @@
+"""
+Benchmark de búsqueda de mascotas en VetCare v3.
+
+Compara la búsqueda anterior (recorrer todo el historial) con el índice
+de textos normalizados por nombre y tutor, y el listado de mascotas que antes leía
+todas las fechas de cada historial.
+
+Uso:
+    python benchmark_busqueda.py             # 100.000 mascotas
+    python benchmark_busqueda.py 200000 200  # mascotas, búsquedas
+"""
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+# El benchmark no debe crear la base SQLite en data/
+os.environ.setdefault('VETCARE_ALMACENAMIENTO', 'json')
+
+from funciones_persistencia import buscar_mascota_por_nombre, buscar_mascota_por_tutor, indice_mascotas
+
+NOMBRES = ["Firulais", "Garu", "Luna", "Toby", "Rocky", "Nala", "Simba", "Kira", "Max", "Coco",
+           "Bruno", "Mía", "Lola", "Thor", "Canela", "Pelusa", "Chispa", "Manchas", "Oreo", "Zeus"]
+APELLIDOS = ["Pérez", "González", "Muñoz", "Rojas", "Díaz", "Soto", "Contreras", "Silva",
+             "Martínez", "Sepúlveda", "Morales", "Rodríguez", "López", "Fuentes", "Torres"]
+
+
+def generar_historial(mascotas, citas_por_mascota=3):
+    hoy = datetime.now()
+    historial = {}
+    for n in range(mascotas):
+        id_mascota = f"{n:06d}"
+        nombre = f"{random.choice(NOMBRES)} {n}"
+        tutor = f"{random.choice(NOMBRES)} {random.choice(APELLIDOS)}"
+        historial[id_mascota] = [
+            {"id": id_mascota, "nombre_mascota": nombre, "tutor": tutor, "motivo": "control",
+             "fecha": (hoy - timedelta(days=random.randint(0, 3000))).strftime('%d/%m/%y'),
+             "horario": "10:00"}
+            for _ in range(citas_por_mascota)
+        ]
+    return historial
+
+
+def buscar_lineal(historial, campo, texto):
+    """Versión anterior de buscar_mascota_por_nombre / buscar_mascota_por_tutor"""
+    texto = texto.lower().strip()
+    return [
+        {'id': id_mascota, 'nombre': citas[0]['nombre_mascota'], 'tutor': citas[0]['tutor'],
+         'total_citas': len(citas)}
+        for id_mascota, citas in historial.items()
+        if citas and texto in citas[0][campo].lower()
+    ]
+
+
+def listar_lineal(historial):
+    """Versión anterior de mostrar_todas_las_mascotas (sin imprimir)"""
+    info = []
+    for id_mascota, citas in historial.items():
+        fechas = [datetime.strptime(cita['fecha'], '%d/%m/%y') for cita in citas]
+        info.append({'id': id_mascota, 'nombre': citas[0]['nombre_mascota'],
+                     'ultima_cita': max(fechas).strftime('%d/%m/%y')})
+    return sorted(info, key=lambda x: x['nombre'].lower())
+
+
+def cronometrar(funcion, *args, veces=1):
+    inicio = time.perf_counter()
+    for _ in range(veces):
+        funcion(*args)
+    return (time.perf_counter() - inicio) / veces * 1000
+
+
+def main():
+    mascotas = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    busquedas = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    random.seed(7)
+
+    historial = generar_historial(mascotas)
+    # Partes del nombre, no solo el comienzo: la búsqueda es por contenido
+    terminos = [f"{random.choice(NOMBRES)[2:]} {random.randint(0, mascotas)}" for _ in range(busquedas)]
+    tutores = [random.choice(APELLIDOS)[1:4] for _ in range(busquedas)]
+
+    construccion = cronometrar(indice_mascotas, historial)
+
+    lineal_nombre = sum(cronometrar(buscar_lineal, historial, 'nombre_mascota', t) for t in terminos[:10]) / 10
+    indice_nombre = sum(cronometrar(buscar_mascota_por_nombre, historial, t) for t in terminos) / busquedas
+    lineal_tutor = sum(cronometrar(buscar_lineal, historial, 'tutor', t) for t in tutores[:10]) / 10
+    indice_tutor = sum(cronometrar(buscar_mascota_por_tutor, historial, t) for t in tutores) / busquedas
+
+    listado_lineal = cronometrar(listar_lineal, historial)
+    listado_indice = cronometrar(
+        lambda h: sorted(indice_mascotas(h).resumen.values(), key=lambda x: x['nombre'].lower()), historial
+    )
+
+    print(f"Benchmark de búsqueda VetCare: {mascotas} mascotas")
+    print("-" * 70)
+    print(f"Construcción del índice (una vez al cargar): {construccion:10.1f} ms")
+    print(f"Buscar por nombre  | lineal: {lineal_nombre:9.2f} ms | índice: {indice_nombre:7.3f} ms")
+    print(f"Buscar por tutor   | lineal: {lineal_tutor:9.2f} ms | índice: {indice_tutor:7.3f} ms"
+          f"  (~{mascotas // len(APELLIDOS)} resultados)")
+    print(f"Listar mascotas    | lineal: {listado_lineal:9.2f} ms | índice: {listado_indice:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
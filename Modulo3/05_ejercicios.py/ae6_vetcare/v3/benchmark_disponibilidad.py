@@ -0,0 +1,91 @@
+"""
+Benchmark de consultas de disponibilidad en VetCare v3.
+
+Compara la versión anterior (recorrer todas las citas por cada horario)
+con el índice de horarios ocupados por fecha.
+
+Uso:
+    python benchmark_disponibilidad.py            # 1.000.000 de citas
+    python benchmark_disponibilidad.py 200000 50  # citas, consultas
+"""
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+# El benchmark no debe crear la base SQLite en data/
+os.environ.setdefault('VETCARE_ALMACENAMIENTO', 'json')
+
+from benchmark_almacenamiento import HORARIOS
+from funciones_persistencia import (
+    indice_disponibilidad, mostrar_horarios_disponibles, limpiar_citas_pasadas
+)
+
+
+def verificar_disponibilidad_lineal(citas, fecha, horario):
+    """Versión anterior: recorre todas las citas"""
+    for cita in citas:
+        if cita['fecha'] == fecha and cita['horario'] == horario:
+            return False
+    return True
+
+
+def horarios_disponibles_lineal(citas, fecha, horarios_posibles):
+    """Versión anterior de mostrar_horarios_disponibles (fecha futura)"""
+    return [h for h in horarios_posibles if verificar_disponibilidad_lineal(citas, fecha, h)]
+
+
+def generar_citas(cantidad, dias=365 * 40):
+    """
+    Citas repartidas en los próximos `dias` días. El formato dd/mm/yy no
+    alcanza para 1.000.000 de horarios distintos, así que algunos se repiten:
+    para medir el recorrido eso da igual.
+    """
+    manana = datetime.now().date() + timedelta(days=1)
+    fechas = [(manana + timedelta(days=d)).strftime('%d/%m/%y') for d in range(dias)]
+    return [
+        {"id": f"M{n % 100000:06d}", "fecha": random.choice(fechas),
+         "horario": random.choice(HORARIOS[:6]), "motivo": "control"}
+        for n in range(cantidad)
+    ], fechas
+
+
+def medir(funcion, citas, fechas):
+    inicio = time.perf_counter()
+    for fecha in fechas:
+        funcion(citas, fecha, HORARIOS)
+    return (time.perf_counter() - inicio) / len(fechas) * 1000
+
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    consultas = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    random.seed(7)
+
+    print(f"Generando {cantidad} citas...")
+    # Solo se ocupan 6 de los 8 horarios, para que siempre queden libres
+    citas, todas_las_fechas = generar_citas(cantidad)
+    fechas = random.sample(todas_las_fechas, consultas)
+
+    inicio = time.perf_counter()
+    indice_disponibilidad(citas)
+    construccion = (time.perf_counter() - inicio) * 1000
+
+    lineal = medir(horarios_disponibles_lineal, citas, fechas[:max(1, consultas // 10)])
+    indexado = medir(mostrar_horarios_disponibles, citas, fechas)
+
+    inicio = time.perf_counter()
+    limpiar_citas_pasadas(citas)
+    limpieza = (time.perf_counter() - inicio) * 1000
+
+    print("-" * 70)
+    print(f"Citas activas: {len(citas)}")
+    print(f"Construcción del índice (una vez al cargar): {construccion:10.1f} ms")
+    print(f"Horarios del día, recorrido lineal:          {lineal:10.3f} ms por consulta")
+    print(f"Horarios del día, con índice:                {indexado:10.3f} ms por consulta")
+    print(f"Limpiar citas pasadas (fechas cacheadas):    {limpieza:10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
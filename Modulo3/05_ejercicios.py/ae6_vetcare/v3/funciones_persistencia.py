@@ -1,6 +1,10 @@
-import json
 import os
+import tempfile
 from datetime import datetime
+from functools import lru_cache
+from almacenamiento import crear_almacenamiento
+from indices import IndiceDisponibilidad, IndiceMascotas
+from respaldos import RepositorioRespaldos
 
 # Obtener el directorio donde está este archivo
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -15,60 +19,72 @@ if not os.path.exists(DATA_DIR):
     os.makedirs(DATA_DIR)
     print(f"Directorio de datos creado en: {DATA_DIR}")
 
+# Motor de almacenamiento (SQLite por defecto; VETCARE_ALMACENAMIENTO=json
+# vuelve a los archivos JSON completos)
+ALMACENAMIENTO = crear_almacenamiento(DATA_DIR)
+
+# Respaldos incrementales (trozos comprimidos por contenido) en data/respaldos
+RESPALDOS = RepositorioRespaldos(os.path.join(DATA_DIR, "respaldos"))
+# Retención: últimos 10, uno por día de la última semana y uno por semana del último mes
+RETENCION = {'ultimos': 10, 'diarios': 7, 'semanales': 4}
+
+# Horarios ocupados por fecha; se mantiene al registrar, cancelar y limpiar citas
+INDICE_DISPONIBILIDAD = IndiceDisponibilidad()
+
+def indice_disponibilidad(citas):
+    """Devuelve el índice de disponibilidad de `citas`, reconstruyéndolo si quedó desactualizado"""
+    if not INDICE_DISPONIBILIDAD.vigente_para(citas):
+        INDICE_DISPONIBILIDAD.reconstruir(citas)
+    return INDICE_DISPONIBILIDAD
+
+@lru_cache(maxsize=None)
+def fecha_de_cita(fecha):
+    """Convierte 'dd/mm/yy' a date. Con año de dos dígitos hay pocas fechas distintas, se cachean"""
+    return datetime.strptime(fecha, '%d/%m/%y').date()
+
+# Resumen por mascota (total de citas, última visita) y búsqueda por nombre/tutor
+INDICE_MASCOTAS = IndiceMascotas(fecha_de_cita)
+
+def indice_mascotas(historial):
+    """Devuelve el índice de mascotas de `historial`, reconstruyéndolo si quedó desactualizado"""
+    if not INDICE_MASCOTAS.vigente_para(historial):
+        INDICE_MASCOTAS.reconstruir(historial)
+    return INDICE_MASCOTAS
+
 def cargar_datos():
-    """Carga los datos de citas e historial desde archivos JSON"""
-    citas = []
-    historial = {}
+    """Carga los datos de citas e historial desde el almacenamiento configurado"""
+    print(f"Cargando datos desde la carpeta: {DATA_DIR} (almacenamiento: {ALMACENAMIENTO.nombre})")
     
-    print(f"Cargando datos desde la carpeta: {DATA_DIR}")
+    try:
+        citas, historial = ALMACENAMIENTO.cargar()
+    except Exception as e:
+        print(f"Error al cargar los datos ({e}), iniciando sin datos")
+        return [], {}
     
-    # Cargar citas
-    if os.path.exists(ARCHIVO_CITAS):
-        try:
-            with open(ARCHIVO_CITAS, 'r', encoding='utf-8') as archivo:
-                citas = json.load(archivo)
-            print(f"Datos de citas cargados: {len(citas)} citas encontradas")
-            
-            # Limpiar citas pasadas automáticamente
-            citas_originales = len(citas)
-            citas = limpiar_citas_pasadas(citas)
-            
-            # Si se eliminaron citas, guardar los datos actualizados
-            if len(citas) < citas_originales:
-                with open(ARCHIVO_CITAS, 'w', encoding='utf-8') as archivo:
-                    json.dump(citas, archivo, indent=2, ensure_ascii=False)
-                    
-        except (json.JSONDecodeError, FileNotFoundError):
-            print("Error al cargar el archivo de citas, iniciando con lista vacía")
-            citas = []
+    if citas:
+        print(f"Datos de citas cargados: {len(citas)} citas encontradas")
     else:
-        print("No se encontró archivo de citas previo, iniciando con lista vacía")
+        print("No se encontraron citas previas, iniciando con lista vacía")
+    print(f"Historial cargado: {len(historial)} mascotas en el historial")
     
-    # Cargar historial
-    if os.path.exists(ARCHIVO_HISTORIAL):
-        try:
-            with open(ARCHIVO_HISTORIAL, 'r', encoding='utf-8') as archivo:
-                historial = json.load(archivo)
-            print(f"Historial cargado: {len(historial)} mascotas en el historial")
-        except (json.JSONDecodeError, FileNotFoundError):
-            print("Error al cargar el archivo de historial, iniciando con diccionario vacío")
-            historial = {}
-    else:
-        print("No se encontró archivo de historial previo, iniciando con diccionario vacío")
+    # Limpiar citas pasadas automáticamente
+    citas_originales = len(citas)
+    citas = limpiar_citas_pasadas(citas)
+    
+    # Si se eliminaron citas, guardar los datos actualizados
+    if len(citas) < citas_originales:
+        guardar_datos(citas, historial)
+    
+    # Índice de horarios ocupados para las consultas de disponibilidad
+    INDICE_DISPONIBILIDAD.reconstruir(citas)
+    INDICE_MASCOTAS.reconstruir(historial)
     
     return citas, historial
 
 def guardar_datos(citas, historial):
-    """Guarda los datos de citas e historial en archivos JSON"""
+    """Guarda los datos de citas e historial (solo se escriben los cambios si el motor lo permite)"""
     try:
-        # Guardar citas
-        with open(ARCHIVO_CITAS, 'w', encoding='utf-8') as archivo:
-            json.dump(citas, archivo, indent=2, ensure_ascii=False)
-        
-        # Guardar historial
-        with open(ARCHIVO_HISTORIAL, 'w', encoding='utf-8') as archivo:
-            json.dump(historial, archivo, indent=2, ensure_ascii=False)
-        
+        ALMACENAMIENTO.guardar(citas, historial)
         print(f"Datos guardados exitosamente en: {DATA_DIR}")
         return True
     except Exception as e:
@@ -77,10 +93,7 @@ def guardar_datos(citas, historial):
 
 def verificar_disponibilidad(citas, fecha, horario):
     """Verifica si un horario está disponible en una fecha específica"""
-    for cita in citas:
-        if cita['fecha'] == fecha and cita['horario'] == horario:
-            return False
-    return True
+    return not indice_disponibilidad(citas).esta_ocupado(fecha, horario)
 
 def mostrar_horarios_disponibles(citas, fecha, horarios_posibles):
     """Muestra los horarios disponibles para una fecha específica, excluyendo horarios pasados"""
@@ -88,20 +101,15 @@ def mostrar_horarios_disponibles(citas, fecha, horarios_posibles):
     fecha_actual = datetime.now()
     
     try:
-        fecha_cita = datetime.strptime(fecha, '%d/%m/%y')
-        es_hoy = fecha_cita.date() == fecha_actual.date()
+        es_hoy = fecha_de_cita(fecha) == fecha_actual.date()
+        
+        # Horarios no ocupados según el índice
+        horarios_disponibles = indice_disponibilidad(citas).horarios_libres(fecha, horarios_posibles)
         
-        for horario in horarios_posibles:
-            # Verificar disponibilidad (no ocupado)
-            if verificar_disponibilidad(citas, fecha, horario):
-                # Si es hoy, verificar que el horario no haya pasado
-                if es_hoy:
-                    hora_cita = datetime.strptime(f"{fecha} {horario}", '%d/%m/%y %H:%M')
-                    if hora_cita > fecha_actual:
-                        horarios_disponibles.append(horario)
-                else:
-                    # Si es una fecha futura, todos los horarios son válidos
-                    horarios_disponibles.append(horario)
+        # Si es hoy, descartar los horarios que ya pasaron (HH:MM se compara como texto)
+        if es_hoy:
+            hora_actual = fecha_actual.strftime('%H:%M')
+            horarios_disponibles = [h for h in horarios_disponibles if h > hora_actual]
     except ValueError:
         # Si hay error en el formato de fecha, devolver lista vacía
         pass
@@ -168,12 +176,17 @@ def registrar_cita(citas, historial, id, nombre_mascota, fecha, motivo, tutor, h
     }
     
     # Agregar a la lista de citas
+    indice = indice_disponibilidad(citas)
     citas.append(cita)
+    indice.agregar(fecha, horario)
     
     # Agregar al historial
+    mascotas = indice_mascotas(historial)
     if id not in historial:
         historial[id] = []
     historial[id].append(cita)
+    mascotas.agregar_cita(id, cita)
+    ALMACENAMIENTO.anotar_alta(cita)
     
     # Guardar datos automáticamente
     if guardar_datos(citas, historial):
@@ -193,21 +206,28 @@ def cancelar_cita(citas, historial, id_mascota, fecha, horario):
             cita['fecha'] == fecha and 
             cita['horario'] == horario):
             cita_cancelada = citas.pop(i)
+            if INDICE_DISPONIBILIDAD.citas is citas:
+                INDICE_DISPONIBILIDAD.quitar(fecha, horario)
             cita_encontrada = True
             break
     
     # Buscar y eliminar del historial
+    en_historial = False
+    mascotas = indice_mascotas(historial)
     if id_mascota in historial:
         for i, cita in enumerate(historial[id_mascota]):
             if (cita['fecha'] == fecha and 
                 cita['horario'] == horario):
                 historial[id_mascota].pop(i)
+                en_historial = True
                 # Si no quedan más citas, eliminar la mascota del historial
                 if not historial[id_mascota]:
                     del historial[id_mascota]
+                mascotas.actualizar_mascota(id_mascota, historial.get(id_mascota))
                 break
     
     if cita_encontrada:
+        ALMACENAMIENTO.anotar_baja(id_mascota, fecha, horario, en_historial=en_historial)
         # Guardar cambios automáticamente
         if guardar_datos(citas, historial):
             print(f"Cita cancelada exitosamente para el {fecha} a las {horario}")
@@ -292,73 +312,25 @@ def mostrar_todas_las_mascotas(historial):
     print(f"\nTodas las Mascotas Registradas ({len(historial)} mascotas)")
     print("=" * 60)
     
-    mascotas_info = []
-    for id_mascota, citas_mascota in historial.items():
-        if citas_mascota:  # Si tiene al menos una cita
-            # Obtener información de la mascota de la primera cita
-            primera_cita = citas_mascota[0]
-            nombre = primera_cita['nombre_mascota']
-            tutor = primera_cita['tutor']
-            total_citas = len(citas_mascota)
-            
-            # Encontrar la fecha más reciente
-            fechas = [datetime.strptime(cita['fecha'], '%d/%m/%y') for cita in citas_mascota]
-            fecha_mas_reciente = max(fechas).strftime('%d/%m/%y')
-            
-            mascotas_info.append({
-                'id': id_mascota,
-                'nombre': nombre,
-                'tutor': tutor,
-                'total_citas': total_citas,
-                'ultima_cita': fecha_mas_reciente
-            })
-    
-    # Ordenar por nombre de mascota
-    mascotas_info.sort(key=lambda x: x['nombre'].lower())
+    # Resumen ya calculado por el índice (sin leer las fechas de cada cita)
+    mascotas_info = sorted(indice_mascotas(historial).resumen.values(), key=lambda x: x['nombre'].lower())
     
     for i, mascota in enumerate(mascotas_info, 1):
         print(f"{i}. ID: {mascota['id']}")
         print(f"   Nombre: {mascota['nombre']}")
         print(f"   Tutor: {mascota['tutor']}")
         print(f"   Total de citas: {mascota['total_citas']}")
-        print(f"   Última cita: {mascota['ultima_cita']}")
+        ultima = mascota['ultima_cita'].strftime('%d/%m/%y') if mascota['ultima_cita'] else '-'
+        print(f"   Última cita: {ultima}")
         print("-" * 30)
 
 def buscar_mascota_por_nombre(historial, nombre_busqueda):
-    """Busca mascotas por nombre (búsqueda parcial)"""
-    nombre_busqueda = nombre_busqueda.lower().strip()
-    mascotas_encontradas = []
-    
-    for id_mascota, citas_mascota in historial.items():
-        if citas_mascota:
-            nombre_mascota = citas_mascota[0]['nombre_mascota'].lower()
-            if nombre_busqueda in nombre_mascota:
-                mascotas_encontradas.append({
-                    'id': id_mascota,
-                    'nombre': citas_mascota[0]['nombre_mascota'],
-                    'tutor': citas_mascota[0]['tutor'],
-                    'total_citas': len(citas_mascota)
-                })
-    
-    return mascotas_encontradas
+    """Busca mascotas por nombre (búsqueda parcial, sin distinguir tildes)"""
+    return indice_mascotas(historial).buscar('nombre', nombre_busqueda)
 
 def buscar_mascota_por_tutor(historial, tutor_busqueda):
-    """Busca mascotas por nombre del tutor (búsqueda parcial)"""
-    tutor_busqueda = tutor_busqueda.lower().strip()
-    mascotas_encontradas = []
-    
-    for id_mascota, citas_mascota in historial.items():
-        if citas_mascota:
-            tutor = citas_mascota[0]['tutor'].lower()
-            if tutor_busqueda in tutor:
-                mascotas_encontradas.append({
-                    'id': id_mascota,
-                    'nombre': citas_mascota[0]['nombre_mascota'],
-                    'tutor': citas_mascota[0]['tutor'],
-                    'total_citas': len(citas_mascota)
-                })
-    
-    return mascotas_encontradas
+    """Busca mascotas por nombre del tutor (búsqueda parcial, sin distinguir tildes)"""
+    return indice_mascotas(historial).buscar('tutor', tutor_busqueda)
 
 def mostrar_resultados_busqueda(mascotas_encontradas, tipo_busqueda, termino_busqueda):
     """Muestra los resultados de búsqueda de mascotas"""
@@ -420,82 +392,115 @@ def mostrar_info_archivos():
     print("=" * 40)
     print(f"Carpeta de datos: {DATA_DIR}")
     
-    # Información del archivo de citas
-    if os.path.exists(ARCHIVO_CITAS):
-        stat_citas = os.stat(ARCHIVO_CITAS)
-        tamaño_citas = stat_citas.st_size
-        fecha_mod_citas = datetime.fromtimestamp(stat_citas.st_mtime).strftime('%d/%m/%y %H:%M:%S')
-        print(f"Archivo de citas: {ARCHIVO_CITAS}")
-        print(f"  Tamaño: {tamaño_citas} bytes")
-        print(f"  Última modificación: {fecha_mod_citas}")
-    else:
-        print(f"Archivo de citas: {ARCHIVO_CITAS} (no existe)")
-    
-    # Información del archivo de historial
-    if os.path.exists(ARCHIVO_HISTORIAL):
-        stat_historial = os.stat(ARCHIVO_HISTORIAL)
-        tamaño_historial = stat_historial.st_size
-        fecha_mod_historial = datetime.fromtimestamp(stat_historial.st_mtime).strftime('%d/%m/%y %H:%M:%S')
-        print(f"Archivo de historial: {ARCHIVO_HISTORIAL}")
-        print(f"  Tamaño: {tamaño_historial} bytes")
-        print(f"  Última modificación: {fecha_mod_historial}")
-    else:
-        print(f"Archivo de historial: {ARCHIVO_HISTORIAL} (no existe)")
-    
-    # Listar archivos de backup
-    if os.path.exists(DATA_DIR):
-        archivos_backup = [f for f in os.listdir(DATA_DIR) if f.startswith('backup_')]
-        if archivos_backup:
-            print(f"\nArchivos de backup encontrados: {len(archivos_backup)}")
-            for backup in sorted(archivos_backup)[-3:]:  # Mostrar solo los 3 más recientes
-                print(f"  {backup}")
+    print(f"Almacenamiento: {ALMACENAMIENTO.nombre}")
+    
+    for ruta in ALMACENAMIENTO.archivos:
+        if os.path.exists(ruta):
+            stat_archivo = os.stat(ruta)
+            fecha_mod = datetime.fromtimestamp(stat_archivo.st_mtime).strftime('%d/%m/%y %H:%M:%S')
+            print(f"Archivo: {ruta}")
+            print(f"  Tamaño: {stat_archivo.st_size} bytes")
+            print(f"  Última modificación: {fecha_mod}")
         else:
-            print("\nNo se encontraron archivos de backup")
+            print(f"Archivo: {ruta} (no existe)")
+    
+    # Respaldos registrados en el índice (no se recorre la carpeta)
+    respaldos = RESPALDOS.listar()
+    if respaldos:
+        print(f"\nRespaldos disponibles: {len(respaldos)}")
+        for respaldo in respaldos[-3:]:  # Mostrar solo los 3 más recientes
+            print(f"  {respaldo['id']}  ({respaldo['fecha']}, {respaldo['nuevos']} bytes nuevos)")
+    else:
+        print("\nNo se encontraron respaldos")
 
 def limpiar_citas_pasadas(citas):
     """Elimina automáticamente las citas que ya pasaron"""
     fecha_hora_actual = datetime.now()
+    hoy = fecha_hora_actual.date()
     citas_futuras = []
     citas_eliminadas = 0
+    actualizar_indice = INDICE_DISPONIBILIDAD.vigente_para(citas)
     
     for cita in citas:
         try:
-            fecha_hora_cita = datetime.strptime(f"{cita['fecha']} {cita['horario']}", '%d/%m/%y %H:%M')
-            if fecha_hora_cita > fecha_hora_actual:
+            fecha_cita = fecha_de_cita(cita['fecha'])
+            if fecha_cita == hoy:
+                # Solo las citas de hoy necesitan comparar la hora
+                es_futura = datetime.strptime(f"{cita['fecha']} {cita['horario']}", '%d/%m/%y %H:%M') > fecha_hora_actual
+            else:
+                es_futura = fecha_cita > hoy
+            if es_futura:
                 citas_futuras.append(cita)
             else:
                 citas_eliminadas += 1
+                if actualizar_indice:
+                    INDICE_DISPONIBILIDAD.quitar(cita['fecha'], cita['horario'])
+                # La cita sale de las activas pero se conserva en el historial
+                ALMACENAMIENTO.anotar_baja(cita['id'], cita['fecha'], cita['horario'], en_historial=False)
         except ValueError:
             # Si hay error en el formato, conservar la cita
             citas_futuras.append(cita)
     
+    if actualizar_indice:
+        INDICE_DISPONIBILIDAD.vincular(citas_futuras)
+    
     if citas_eliminadas > 0:
         print(f"Se eliminaron automáticamente {citas_eliminadas} citas pasadas del sistema")
     
     return citas_futuras
 
 def hacer_backup():
-    """Crea una copia de respaldo de los datos con timestamp"""
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    
+    """Crea un respaldo incremental: solo se guardan los trozos que cambiaron"""
     try:
-        # Backup de citas
-        if os.path.exists(ARCHIVO_CITAS):
-            backup_citas = os.path.join(DATA_DIR, f"backup_citas_{timestamp}.json")
-            with open(ARCHIVO_CITAS, 'r', encoding='utf-8') as origen:
-                with open(backup_citas, 'w', encoding='utf-8') as destino:
-                    destino.write(origen.read())
+        with tempfile.TemporaryDirectory(dir=DATA_DIR) as temporal:
+            # Base SQLite: copia consistente aunque esté en uso
+            if hasattr(ALMACENAMIENTO, 'respaldar'):
+                copia = os.path.join(temporal, os.path.basename(ALMACENAMIENTO.archivo))
+                ALMACENAMIENTO.respaldar(copia)
+                archivos = {os.path.basename(copia): copia}
+            else:
+                archivos = {os.path.basename(ruta): ruta for ruta in ALMACENAMIENTO.archivos}
+            respaldo = RESPALDOS.crear(archivos)
         
-        # Backup de historial
-        if os.path.exists(ARCHIVO_HISTORIAL):
-            backup_historial = os.path.join(DATA_DIR, f"backup_historial_{timestamp}.json")
-            with open(ARCHIVO_HISTORIAL, 'r', encoding='utf-8') as origen:
-                with open(backup_historial, 'w', encoding='utf-8') as destino:
-                    destino.write(origen.read())
+        borrados, _ = RESPALDOS.aplicar_retencion(**RETENCION)
         
-        print(f"Backup creado exitosamente con timestamp: {timestamp}")
-        print(f"Archivos guardados en: {DATA_DIR}")
+        print(f"Backup creado exitosamente: {respaldo['id']}")
+        print(f"Datos respaldados: {respaldo['tamano']} bytes, escritos: {respaldo['nuevos']} bytes")
+        if borrados:
+            print(f"Se eliminaron {borrados} respaldos antiguos según la política de retención")
         return True
     except Exception as e:
         print(f"Error al crear backup: {e}")
         return False
+
+def restaurar_backup(id_respaldo=None, hasta=None):
+    """
+    Restaura el respaldo indicado por id, el último anterior a `hasta`
+    (datetime) o el más reciente. Devuelve (citas, historial) recargados,
+    o None si no hay respaldo que restaurar.
+    """
+    respaldo = RESPALDOS.buscar(id_respaldo, hasta)
+    if respaldo is None:
+        print("No se encontró un respaldo para restaurar")
+        return None
+    
+    try:
+        if hasattr(ALMACENAMIENTO, 'restaurar_desde'):
+            nombre = os.path.basename(ALMACENAMIENTO.archivo)
+            with tempfile.TemporaryDirectory(dir=DATA_DIR) as temporal:
+                copia = os.path.join(temporal, nombre)
+                if not RESPALDOS.restaurar(respaldo['id'], {nombre: copia}):
+                    print(f"El respaldo {respaldo['id']} no contiene {nombre}")
+                    return None
+                ALMACENAMIENTO.restaurar_desde(copia)
+        else:
+            destinos = {os.path.basename(ruta): ruta for ruta in ALMACENAMIENTO.archivos}
+            if not RESPALDOS.restaurar(respaldo['id'], destinos):
+                print(f"El respaldo {respaldo['id']} no contiene archivos de este almacenamiento")
+                return None
+    except Exception as e:
+        print(f"Error al restaurar el backup: {e}")
+        return None
+    
+    print(f"Respaldo {respaldo['id']} ({respaldo['fecha']}) restaurado")
+    return cargar_datos()
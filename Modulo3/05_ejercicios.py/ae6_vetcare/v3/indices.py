@@ -0,0 +1,192 @@
+"""
+Índices en memoria para VetCare v3.
+
+Se construyen una vez al cargar los datos y se mantienen al día desde
+registrar_cita, cancelar_cita y limpiar_citas_pasadas, así las consultas
+no necesitan recorrer todas las citas.
+"""
+import bisect
+import unicodedata
+
+
+class IndiceDisponibilidad:
+    """
+    Horarios ocupados por fecha: {"25/12/24": {"09:00", "10:00"}, ...}
+
+    Consultar si un horario está libre o qué horarios quedan en un día
+    cuesta lo mismo con 10 o con 1.000.000 de citas.
+    """
+
+    def __init__(self, citas=None):
+        self.ocupados = {}
+        self.citas = None
+        self.total = 0
+        if citas is not None:
+            self.reconstruir(citas)
+
+    def reconstruir(self, citas):
+        """Arma el índice desde cero a partir de la lista de citas."""
+        self.ocupados = {}
+        self.total = 0
+        for cita in citas:
+            self.agregar(cita['fecha'], cita['horario'])
+        self.citas = citas
+
+    def vigente_para(self, citas):
+        """
+        True si el índice corresponde a esta lista de citas. Si la lista se
+        reemplazó o cambió de tamaño por fuera de las funciones del sistema,
+        hay que reconstruirlo.
+        """
+        return self.citas is citas and self.total == len(citas)
+
+    def vincular(self, citas):
+        """Asocia el índice a una nueva lista con las mismas citas (ya filtrada)."""
+        self.citas = citas
+
+    def agregar(self, fecha, horario):
+        self.ocupados.setdefault(fecha, set()).add(horario)
+        self.total += 1
+
+    def quitar(self, fecha, horario):
+        horarios = self.ocupados.get(fecha)
+        if horarios is None or horario not in horarios:
+            return
+        horarios.discard(horario)
+        if not horarios:
+            del self.ocupados[fecha]
+        self.total -= 1
+
+    def esta_ocupado(self, fecha, horario):
+        return horario in self.ocupados.get(fecha, ())
+
+    def horarios_libres(self, fecha, horarios_posibles):
+        ocupados = self.ocupados.get(fecha, ())
+        return [horario for horario in horarios_posibles if horario not in ocupados]
+
+
+def normalizar(texto):
+    """Minúsculas y sin tildes: 'José Pérez' -> 'jose perez'."""
+    descompuesto = unicodedata.normalize('NFKD', texto.lower().strip())
+    return ''.join(c for c in descompuesto if not unicodedata.combining(c))
+
+
+class IndiceMascotas:
+    """
+    Resumen por mascota y búsqueda de texto por nombre o por tutor.
+
+    - resumen: {id: {'id', 'nombre', 'tutor', 'total_citas', 'ultima_cita'}},
+      con 'ultima_cita' como date (o None si la fecha no se puede leer)
+    - textos: por campo ('nombre' / 'tutor'), {id: texto normalizado}
+    - bloques: por campo, todos los textos unidos en un solo string separados
+      por saltos de línea, con la posición donde empieza cada uno. Buscar "ito"
+      es un str.find sobre ese string (en C) y bisect para saber de qué
+      mascota es cada coincidencia; no se recorre el historial ni se
+      normaliza nada al buscar. Se arma de nuevo (una sola vez) en la
+      primera búsqueda después de un cambio.
+    """
+
+    CAMPOS = ('nombre', 'tutor')
+
+    def __init__(self, convertir_fecha):
+        self.convertir_fecha = convertir_fecha
+        self.resumen = {}
+        self.textos = {campo: {} for campo in self.CAMPOS}
+        self.bloques = dict.fromkeys(self.CAMPOS)
+        self.historial = None
+
+    def _fecha(self, cita):
+        try:
+            return self.convertir_fecha(cita['fecha'])
+        except (KeyError, ValueError):
+            return None
+
+    def _resumir(self, id_mascota, citas_mascota):
+        fechas = [f for f in map(self._fecha, citas_mascota) if f is not None]
+        return {
+            'id': id_mascota,
+            'nombre': citas_mascota[0]['nombre_mascota'],
+            'tutor': citas_mascota[0]['tutor'],
+            'total_citas': len(citas_mascota),
+            'ultima_cita': max(fechas) if fechas else None,
+        }
+
+    def _indexar(self, mascota):
+        for campo in self.CAMPOS:
+            # Sin saltos de línea: son el separador del bloque
+            self.textos[campo][mascota['id']] = normalizar(mascota[campo]).replace('\n', ' ')
+            self.bloques[campo] = None
+
+    def _desindexar(self, id_mascota):
+        for campo in self.CAMPOS:
+            self.textos[campo].pop(id_mascota, None)
+            self.bloques[campo] = None
+
+    def reconstruir(self, historial):
+        self.resumen = {}
+        self.textos = {campo: {} for campo in self.CAMPOS}
+        self.bloques = dict.fromkeys(self.CAMPOS)
+        for id_mascota, citas_mascota in historial.items():
+            if citas_mascota:
+                mascota = self._resumir(id_mascota, citas_mascota)
+                self.resumen[id_mascota] = mascota
+                self._indexar(mascota)
+        self.historial = historial
+
+    def vigente_para(self, historial):
+        return self.historial is historial and len(self.resumen) == len(historial)
+
+    def agregar_cita(self, id_mascota, cita):
+        """Se llama después de agregar `cita` al historial de la mascota."""
+        mascota = self.resumen.get(id_mascota)
+        if mascota is None:
+            mascota = self._resumir(id_mascota, [cita])
+            self.resumen[id_mascota] = mascota
+            self._indexar(mascota)
+            return
+        mascota['total_citas'] += 1
+        fecha = self._fecha(cita)
+        if fecha is not None and (mascota['ultima_cita'] is None or fecha > mascota['ultima_cita']):
+            mascota['ultima_cita'] = fecha
+
+    def actualizar_mascota(self, id_mascota, citas_mascota):
+        """Se llama después de quitar citas del historial de la mascota."""
+        if self.resumen.pop(id_mascota, None) is not None:
+            self._desindexar(id_mascota)
+        if citas_mascota:
+            mascota = self._resumir(id_mascota, citas_mascota)
+            self.resumen[id_mascota] = mascota
+            self._indexar(mascota)
+
+    def _bloque(self, campo):
+        """(texto unido, posición de inicio de cada mascota, ids) del campo."""
+        if self.bloques[campo] is None:
+            ids = list(self.textos[campo])
+            inicios = []
+            posicion = 0
+            for texto in self.textos[campo].values():
+                inicios.append(posicion)
+                posicion += len(texto) + 1
+            self.bloques[campo] = ('\n'.join(self.textos[campo].values()), inicios, ids)
+        return self.bloques[campo]
+
+    def buscar(self, campo, texto):
+        """
+        Mascotas cuyo `campo` contiene `texto`, en cualquier parte y sin
+        distinguir mayúsculas ni tildes ("ito" encuentra a "Pepito").
+        """
+        buscado = normalizar(texto).replace('\n', ' ')
+        if not buscado:
+            return []
+        unido, inicios, ids = self._bloque(campo)
+
+        encontrados = []
+        posicion = unido.find(buscado)
+        while posicion != -1:
+            indice = bisect.bisect_right(inicios, posicion) - 1
+            encontrados.append(self.resumen[ids[indice]])
+            # Sigue desde la mascota siguiente: cada una aparece una sola vez
+            if indice + 1 == len(inicios):
+                break
+            posicion = unido.find(buscado, inicios[indice + 1])
+        return encontrados
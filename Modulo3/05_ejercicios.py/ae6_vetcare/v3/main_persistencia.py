@@ -3,8 +3,9 @@ from funciones_persistencia import (
     verificar_disponibilidad, mostrar_horarios_disponibles, cancelar_cita, 
     mostrar_citas_del_dia, validar_fecha, validar_horario, mostrar_estadisticas,
     hacer_backup, validar_fecha_y_hora_futura, limpiar_citas_pasadas, mostrar_info_archivos,
-    gestionar_mascotas
+    gestionar_mascotas, restaurar_backup, RESPALDOS
 )
+from datetime import datetime
 import sys
 
 def inicializar_sistema():
@@ -37,6 +38,7 @@ def menu_principal():
     print("9. Limpiar citas pasadas")
     print("10. Ver información de archivos")
     print("11. Guardar datos manualmente")
+    print("12. Restaurar backup")
     print("0. Salir")
     print("="*50)
 
@@ -118,6 +120,25 @@ def solicitar_datos_cita(citas, horarios_posibles):
         'tutor': tutor
     }
 
+def solicitar_restauracion():
+    """Muestra los respaldos y pregunta cuál restaurar. Devuelve (id, hasta)"""
+    respaldos = RESPALDOS.listar()
+    if not respaldos:
+        print("No hay respaldos disponibles.")
+        return None
+    
+    print("\nRespaldos disponibles (más recientes al final):")
+    for respaldo in respaldos[-10:]:
+        print(f"  {respaldo['id']}  {respaldo['fecha']}")
+    
+    eleccion = input("Ingrese el id, una fecha 'dd/mm/yy HH:MM' o Enter para el más reciente: ").strip()
+    if not eleccion:
+        return None, None
+    try:
+        return None, datetime.strptime(eleccion, '%d/%m/%y %H:%M')
+    except ValueError:
+        return eleccion, None
+
 def main():
     """Función principal del programa"""
     # Inicializar sistema
@@ -128,7 +149,7 @@ def main():
     while True:
         try:
             menu_principal()
-            opcion = input("Seleccione una opción (0-11): ").strip()
+            opcion = input("Seleccione una opción (0-12): ").strip()
             
             if opcion == '1':
                 # Ver horarios disponibles
@@ -251,6 +272,17 @@ def main():
                 else:
                     print("Error al guardar los datos.")
                     
+            elif opcion == '12':
+                # Restaurar backup (por id o al estado de una fecha y hora)
+                eleccion = solicitar_restauracion()
+                if eleccion:
+                    confirmar = input("Se reemplazarán los datos actuales. ¿Continuar? (s/n): ").strip().lower()
+                    if confirmar == 's':
+                        restaurados = restaurar_backup(*eleccion)
+                        if restaurados is not None:
+                            citas, historial = restaurados
+                            print("Datos restaurados exitosamente.")
+                    
             elif opcion == '0':
                 # Salir
                 print("\nGuardando datos antes de salir...")
@@ -263,7 +295,7 @@ def main():
                 sys.exit(0)
                 
             else:
-                print("\nOpción inválida. Por favor, seleccione una opción del 0 al 11.")
+                print("\nOpción inválida. Por favor, seleccione una opción del 0 al 12.")
                 
         except KeyboardInterrupt:
             print("\n\nInterrupción detectada. Guardando datos...")
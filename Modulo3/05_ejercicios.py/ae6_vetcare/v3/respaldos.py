@@ -0,0 +1,208 @@
+"""
+Respaldos incrementales de los datos de VetCare v3.
+
+Cada respaldo (snapshot) guarda los archivos de datos partidos en trozos.
+Cada trozo se comprime y se guarda una sola vez con el nombre de su hash
+SHA-256 (almacenamiento por contenido): si un trozo no cambió desde el
+respaldo anterior, no se vuelve a escribir. Así cada respaldo nuevo solo
+ocupa lo que cambió.
+
+    data/respaldos/
+        objetos/ab/ab12...        trozos comprimidos (zlib)
+        snapshots/20250718_143015_123456.json   manifiesto de cada respaldo
+        indice.json               lista de respaldos, del más antiguo al más nuevo
+
+Cómo se parten los archivos:
+- Bases SQLite: en bloques fijos de 64 KB (SQLite no mueve páginas que no
+  cambian, así que los bloques se repiten entre respaldos).
+- JSON y otros textos: por líneas, cortando donde el hash de la línea cae
+  en un valor fijo. Insertar una cita solo cambia el trozo donde cae, no
+  desplaza todos los siguientes.
+"""
+import hashlib
+import json
+import os
+import zlib
+from datetime import datetime, timedelta
+
+TAMANO_BLOQUE = 64 * 1024
+# Un corte cada ~64 líneas en promedio, con un máximo de 1 MB por trozo
+DIVISOR_LINEAS = 64
+MAXIMO_TROZO = 1024 * 1024
+FORMATO_ID = '%Y%m%d_%H%M%S_%f'
+
+
+def partir_en_trozos(datos):
+    """Divide el contenido de un archivo en trozos estables entre versiones."""
+    if datos.startswith(b'SQLite format 3\x00'):
+        return [datos[i:i + TAMANO_BLOQUE] for i in range(0, len(datos), TAMANO_BLOQUE)]
+
+    trozos = []
+    actual = []
+    tamano = 0
+    for linea in datos.splitlines(keepends=True):
+        actual.append(linea)
+        tamano += len(linea)
+        if zlib.crc32(linea) % DIVISOR_LINEAS == 0 or tamano >= MAXIMO_TROZO:
+            trozos.append(b''.join(actual))
+            actual, tamano = [], 0
+    if actual:
+        trozos.append(b''.join(actual))
+    return trozos
+
+
+class RepositorioRespaldos:
+    """Respaldos por contenido guardados en `directorio`."""
+
+    def __init__(self, directorio):
+        self.directorio = directorio
+        self.dir_objetos = os.path.join(directorio, 'objetos')
+        self.dir_snapshots = os.path.join(directorio, 'snapshots')
+        self.archivo_indice = os.path.join(directorio, 'indice.json')
+
+    # --- utilidades de archivos -------------------------------------------
+
+    def _ruta_objeto(self, hash_trozo):
+        return os.path.join(self.dir_objetos, hash_trozo[:2], hash_trozo)
+
+    def _escribir_atomico(self, ruta, datos):
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        temporal = ruta + '.tmp'
+        with open(temporal, 'wb') as archivo:
+            archivo.write(datos)
+            archivo.flush()
+            os.fsync(archivo.fileno())
+        os.replace(temporal, ruta)
+
+    def _guardar_json(self, ruta, datos):
+        self._escribir_atomico(ruta, json.dumps(datos, indent=2, ensure_ascii=False).encode('utf-8'))
+
+    def listar(self):
+        """Respaldos disponibles: [{'id', 'fecha', 'tamano', 'nuevos'}], del más antiguo al más nuevo."""
+        if not os.path.exists(self.archivo_indice):
+            return []
+        with open(self.archivo_indice, 'r', encoding='utf-8') as archivo:
+            return json.load(archivo)
+
+    def _manifiesto(self, id_snapshot):
+        with open(os.path.join(self.dir_snapshots, f"{id_snapshot}.json"), 'r', encoding='utf-8') as archivo:
+            return json.load(archivo)
+
+    # --- crear ------------------------------------------------------------
+
+    def crear(self, archivos):
+        """
+        Crea un respaldo de `archivos` ({nombre: ruta}). Solo escribe los
+        trozos que no existían. Devuelve la entrada agregada al índice.
+        """
+        manifiesto = {'fecha': datetime.now().isoformat(timespec='seconds'), 'archivos': {}}
+        tamano_total = 0
+        bytes_nuevos = 0
+
+        for nombre, ruta in archivos.items():
+            if not os.path.exists(ruta):
+                continue
+            with open(ruta, 'rb') as archivo:
+                datos = archivo.read()
+
+            hashes = []
+            for trozo in partir_en_trozos(datos):
+                hash_trozo = hashlib.sha256(trozo).hexdigest()
+                ruta_objeto = self._ruta_objeto(hash_trozo)
+                if not os.path.exists(ruta_objeto):
+                    comprimido = zlib.compress(trozo, 6)
+                    self._escribir_atomico(ruta_objeto, comprimido)
+                    bytes_nuevos += len(comprimido)
+                hashes.append(hash_trozo)
+
+            manifiesto['archivos'][nombre] = {'tamano': len(datos), 'trozos': hashes}
+            tamano_total += len(datos)
+
+        id_snapshot = datetime.now().strftime(FORMATO_ID)
+        self._guardar_json(os.path.join(self.dir_snapshots, f"{id_snapshot}.json"), manifiesto)
+
+        entrada = {'id': id_snapshot, 'fecha': manifiesto['fecha'],
+                   'tamano': tamano_total, 'nuevos': bytes_nuevos}
+        self._guardar_json(self.archivo_indice, self.listar() + [entrada])
+        return entrada
+
+    # --- restaurar --------------------------------------------------------
+
+    def buscar(self, id_snapshot=None, hasta=None):
+        """
+        Respaldo a restaurar: el indicado por id, el último anterior o igual
+        a `hasta` (datetime), o el más reciente.
+        """
+        snapshots = self.listar()
+        if id_snapshot:
+            return next((s for s in snapshots if s['id'] == id_snapshot), None)
+        if hasta:
+            snapshots = [s for s in snapshots if datetime.fromisoformat(s['fecha']) <= hasta]
+        return snapshots[-1] if snapshots else None
+
+    def restaurar(self, id_snapshot, destinos):
+        """
+        Reconstruye los archivos del respaldo en las rutas de `destinos`
+        ({nombre: ruta}). Cada archivo se verifica con sus hashes y se
+        reemplaza de una vez. Devuelve la lista de archivos restaurados.
+        """
+        manifiesto = self._manifiesto(id_snapshot)
+        restaurados = []
+        for nombre, info in manifiesto['archivos'].items():
+            if nombre not in destinos:
+                continue
+            partes = []
+            for hash_trozo in info['trozos']:
+                with open(self._ruta_objeto(hash_trozo), 'rb') as archivo:
+                    trozo = zlib.decompress(archivo.read())
+                if hashlib.sha256(trozo).hexdigest() != hash_trozo:
+                    raise ValueError(f"Trozo dañado en el respaldo {id_snapshot}: {hash_trozo}")
+                partes.append(trozo)
+            self._escribir_atomico(destinos[nombre], b''.join(partes))
+            restaurados.append(nombre)
+        return restaurados
+
+    # --- retención --------------------------------------------------------
+
+    def aplicar_retencion(self, ultimos=10, diarios=7, semanales=4):
+        """
+        Conserva los `ultimos` respaldos, el último de cada uno de los
+        últimos `diarios` días y el último de cada una de las últimas
+        `semanales` semanas. Borra el resto y los trozos que ya ningún
+        respaldo usa. Devuelve (respaldos_borrados, trozos_borrados).
+        """
+        snapshots = self.listar()
+        ahora = datetime.now()
+        conservar = {s['id'] for s in snapshots[-ultimos:]} if ultimos else set()
+
+        por_dia, por_semana = {}, {}
+        for s in snapshots:
+            fecha = datetime.fromisoformat(s['fecha'])
+            if ahora - fecha <= timedelta(days=diarios):
+                por_dia[fecha.date()] = s['id']
+            if ahora - fecha <= timedelta(weeks=semanales):
+                por_semana[fecha.isocalendar()[:2]] = s['id']
+        conservar |= set(por_dia.values()) | set(por_semana.values())
+
+        borrados = [s for s in snapshots if s['id'] not in conservar]
+        if not borrados:
+            return 0, 0
+
+        self._guardar_json(self.archivo_indice, [s for s in snapshots if s['id'] in conservar])
+        for s in borrados:
+            os.remove(os.path.join(self.dir_snapshots, f"{s['id']}.json"))
+
+        # Recolección: trozos que no aparecen en ningún respaldo conservado
+        en_uso = set()
+        for id_snapshot in conservar:
+            for info in self._manifiesto(id_snapshot)['archivos'].values():
+                en_uso.update(info['trozos'])
+
+        trozos_borrados = 0
+        for carpeta in os.listdir(self.dir_objetos):
+            ruta_carpeta = os.path.join(self.dir_objetos, carpeta)
+            for hash_trozo in os.listdir(ruta_carpeta):
+                if hash_trozo not in en_uso:
+                    os.remove(os.path.join(ruta_carpeta, hash_trozo))
+                    trozos_borrados += 1
+        return len(borrados), trozos_borrados
@@ -0,0 +1,70 @@
+import json
+import os
+import tempfile
+import unittest
+
+from almacenamiento import AlmacenamientoSQLite
+
+CITA = {
+    "id": "1",
+    "nombre_mascota": "Garu",
+    "fecha": "18/07/25",
+    "motivo": "consulta",
+    "tutor": "Ever",
+    "horario": "15:00",
+    "fecha_registro": "18/07/25 12:59:09",
+}
+
+
+class ImportacionJSONTest(unittest.TestCase):
+    def setUp(self):
+        self.carpeta = tempfile.TemporaryDirectory()
+        self.data_dir = self.carpeta.name
+        with open(os.path.join(self.data_dir, "citas.json"), "w", encoding="utf-8") as f:
+            json.dump([CITA], f)
+        with open(os.path.join(self.data_dir, "historial.json"), "w", encoding="utf-8") as f:
+            json.dump({"1": [CITA]}, f)
+        self.abiertos = []
+
+    def tearDown(self):
+        for almacenamiento in self.abiertos:
+            almacenamiento.conexion.close()
+        self.carpeta.cleanup()
+
+    def abrir(self):
+        almacenamiento = AlmacenamientoSQLite(self.data_dir)
+        self.abiertos.append(almacenamiento)
+        return almacenamiento
+
+    def test_importa_los_json_la_primera_vez(self):
+        citas, historial = self.abrir().cargar()
+        self.assertEqual(citas, [CITA])
+        self.assertEqual(historial, {"1": [CITA]})
+
+    def test_cancelar_todo_y_reiniciar_no_reimporta(self):
+        almacenamiento = self.abrir()
+        citas, historial = almacenamiento.cargar()
+        citas.pop()
+        del historial["1"]
+        almacenamiento.anotar_baja("1", CITA["fecha"], CITA["horario"])
+        almacenamiento.guardar(citas, historial)
+
+        self.assertEqual(self.abrir().cargar(), ([], {}))
+
+    def test_base_existente_sin_marca_no_importa(self):
+        # Base de antes de la marca: ya tiene datos propios y no se mezcla con los JSON
+        almacenamiento = self.abrir()
+        otra = dict(CITA, id="2", horario="16:00")
+        almacenamiento.conexion.execute(
+            "INSERT INTO citas (id, fecha, horario, datos) VALUES (?, ?, ?, ?)",
+            ("2", otra["fecha"], otra["horario"], json.dumps(otra))
+        )
+        almacenamiento.conexion.commit()
+
+        citas, _ = self.abrir().cargar()
+        self.assertEqual(citas, [otra])
+        self.assertEqual(self.abrir()._version(), AlmacenamientoSQLite.VERSION_IMPORTADA)
+
+
+if __name__ == "__main__":
+    unittest.main()
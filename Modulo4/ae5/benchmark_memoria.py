@@ -0,0 +1,104 @@
+"""
+Benchmark de memoria: historial de reservas.
+
+Compara cuanto ocupa guardar reservas terminadas como:
+- objetos con __dict__ en un diccionario (version anterior)
+- objetos con __slots__ en un diccionario
+- el archivo por columnas (ArchivoReservas), hasta 10.000.000 de reservas
+
+Las dos primeras variantes se miden con tracemalloc y con menos reservas
+(crecen lineal); se proyectan a la cantidad del archivo. El archivo se mide
+con ArchivoReservas.memoria() (con tracemalloc tardaria varias veces mas).
+
+Uso:
+    python benchmark_memoria.py [reservas_archivo] [reservas_objetos]
+"""
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from bikecity import ArchivoReservas, Reserva
+
+CLIENTES = 50_000
+BICICLETAS = 5_000
+
+
+class ReservaConDict:
+    """Reserva como era antes: atributos en un __dict__ por instancia."""
+    def __init__(self, id_reserva, cliente_id, bicicleta_id, horas):
+        self.id = id_reserva
+        self.cliente_id = cliente_id
+        self.bicicleta_id = bicicleta_id
+        self.horas = horas
+        self.fecha_reserva = datetime.now()
+        self.fecha_limite = self.fecha_reserva + timedelta(hours=1)
+        self.estado = "Pendiente"
+        self.monto = 0
+
+
+def reservas(clase, cantidad):
+    cliente_ids = [f"CLI{i:06d}" for i in range(CLIENTES)]
+    bici_ids = [f"B{i:05d}" for i in range(BICICLETAS)]
+    for i in range(1, cantidad + 1):
+        reserva = clase(i, cliente_ids[i % CLIENTES], bici_ids[i % BICICLETAS], 1 + i % 4)
+        reserva.estado = "Completada" if i % 10 else "Cancelada"
+        reserva.monto = reserva.horas * 4000
+        yield reserva
+
+
+def medir(nombre, cantidad, guardar):
+    """Memoria en uso (tracemalloc) despues de guardar `cantidad` reservas."""
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    contenedor = guardar(cantidad)
+    duracion = time.perf_counter() - inicio
+    memoria, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    por_reserva = memoria / cantidad
+    print(f"{nombre:28} {cantidad:>12,} {memoria / 2**20:10.1f} MB {por_reserva:8.1f} B/reserva {duracion:6.1f} s")
+    return contenedor, por_reserva
+
+
+def en_diccionario(clase):
+    def guardar(cantidad):
+        return {reserva.id: reserva for reserva in reservas(clase, cantidad)}
+    return guardar
+
+
+def medir_archivo(cantidad):
+    archivo = ArchivoReservas()
+    inicio = time.perf_counter()
+    for reserva in reservas(Reserva, cantidad):
+        archivo.agregar(reserva)
+    duracion = time.perf_counter() - inicio
+    memoria = archivo.memoria()
+    por_reserva = memoria / cantidad
+    print(f"{'ArchivoReservas (columnas)':28} {cantidad:>12,} {memoria / 2**20:10.1f} MB {por_reserva:8.1f} B/reserva {duracion:6.1f} s")
+    return archivo, por_reserva
+
+
+def main():
+    en_columnas = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    en_objetos = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000
+
+    print(f"{'Variante':28} {'Reservas':>12} {'Memoria':>13} {'Por reserva':>19} {'Tiempo':>8}")
+    _, con_dict = medir("dict + __dict__ (antes)", en_objetos, en_diccionario(ReservaConDict))
+    _, con_slots = medir("dict + __slots__", en_objetos, en_diccionario(Reserva))
+    archivo, columnas = medir_archivo(en_columnas)
+
+    print(f"\nProyeccion a {en_columnas:,} reservas:")
+    print(f"  dict + __dict__:  {con_dict * en_columnas / 2**30:6.2f} GB")
+    print(f"  dict + __slots__: {con_slots * en_columnas / 2**30:6.2f} GB")
+    print(f"  columnas:         {columnas * en_columnas / 2**30:6.2f} GB")
+
+    cliente = "CLI000123"
+    inicio = time.perf_counter()
+    resumen = archivo.resumen_cliente(cliente)
+    ultimas = archivo.historial_cliente(cliente, limite=10)
+    print(f"\nHistorial de {cliente}: {resumen} "
+          f"(ultimas {len(ultimas)} en {(time.perf_counter() - inicio) * 1000:.2f} ms)")
+
+
+if __name__ == "__main__":
+    main()
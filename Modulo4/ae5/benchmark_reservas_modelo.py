@@ -0,0 +1,59 @@
+"""
+Benchmark: rafaga de reservas simultaneas con reservar_modelo.
+
+Muchos hilos piden "cualquier bicicleta del modelo X" al mismo tiempo. Se
+verifica que ninguna bicicleta quede asignada dos veces y que se entreguen
+exactamente tantas como habia libres.
+
+Uso:
+    python benchmark_reservas_modelo.py [bicicletas] [clientes] [hilos]
+"""
+import contextlib
+import io
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bikecity import SistemaBikeCity, SystemError, Bicicleta, Cliente
+
+MODELOS = ["Mountain Bike", "City Bike", "Electric Bike"]
+
+
+def main():
+    bicicletas = int(sys.argv[1]) if len(sys.argv) > 1 else 600
+    clientes = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    hilos = int(sys.argv[3]) if len(sys.argv) > 3 else 32
+
+    sistema = SistemaBikeCity()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(bicicletas):
+            sistema.agregar_bicicleta(Bicicleta(f"B{i}", MODELOS[i % len(MODELOS)], 4000))
+        for i in range(clientes):
+            sistema.agregar_cliente(Cliente(f"C{i}", f"Cliente {i}", "900000000"))
+
+    def pedir(i):
+        try:
+            return sistema.reservar_modelo(f"C{i}", MODELOS[i % len(MODELOS)], 1)
+        except SystemError as e:
+            assert e.codigo_error == "SIN_DISPONIBLES"
+            return None
+
+    print(f"{clientes:,} clientes piden entre {bicicletas:,} bicicletas con {hilos} hilos...")
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        with ThreadPoolExecutor(max_workers=hilos) as pool:
+            resultados = list(pool.map(pedir, range(clientes)))
+    duracion = time.perf_counter() - inicio
+
+    reservas = [sistema.reservas[r] for r in resultados if r is not None]
+    asignadas = [reserva.bicicleta_id for reserva in reservas]
+    assert len(asignadas) == len(set(asignadas)), "Bicicleta asignada dos veces"
+    assert len(asignadas) == min(bicicletas, clientes)
+    assert not any(sistema.disponibles_por_modelo().values())
+
+    print(f"Reservas entregadas: {len(asignadas):,} (sin duplicados)")
+    print(f"Tiempo total: {duracion * 1000:.1f} ms  ({len(resultados) / duracion:,.0f} pedidos/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark: verificar_vencidas con 1.000.000 de reservas historicas.
+
+Compara el recorrido completo de self.reservas (version anterior, con el
+historial mezclado entre las reservas en curso) con el heap de
+vencimientos, donde el historial vive en sistema.archivo. Solo unas pocas
+reservas estan pendientes; el resto es historial (completadas) que el heap
+nunca mira.
+
+Uso:
+    python benchmark_vencimientos.py [historicas] [pendientes]
+"""
+import contextlib
+import heapq
+import io
+import sys
+import time
+from datetime import datetime, timedelta
+
+from bikecity import SistemaBikeCity, Bicicleta, Cliente, Reserva
+
+
+def verificar_vencidas_lineal(sistema, ahora):
+    """Version anterior: revisa todas las reservas del sistema."""
+    vencidas = [r.id for r in sistema.reservas.values()
+                if r.estado == "Pendiente" and ahora > r.fecha_limite]
+    for reserva_id in vencidas:
+        reserva = sistema.reservas[reserva_id]
+        sistema.bicicletas[reserva.bicicleta_id].disponible = True
+        reserva.estado = "Cancelada"
+        sistema.reservas_activas.pop(reserva.cliente_id, None)
+    return vencidas
+
+
+def armar_sistema(historicas, pendientes, archivar=True):
+    """
+    Sistema con `historicas` reservas completadas y `pendientes` por vencer
+    (la mitad ya vencida). Con archivar=False el historial queda en
+    self.reservas, como en la version anterior.
+    """
+    sistema = SistemaBikeCity()
+    ahora = datetime.now()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(pendientes):
+            sistema.agregar_cliente(Cliente(f"C{i}", f"Cliente {i}", "900000000"))
+            sistema.agregar_bicicleta(Bicicleta(f"B{i}", "City Bike", 4000))
+
+    for i in range(historicas):
+        reserva = Reserva(i + 1, f"C{i % pendientes}", f"B{i % pendientes}", 1)
+        reserva.estado = "Completada"
+        if archivar:
+            sistema.archivo.agregar(reserva)
+        else:
+            sistema.reservas[reserva.id] = reserva
+
+    for i in range(pendientes):
+        reserva_id = historicas + i + 1
+        reserva = Reserva(reserva_id, f"C{i}", f"B{i}", 1)
+        # La mitad vencio hace un rato, la otra mitad vence mas tarde
+        reserva.fecha_limite = ahora + timedelta(minutes=-30 if i % 2 == 0 else 30)
+        sistema.reservas[reserva_id] = reserva
+        sistema.reservas_activas[reserva.cliente_id] = reserva_id
+        sistema._ocupar(sistema.bicicletas[reserva.bicicleta_id])
+        sistema.vencimientos.append((reserva.fecha_limite, reserva_id))
+
+    heapq.heapify(sistema.vencimientos)
+    sistema.contador_reservas = historicas + pendientes + 1
+    return sistema, ahora
+
+
+def medir(funcion):
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        resultado = funcion()
+    return time.perf_counter() - inicio, resultado
+
+
+def main():
+    historicas = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    pendientes = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000
+
+    print(f"Armando sistema con {historicas:,} reservas historicas y {pendientes:,} pendientes...")
+    sistema, ahora = armar_sistema(historicas, pendientes, archivar=False)
+    tiempo_lineal, vencidas_lineal = medir(lambda: verificar_vencidas_lineal(sistema, ahora))
+
+    sistema, ahora = armar_sistema(historicas, pendientes)
+    tiempo_heap, vencidas_heap = medir(lambda: sistema.verificar_vencidas(ahora))
+    # Segunda pasada: no queda nada vencido, el heap solo mira su primer elemento
+    tiempo_vacio, _ = medir(lambda: sistema.verificar_vencidas(ahora))
+
+    assert sorted(vencidas_lineal) == sorted(vencidas_heap)
+    print(f"Vencidas canceladas: {len(vencidas_heap):,}")
+    print(f"Recorrido completo:  {tiempo_lineal * 1000:10.2f} ms")
+    print(f"Heap de vencimientos:{tiempo_heap * 1000:10.2f} ms")
+    print(f"Heap sin vencidas:   {tiempo_vacio * 1000:10.4f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,12 @@ Sistema de Reservas BIKECITY
 Manejo de renta de bicicletas urbanas con manejo robusto de excepciones
 """
 
+import heapq
+import sys
+import threading
+from array import array
 from datetime import datetime, timedelta
+from functools import wraps
 
 # ============== EXCEPCION PERSONALIZADA ==============
 
@@ -16,6 +21,8 @@ class SystemError(Exception):
 # ============== CLASES DEL SISTEMA ==============
 
 class Bicicleta:
+    __slots__ = ("id", "modelo", "precio_hora", "disponible", "estado")
+    
     def __init__(self, id_bici, modelo, precio_hora=5000):
         self.id = id_bici
         self.modelo = modelo
@@ -28,18 +35,22 @@ class Bicicleta:
         return f"Bicicleta {self.id} - {self.modelo} - {estado_disp} ({self.estado})"
 
 class Cliente:
+    __slots__ = ("id", "nombre", "telefono", "email", "fecha_registro")
+    
     def __init__(self, id_cliente, nombre, telefono, email=""):
         self.id = id_cliente
         self.nombre = nombre
         self.telefono = telefono
         self.email = email
         self.fecha_registro = datetime.now()
-        self.reservas_historicas = []
         
     def __str__(self):
         return f"Cliente {self.id} - {self.nombre} - Tel: {self.telefono}"
 
 class Reserva:
+    __slots__ = ("id", "cliente_id", "bicicleta_id", "horas", "fecha_reserva",
+                 "fecha_limite", "estado", "monto")
+    
     def __init__(self, id_reserva, cliente_id, bicicleta_id, horas):
         self.id = id_reserva
         self.cliente_id = cliente_id
@@ -53,14 +64,138 @@ class Reserva:
     def __str__(self):
         return f"Reserva {self.id} - Cliente: {self.cliente_id} - Estado: {self.estado} - Monto: ${self.monto}"
 
+class ArchivoReservas:
+    """
+    Reservas terminadas (Completadas o Canceladas) guardadas por columnas.
+
+    Cada campo es un array de tipo fijo en vez de un objeto por reserva:
+    unos 40 bytes por reserva en lugar de varios cientos. Los ids de cliente
+    y bicicleta se guardan como codigos enteros. Horas y monto van en
+    columnas "d" y se devuelven como int cuando son enteros, igual que al
+    crear la reserva.
+    - posicion: indexado por id de reserva -> fila en el archivo (-1 si no esta);
+      crece al doble cuando un id no cabe
+    - por_cliente: codigo de cliente -> filas de sus reservas
+    """
+    ESTADOS = ("Completada", "Cancelada")
+    
+    def __init__(self):
+        self.ids = array("q")
+        self.clientes = array("I")
+        self.bicicletas = array("I")
+        self.horas = array("d")
+        self.montos = array("d")
+        self.fechas = array("d")  # timestamp de fecha_reserva
+        self.estados = array("B")
+        self.posicion = array("i")
+        self.por_cliente = {}
+        self._codigos = {}   # id de cliente o bicicleta -> codigo
+        self._valores = []   # codigo -> id
+    
+    def __len__(self):
+        return len(self.ids)
+    
+    def memoria(self):
+        """Bytes aproximados que ocupan las columnas e indices del archivo."""
+        columnas = (self.ids, self.clientes, self.bicicletas, self.horas,
+                    self.montos, self.fechas, self.estados, self.posicion)
+        total = sum(sys.getsizeof(columna) for columna in columnas)
+        total += sys.getsizeof(self.por_cliente) + sum(sys.getsizeof(f) for f in self.por_cliente.values())
+        total += sys.getsizeof(self._codigos) + sys.getsizeof(self._valores)
+        return total
+    
+    def _codigo(self, valor):
+        codigo = self._codigos.get(valor)
+        if codigo is None:
+            codigo = self._codigos[valor] = len(self._valores)
+            self._valores.append(valor)
+        return codigo
+    
+    def agregar(self, reserva):
+        fila = len(self.ids)
+        cliente = self._codigo(reserva.cliente_id)
+        self.ids.append(reserva.id)
+        self.clientes.append(cliente)
+        self.bicicletas.append(self._codigo(reserva.bicicleta_id))
+        self.horas.append(reserva.horas)
+        self.montos.append(reserva.monto)
+        self.fechas.append(reserva.fecha_reserva.timestamp())
+        self.estados.append(self.ESTADOS.index(reserva.estado))
+        if reserva.id >= len(self.posicion):
+            faltan = max(reserva.id + 1, 2 * len(self.posicion)) - len(self.posicion)
+            self.posicion.extend(array("i", [-1]) * faltan)
+        self.posicion[reserva.id] = fila
+        self.por_cliente.setdefault(cliente, array("I")).append(fila)
+    
+    @staticmethod
+    def _numero(valor):
+        """Valor de una columna "d": int si es entero (5000.0 -> 5000)."""
+        return int(valor) if valor.is_integer() else valor
+    
+    def _reserva(self, fila):
+        """Arma un objeto Reserva (solo lectura) desde una fila del archivo."""
+        reserva = Reserva(self.ids[fila], self._valores[self.clientes[fila]],
+                          self._valores[self.bicicletas[fila]], self._numero(self.horas[fila]))
+        reserva.fecha_reserva = datetime.fromtimestamp(self.fechas[fila])
+        reserva.fecha_limite = reserva.fecha_reserva + timedelta(hours=1)
+        reserva.estado = self.ESTADOS[self.estados[fila]]
+        reserva.monto = self._numero(self.montos[fila])
+        return reserva
+    
+    def obtener(self, reserva_id):
+        if 0 <= reserva_id < len(self.posicion) and self.posicion[reserva_id] >= 0:
+            return self._reserva(self.posicion[reserva_id])
+        return None
+    
+    def filas_cliente(self, cliente_id):
+        codigo = self._codigos.get(cliente_id)
+        return self.por_cliente.get(codigo, ()) if codigo is not None else ()
+    
+    def historial_cliente(self, cliente_id, limite=None):
+        """Reservas terminadas del cliente, de la mas reciente a la mas antigua."""
+        filas = self.filas_cliente(cliente_id)
+        inicio = max(len(filas) - limite, 0) if limite is not None else 0
+        return [self._reserva(filas[i]) for i in range(len(filas) - 1, inicio - 1, -1)]
+    
+    def resumen_cliente(self, cliente_id):
+        """Totales del cliente sin armar objetos: completadas, canceladas y monto pagado."""
+        completadas = canceladas = 0
+        total = 0.0
+        for fila in self.filas_cliente(cliente_id):
+            if self.estados[fila] == 0:
+                completadas += 1
+                total += self.montos[fila]
+            else:
+                canceladas += 1
+        return {"completadas": completadas, "canceladas": canceladas, "monto_total": total}
+
+def sincronizado(metodo):
+    """Ejecuta el metodo con el candado del sistema (lo comparten el menu y el hilo de vencimientos)"""
+    @wraps(metodo)
+    def envoltura(self, *args, **kwargs):
+        with self._candado:
+            return metodo(self, *args, **kwargs)
+    return envoltura
+
 class SistemaBikeCity:
     def __init__(self):
         self.bicicletas = {}
         self.clientes = {}
-        self.reservas = {}
+        self.reservas = {}  # Solo las reservas en curso (Pendiente o Activa)
         self.reservas_activas = {}  # cliente_id -> reserva_id
+        # Completadas y canceladas salen de self.reservas y quedan aqui
+        self.archivo = ArchivoReservas()
         self.contador_reservas = 1
+        # Reservas pendientes ordenadas por fecha limite: (fecha_limite, reserva_id).
+        # Las que se pagan quedan en el heap y se descartan al salir (ya no estan Pendientes)
+        self.vencimientos = []
+        # Bicicletas libres por (modelo, estado): {("City Bike", "Bueno"): {"B002", ...}}
+        self.libres = {}
+        self._candado = threading.RLock()
+        self._hilo_vencimientos = None
+        self._detener_vencimientos = threading.Event()
         
+    @sincronizado
     def agregar_cliente(self, cliente):
         """Agrega un cliente al sistema con validaciones"""
         try:
@@ -79,6 +214,7 @@ class SistemaBikeCity:
         finally:
             print("Operacion de agregar cliente finalizada")
         
+    @sincronizado
     def agregar_bicicleta(self, bicicleta):
         """Agrega una bicicleta al sistema con validaciones"""
         try:
@@ -89,6 +225,8 @@ class SistemaBikeCity:
                 raise SystemError(f"Bicicleta {bicicleta.id} ya existe", "DUPLICADA")
                 
             self.bicicletas[bicicleta.id] = bicicleta
+            if bicicleta.disponible:
+                self._liberar(bicicleta)
             print(f"Bicicleta {bicicleta.id} agregada exitosamente")
             
         except (TypeError, SystemError) as e:
@@ -97,6 +235,57 @@ class SistemaBikeCity:
         finally:
             print(f"Operacion de agregar bicicleta finalizada")
     
+    # ---------- Disponibilidad por modelo ----------
+    
+    def _liberar(self, bicicleta):
+        bicicleta.disponible = True
+        self.libres.setdefault((bicicleta.modelo, bicicleta.estado), set()).add(bicicleta.id)
+    
+    def _ocupar(self, bicicleta):
+        bicicleta.disponible = False
+        clave = (bicicleta.modelo, bicicleta.estado)
+        libres = self.libres.get(clave)
+        if libres is not None:
+            libres.discard(bicicleta.id)
+            if not libres:
+                del self.libres[clave]
+    
+    @sincronizado
+    def cambiar_estado_bicicleta(self, bicicleta_id, estado):
+        """Cambia el estado (Bueno, Malo, Mantenimiento) manteniendo el registro de libres"""
+        if estado not in ("Bueno", "Malo", "Mantenimiento"):
+            raise ValueError(f"Estado invalido: {estado}")
+        if bicicleta_id not in self.bicicletas:
+            raise KeyError(f"Bicicleta {bicicleta_id} no existe")
+        bicicleta = self.bicicletas[bicicleta_id]
+        libre = bicicleta.disponible
+        if libre:
+            self._ocupar(bicicleta)
+        bicicleta.estado = estado
+        if libre:
+            self._liberar(bicicleta)
+        print(f"Bicicleta {bicicleta_id} ahora en estado {estado}")
+    
+    @sincronizado
+    def disponibles_por_modelo(self, estado="Bueno"):
+        """Cantidad de bicicletas libres por modelo: {"City Bike": 3, ...}"""
+        return {modelo: len(ids) for (modelo, estado_bici), ids in self.libres.items()
+                if estado_bici == estado}
+    
+    @sincronizado
+    def reservar_modelo(self, cliente_id, modelo, horas):
+        """
+        Reserva cualquier bicicleta libre en buen estado del modelo pedido.
+        Elegir la bicicleta y reservarla ocurre bajo el mismo candado: dos
+        clientes simultaneos nunca reciben la misma bicicleta.
+        """
+        libres = self.libres.get((modelo, "Bueno"))
+        if not libres:
+            print(f"Error de negocio: No hay bicicletas {modelo} disponibles")
+            raise SystemError(f"No hay bicicletas {modelo} disponibles", "SIN_DISPONIBLES")
+        return self.crear_reserva(cliente_id, next(iter(libres)), horas)
+    
+    @sincronizado
     def crear_reserva(self, cliente_id, bicicleta_id, horas):
         """Crear reserva con manejo multiple de excepciones"""
         
@@ -139,8 +328,8 @@ class SistemaBikeCity:
             # Registrar en sistema
             self.reservas[reserva.id] = reserva
             self.reservas_activas[cliente_id] = reserva.id
-            self.clientes[cliente_id].reservas_historicas.append(reserva.id)
-            bicicleta.disponible = False
+            heapq.heappush(self.vencimientos, (reserva.fecha_limite, reserva.id))
+            self._ocupar(bicicleta)
             self.contador_reservas += 1
             
             print(f"Reserva {reserva.id} creada - Monto: ${reserva.monto:,.0f}")
@@ -170,14 +359,14 @@ class SistemaBikeCity:
             conexion_activa = False
             print("Limpieza: Conexion cerrada")
     
+    @sincronizado
     def procesar_pago(self, reserva_id, monto_pagado):
         """Procesar pago con validacion de montos"""
         try:
-            if reserva_id not in self.reservas:
+            reserva = self.buscar_reserva(reserva_id)
+            if reserva is None:
                 raise KeyError(f"Reserva {reserva_id} no encontrada")
             
-            reserva = self.reservas[reserva_id]
-            
             if reserva.estado != "Pendiente":
                 raise SystemError(f"Reserva en estado {reserva.estado}, no se puede pagar", "ESTADO_INVALIDO")
             
@@ -197,18 +386,22 @@ class SistemaBikeCity:
         finally:
             print("Transaccion de pago finalizada")
     
+    @sincronizado
     def completar_reserva(self, reserva_id):
         """Completar reserva y liberar bicicleta"""
         try:
-            reserva = self.reservas[reserva_id]
+            reserva = self.buscar_reserva(reserva_id)
+            if reserva is None:
+                raise KeyError(reserva_id)
             
             if reserva.estado != "Activa":
                 raise SystemError(f"Reserva debe estar activa, esta: {reserva.estado}", "ESTADO_INVALIDO")
             
             # Liberar bicicleta
-            self.bicicletas[reserva.bicicleta_id].disponible = True
+            self._liberar(self.bicicletas[reserva.bicicleta_id])
             reserva.estado = "Completada"
             del self.reservas_activas[reserva.cliente_id]
+            self._archivar(reserva)
             
             print(f"Reserva {reserva_id} completada - Bicicleta liberada")
             
@@ -220,26 +413,62 @@ class SistemaBikeCity:
         finally:
             print("Operacion de completar finalizada")
     
-    def verificar_vencidas(self):
+    # ---------- Historial ----------
+    
+    def _archivar(self, reserva):
+        """Mueve una reserva terminada de self.reservas al archivo por columnas"""
+        self.archivo.agregar(reserva)
+        del self.reservas[reserva.id]
+    
+    def buscar_reserva(self, reserva_id):
+        """Reserva en curso o terminada (del archivo); None si no existe"""
+        reserva = self.reservas.get(reserva_id)
+        if reserva is None and isinstance(reserva_id, int):
+            reserva = self.archivo.obtener(reserva_id)
+        return reserva
+    
+    @sincronizado
+    def historial_cliente(self, cliente_id, limite=None):
+        """Reservas del cliente, de la mas reciente a la mas antigua (la en curso primero)"""
+        if cliente_id not in self.clientes:
+            raise KeyError(f"Cliente {cliente_id} no existe en el sistema")
+        en_curso = self.reservas_activas.get(cliente_id)
+        historial = [self.reservas[en_curso]] if en_curso else []
+        return historial + self.archivo.historial_cliente(
+            cliente_id, limite - len(historial) if limite is not None else None
+        )
+    
+    def _cancelar_vencidas(self, ahora):
+        """
+        Saca del heap las reservas con fecha limite anterior a `ahora` y
+        cancela las que siguen pendientes. Solo mira las k vencidas:
+        O(k log n), sin recorrer el historial. Devuelve los ids cancelados.
+        """
+        canceladas = []
+        while self.vencimientos and self.vencimientos[0][0] < ahora:
+            _, reserva_id = heapq.heappop(self.vencimientos)
+            reserva = self.reservas.get(reserva_id)
+            if reserva is None or reserva.estado != "Pendiente":
+                continue  # Pagada o ya cancelada
+            try:
+                self._liberar(self.bicicletas[reserva.bicicleta_id])
+                reserva.estado = "Cancelada"
+                if self.reservas_activas.get(reserva.cliente_id) == reserva_id:
+                    del self.reservas_activas[reserva.cliente_id]
+                self._archivar(reserva)
+                canceladas.append(reserva_id)
+                print(f"Reserva {reserva_id} cancelada por vencimiento")
+            except Exception as e:
+                print(f"Error cancelando reserva vencida {reserva_id}: {e}")
+        return canceladas
+    
+    @sincronizado
+    def verificar_vencidas(self, ahora=None):
         """Verificar y cancelar reservas no recogidas a tiempo"""
-        ahora = datetime.now()
         vencidas = []
         
         try:
-            for reserva in self.reservas.values():
-                if reserva.estado == "Pendiente" and ahora > reserva.fecha_limite:
-                    vencidas.append(reserva.id)
-            
-            for reserva_id in vencidas:
-                try:
-                    reserva = self.reservas[reserva_id]
-                    self.bicicletas[reserva.bicicleta_id].disponible = True
-                    reserva.estado = "Cancelada"
-                    if reserva.cliente_id in self.reservas_activas:
-                        del self.reservas_activas[reserva.cliente_id]
-                    print(f"Reserva {reserva_id} cancelada por vencimiento")
-                except Exception as e:
-                    print(f"Error cancelando reserva vencida {reserva_id}: {e}")
+            vencidas = self._cancelar_vencidas(ahora or datetime.now())
             
             if not vencidas:
                 print("No hay reservas vencidas")
@@ -248,7 +477,40 @@ class SistemaBikeCity:
             print(f"Error verificando vencidas: {e}")
         finally:
             print(f"Verificacion completada: {len(vencidas)} reservas procesadas")
+        return vencidas
+    
+    def iniciar_vencimientos(self, intervalo=30):
+        """
+        Inicia un hilo que cancela las reservas vencidas en segundo plano.
+        Despierta al llegar la fecha limite mas proxima (o cada `intervalo` segundos).
+        """
+        if self._hilo_vencimientos and self._hilo_vencimientos.is_alive():
+            return
+        self._detener_vencimientos.clear()
+        self._hilo_vencimientos = threading.Thread(
+            target=self._ciclo_vencimientos, args=(intervalo,),
+            name="vencimientos-bikecity", daemon=True
+        )
+        self._hilo_vencimientos.start()
     
+    def detener_vencimientos(self):
+        """Detiene el hilo de vencimientos y espera a que termine"""
+        self._detener_vencimientos.set()
+        if self._hilo_vencimientos:
+            self._hilo_vencimientos.join()
+            self._hilo_vencimientos = None
+    
+    def _ciclo_vencimientos(self, intervalo):
+        while not self._detener_vencimientos.is_set():
+            with self._candado:
+                self._cancelar_vencidas(datetime.now())
+                espera = intervalo
+                if self.vencimientos:
+                    hasta_proxima = (self.vencimientos[0][0] - datetime.now()).total_seconds()
+                    espera = min(intervalo, max(hasta_proxima, 0.01))
+            self._detener_vencimientos.wait(espera)
+    
+    @sincronizado
     def mostrar_estado(self):
         """Mostrar estado actual del sistema"""
         print("\n" + "="*40)
@@ -263,6 +525,10 @@ class SistemaBikeCity:
         for bici in self.bicicletas.values():
             print(f"  {bici}")
         
+        print("\nLIBRES POR MODELO:")
+        for modelo, cantidad in sorted(self.disponibles_por_modelo().items()):
+            print(f"  {modelo}: {cantidad}")
+        
         print(f"\nRESERVAS ACTIVAS ({len(self.reservas_activas)}):")
         for cliente_id, reserva_id in self.reservas_activas.items():
             reserva = self.reservas[reserva_id]
@@ -313,7 +579,9 @@ def mostrar_menu():
     print("5. Procesar pago")
     print("6. Completar reserva")
     print("7. Verificar reservas vencidas")
-    print("8. Salir")
+    print("8. Reservar cualquier bicicleta de un modelo")
+    print("9. Ver historial de cliente")
+    print("10. Salir")
     print("="*50)
 
 def main():
@@ -322,11 +590,12 @@ def main():
     print("="*40)
     
     sistema = inicializar_sistema()
+    sistema.iniciar_vencimientos()
     
     while True:
         try:
             mostrar_menu()
-            opcion = input("Seleccione una opcion (1-8): ").strip()
+            opcion = input("Seleccione una opcion (1-10): ").strip()
             
             if opcion == "1":
                 sistema.mostrar_estado()
@@ -395,11 +664,41 @@ def main():
                 sistema.verificar_vencidas()
                 
             elif opcion == "8":
+                print("\n--- RESERVAR POR MODELO ---")
+                for modelo, cantidad in sorted(sistema.disponibles_por_modelo().items()):
+                    print(f"  {modelo}: {cantidad} libres")
+                cliente_id = input("ID del cliente: ").strip()
+                modelo = input("Modelo: ").strip()
+                try:
+                    horas = float(input("Horas a reservar: "))
+                    reserva_id = sistema.reservar_modelo(cliente_id, modelo, horas)
+                    print(f"Reserva creada con ID: {reserva_id} (bicicleta {sistema.reservas[reserva_id].bicicleta_id})")
+                except ValueError:
+                    print("Error: Horas debe ser numerico")
+                except Exception as e:
+                    print(f"Error: {e}")
+                    
+            elif opcion == "9":
+                print("\n--- HISTORIAL DE CLIENTE ---")
+                cliente_id = input("ID del cliente: ").strip()
+                try:
+                    historial = sistema.historial_cliente(cliente_id, limite=20)
+                    resumen = sistema.archivo.resumen_cliente(cliente_id)
+                    print(f"Completadas: {resumen['completadas']} - Canceladas: {resumen['canceladas']}"
+                          f" - Total pagado: ${resumen['monto_total']:,.0f}")
+                    for reserva in historial:
+                        print(f"  {reserva} - {reserva.fecha_reserva.strftime('%d/%m/%Y %H:%M')}")
+                    if not historial:
+                        print("El cliente no tiene reservas")
+                except Exception as e:
+                    print(f"Error: {e}")
+                    
+            elif opcion == "10":
                 print("\nGracias por usar BIKECITY. ¡Hasta pronto!")
                 break
                 
             else:
-                print("Opcion invalida. Seleccione del 1 al 8.")
+                print("Opcion invalida. Seleccione del 1 al 10.")
                 
             input("\nPresione ENTER para continuar...")
             
@@ -409,6 +708,8 @@ def main():
         except Exception as e:
             print(f"Error inesperado: {e}")
             input("Presione ENTER para continuar...")
+    
+    sistema.detener_vencimientos()
 
 if __name__ == "__main__":
     main()
@@ -8,6 +8,6 @@ class EventoAdmin(admin.ModelAdmin):
     """
     Configuración del panel de administración para Evento
     """
-    list_display = ('titulo', 'fecha_inicio', 'fecha_fin', 'ubicacion', 'autor')
+    list_display = ('titulo', 'fecha_inicio', 'fecha_fin', 'ubicacion', 'autor', 'participantes_count', 'capacidad')
     list_filter = ('fecha_inicio', 'ubicacion', 'autor')
     ordering = ('-fecha_inicio',)
@@ -0,0 +1,112 @@
+"""
+Consultas de eventos por fecha: paginación por clave y resumen mensual
+para calendarios.
+"""
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import Evento
+
+EVENTOS_POR_PAGINA = 20
+
+_EPOCA = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+# Límites del cursor: fechas que datetime puede representar e ids de BigAutoField
+_MICROSEGUNDOS_MIN = (datetime(1, 1, 2, tzinfo=dt_timezone.utc) - _EPOCA) // timedelta(microseconds=1)
+_MICROSEGUNDOS_MAX = (datetime(9999, 12, 30, tzinfo=dt_timezone.utc) - _EPOCA) // timedelta(microseconds=1)
+_PK_MAX = 2 ** 63 - 1
+# Años que aceptan las vistas por fecha: el rango de diciembre termina el
+# 1 de enero del año siguiente, que datetime tiene que poder representar
+ANIO_MIN, ANIO_MAX = 1, 9998
+_VERSION_CALENDARIO = 'eventos:calendario:version'
+# El resumen se invalida al guardar/eliminar eventos; el tiempo es solo un tope
+DURACION_CALENDARIO = 60 * 60
+
+
+def codificar_cursor(evento):
+    """Cursor de página: microsegundos de fecha_inicio y id del último evento."""
+    microsegundos = (evento.fecha_inicio - _EPOCA) // timedelta(microseconds=1)
+    return f'{microsegundos}_{evento.pk}'
+
+
+def decodificar_cursor(cursor):
+    """Devuelve (fecha_inicio, pk) o None si el cursor no es válido."""
+    try:
+        microsegundos, pk = (int(parte) for parte in cursor.split('_'))
+    except (AttributeError, ValueError):
+        return None
+    if not (_MICROSEGUNDOS_MIN <= microsegundos <= _MICROSEGUNDOS_MAX and 0 <= pk <= _PK_MAX):
+        return None
+    try:
+        return _EPOCA + timedelta(microseconds=microsegundos), pk
+    except OverflowError:
+        return None
+
+
+def paginar(queryset, cantidad=EVENTOS_POR_PAGINA):
+    """
+    Primera página de `queryset` (ordenado con por_fecha() y, si corresponde,
+    filtrado con despues_de()). Retorna (eventos, cursor_siguiente);
+    cursor_siguiente es None en la última página. Se pide un evento de más
+    para saber si hay otra página, así no hace falta un COUNT(*).
+    """
+    eventos = list(queryset[:cantidad + 1])
+    if len(eventos) > cantidad:
+        return eventos[:cantidad], codificar_cursor(eventos[cantidad - 1])
+    return eventos, None
+
+
+def validar_anio(anio):
+    """ValueError si `anio` está fuera de ANIO_MIN..ANIO_MAX."""
+    if not ANIO_MIN <= anio <= ANIO_MAX:
+        raise ValueError(f'Año fuera de rango: {anio}')
+
+
+def rango_del_mes(anio, mes):
+    """
+    Inicio del mes y del mes siguiente, en la zona horaria activa.
+    ValueError si el año o el mes no son válidos.
+    """
+    validar_anio(anio)
+    zona = timezone.get_current_timezone()
+    desde = datetime(anio, mes, 1, tzinfo=zona)
+    hasta = datetime(anio + mes // 12, mes % 12 + 1, 1, tzinfo=zona)
+    return desde, hasta
+
+
+def conteo_por_mes(anio):
+    """
+    {mes: eventos que comienzan ese mes} para `anio`, con los 12 meses.
+    Una sola consulta sobre el índice de fecha_inicio; el resultado
+    queda en caché hasta que se crea, edita o elimina un evento.
+    ValueError si el año está fuera de ANIO_MIN..ANIO_MAX.
+    """
+    validar_anio(anio)
+    version = cache.get_or_set(_VERSION_CALENDARIO, time.time_ns, None)
+    clave = f'eventos:calendario:{version}:{anio}'
+    conteo = cache.get(clave)
+    if conteo is None:
+        # Un COUNT filtrado por rango de cada mes: recorre solo el índice, sin
+        # convertir cada fecha a la zona horaria para extraer el mes
+        meses = {mes: rango_del_mes(anio, mes) for mes in range(1, 13)}
+        totales = Evento.objects.filter(
+            fecha_inicio__gte=meses[1][0], fecha_inicio__lt=meses[12][1]
+        ).aggregate(**{
+            f'mes_{mes}': Count('id', filter=Q(fecha_inicio__gte=desde, fecha_inicio__lt=hasta))
+            for mes, (desde, hasta) in meses.items()
+        })
+        conteo = {mes: totales[f'mes_{mes}'] for mes in meses}
+        cache.set(clave, conteo, DURACION_CALENDARIO)
+    return conteo
+
+
+def invalidar_calendario():
+    """Descarta los resúmenes mensuales guardados (todas las claves a la vez)."""
+    try:
+        cache.incr(_VERSION_CALENDARIO)
+    except ValueError:
+        # La versión no estaba (caché reiniciada): una nueva no choca con claves viejas
+        cache.set(_VERSION_CALENDARIO, time.time_ns(), None)
@@ -4,7 +4,7 @@ from .models import Evento
 class EventoForm(forms.ModelForm):
     class Meta:
         model = Evento
-        fields = ['titulo', 'descripcion', 'fecha_inicio', 'fecha_fin', 'ubicacion']
+        fields = ['titulo', 'descripcion', 'fecha_inicio', 'fecha_fin', 'ubicacion', 'capacidad']
         widgets = {
             'titulo': forms.TextInput(attrs={
                 'class': 'form-control form-control-lg',
@@ -27,6 +27,11 @@ class EventoForm(forms.ModelForm):
                 'class': 'form-control',
                 'placeholder': 'Ubicación del evento'
             }),
+            'capacidad': forms.NumberInput(attrs={
+                'class': 'form-control',
+                'min': 1,
+                'placeholder': 'Sin límite'
+            }),
         }
         labels = {
             'titulo': 'Título',
@@ -34,4 +39,14 @@ class EventoForm(forms.ModelForm):
             'fecha_inicio': 'Fecha y Hora de Inicio',
             'fecha_fin': 'Fecha y Hora de Término',
             'ubicacion': 'Ubicación',
+            'capacidad': 'Capacidad máxima',
         }
+
+    def clean_capacidad(self):
+        capacidad = self.cleaned_data.get('capacidad')
+        inscritos = self.instance.participantes_count if self.instance.pk else 0
+        if capacidad is not None and capacidad < inscritos:
+            raise forms.ValidationError(
+                f'Ya hay {inscritos} participantes inscritos; la capacidad no puede ser menor.'
+            )
+        return capacidad
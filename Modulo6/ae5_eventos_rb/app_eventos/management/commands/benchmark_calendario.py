@@ -0,0 +1,86 @@
+import time
+from datetime import timedelta
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from app_eventos import consultas
+from app_eventos.models import Evento
+
+
+class Deshacer(Exception):
+    """Se lanza al final para descartar los datos sintéticos."""
+
+
+class Command(BaseCommand):
+    help = (
+        'Crea años de eventos y compara la paginación con OFFSET contra la '
+        'paginación por clave, y el resumen por mes con y sin caché'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--eventos', type=int, default=200000)
+        parser.add_argument('--anios', type=int, default=10)
+        parser.add_argument('--repeticiones', type=int, default=20)
+        parser.add_argument('--conservar', action='store_true',
+                            help='Deja los datos sintéticos en la base (por defecto se deshacen)')
+
+    def preparar(self, cantidad, anios):
+        autor = User.objects.create_user('benchmark_calendario')
+        inicio = timezone.now() - timedelta(days=365 * anios // 2)
+        paso = timedelta(days=365 * anios) / cantidad
+        Evento.objects.bulk_create([
+            Evento(titulo=f'Evento {i}', descripcion='Benchmark', ubicacion='Online', autor=autor,
+                   fecha_inicio=inicio + paso * i, fecha_fin=inicio + paso * i + timedelta(hours=2))
+            for i in range(cantidad)
+        ], batch_size=5000)
+
+    def medir(self, nombre, repeticiones, funcion):
+        inicio = time.perf_counter()
+        for _ in range(repeticiones):
+            funcion()
+        promedio = (time.perf_counter() - inicio) / repeticiones
+        self.stdout.write(f'{nombre:42} {promedio * 1000:10.2f} ms')
+
+    def handle(self, *args, **opciones):
+        try:
+            with transaction.atomic():
+                self.ejecutar(opciones)
+                if not opciones['conservar']:
+                    raise Deshacer()
+        except Deshacer:
+            self.stdout.write('Datos sintéticos descartados')
+
+    def ejecutar(self, opciones):
+        inicio = time.perf_counter()
+        self.preparar(opciones['eventos'], opciones['anios'])
+        self.stdout.write(f'{opciones["eventos"]} eventos en {opciones["anios"]} años '
+                          f'creados en {time.perf_counter() - inicio:.1f} s')
+
+        proximos = Evento.objects.con_participantes().proximos()
+        por_pagina = consultas.EVENTOS_POR_PAGINA
+        # Una página profunda: la última de los eventos próximos
+        total = proximos.count()
+        desplazamiento = max(total - por_pagina, 0)
+        ultimo = proximos[desplazamiento - 1]
+        por_clave = (Evento.objects.con_participantes()
+                     .despues_de(ultimo.fecha_inicio, ultimo.pk).proximos())
+
+        repeticiones = opciones['repeticiones']
+        self.medir('Lista completa (versión anterior)', max(repeticiones // 10, 1),
+                   lambda: list(Evento.objects.con_participantes()))
+        self.medir(f'Página {total // por_pagina} con OFFSET', repeticiones,
+                   lambda: list(proximos[desplazamiento:desplazamiento + por_pagina]))
+        self.medir(f'Página {total // por_pagina} por clave', repeticiones,
+                   lambda: consultas.paginar(por_clave))
+
+        anio = timezone.localtime().year
+
+        def sin_cache():
+            cache.clear()
+            consultas.conteo_por_mes(anio)
+
+        self.medir('Resumen por mes (consulta)', repeticiones, sin_cache)
+        self.medir('Resumen por mes (caché)', repeticiones, lambda: consultas.conteo_por_mes(anio))
+        self.stdout.write(self.style.SUCCESS('Benchmark finalizado'))
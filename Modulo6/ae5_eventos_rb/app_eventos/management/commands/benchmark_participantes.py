@@ -0,0 +1,86 @@
+import time
+from datetime import timedelta
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from app_eventos import servicios
+from app_eventos.models import Evento
+
+
+class Deshacer(Exception):
+    """Se lanza al final para descartar los datos sintéticos."""
+
+
+class Command(BaseCommand):
+    help = (
+        'Crea un evento con muchos participantes y compara unirse/salirse cargando '
+        'la lista completa (versión anterior) contra app_eventos.servicios'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--participantes', type=int, default=100000)
+        parser.add_argument('--repeticiones', type=int, default=20)
+        parser.add_argument('--conservar', action='store_true',
+                            help='Deja los datos sintéticos en la base (por defecto se deshacen)')
+
+    def preparar(self, cantidad):
+        autor = User.objects.create_user('benchmark_autor')
+        inicio = timezone.now() + timedelta(days=7)
+        evento = Evento.objects.create(
+            titulo='Evento masivo', descripcion='Benchmark', ubicacion='Estadio',
+            fecha_inicio=inicio, fecha_fin=inicio + timedelta(hours=3), autor=autor,
+        )
+        # bulk_create no dispara señales: el contador se fija al final
+        usuarios = User.objects.bulk_create(
+            [User(username=f'benchmark_{i}') for i in range(cantidad + 1)], batch_size=5000
+        )
+        servicios.Participacion.objects.bulk_create(
+            [servicios.Participacion(evento_id=evento.pk, user_id=u.pk) for u in usuarios[:cantidad]],
+            batch_size=5000,
+        )
+        servicios.recalcular_participantes([evento.pk])
+        evento.refresh_from_db()
+        return evento, usuarios[cantidad]
+
+    def medir(self, nombre, repeticiones, funcion):
+        inicio = time.perf_counter()
+        for _ in range(repeticiones):
+            funcion()
+        promedio = (time.perf_counter() - inicio) / repeticiones
+        self.stdout.write(f'{nombre:38} {promedio * 1000:10.2f} ms por unirse+salirse')
+
+    def handle(self, *args, **opciones):
+        try:
+            with transaction.atomic():
+                self.ejecutar(opciones)
+                if not opciones['conservar']:
+                    raise Deshacer()
+        except Deshacer:
+            self.stdout.write('Datos sintéticos descartados')
+
+    def ejecutar(self, opciones):
+        cantidad = opciones['participantes']
+        inicio = time.perf_counter()
+        evento, usuario = self.preparar(cantidad)
+        self.stdout.write(f'Evento con {evento.participantes_count} participantes '
+                          f'creado en {time.perf_counter() - inicio:.1f} s')
+
+        def anterior():
+            # Versión anterior: carga todos los participantes para revisar uno
+            for _ in range(2):
+                if usuario in evento.participantes.all():
+                    evento.participantes.remove(usuario)
+                else:
+                    evento.participantes.add(usuario)
+
+        def con_servicio():
+            servicios.unirse(evento, usuario)
+            servicios.salirse(evento, usuario)
+
+        self.medir('participantes.all() + add/remove', opciones['repeticiones'], anterior)
+        self.medir('servicios.unirse / servicios.salirse', opciones['repeticiones'], con_servicio)
+
+        evento.refresh_from_db()
+        assert evento.participantes_count == evento.participantes.count() == cantidad
+        self.stdout.write(self.style.SUCCESS('Benchmark finalizado'))
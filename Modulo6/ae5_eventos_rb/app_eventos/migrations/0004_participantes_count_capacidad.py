@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:29
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def contar_participantes(apps, schema_editor):
+    Evento = apps.get_model('app_eventos', 'Evento')
+    for evento_id, total in Evento.objects.annotate(total=Count('participantes')).values_list('id', 'total'):
+        Evento.objects.filter(pk=evento_id).update(participantes_count=total)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_eventos', '0003_evento_participantes_alter_evento_autor'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='evento',
+            name='capacidad',
+            field=models.PositiveIntegerField(blank=True, help_text='Vacío = sin límite', null=True),
+        ),
+        migrations.AddField(
+            model_name='evento',
+            name='participantes_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(contar_participantes, migrations.RunPython.noop),
+    ]
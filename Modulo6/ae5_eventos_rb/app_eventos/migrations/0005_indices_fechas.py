@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:35
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_eventos', '0004_participantes_count_capacidad'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='evento',
+            index=models.Index(fields=['fecha_inicio', 'id'], name='evento_inicio_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='evento',
+            index=models.Index(fields=['fecha_fin'], name='evento_fin_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='evento',
+            index=models.Index(fields=['autor', 'fecha_inicio'], name='evento_autor_inicio_idx'),
+        ),
+    ]
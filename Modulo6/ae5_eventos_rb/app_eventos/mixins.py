@@ -0,0 +1,100 @@
+"""
+Mixins de propiedad y permisos para las vistas de eventos.
+
+Todos comparten el mismo objeto y el mismo conjunto de permisos durante la
+request: el evento se consulta una sola vez aunque lo pidan el chequeo de
+autor, el manejo de errores y la vista genérica (UpdateView / DeleteView).
+"""
+from django.contrib import messages
+from django.contrib.auth.mixins import PermissionRequiredMixin, UserPassesTestMixin
+from django.db.models import Q
+from django.http import Http404
+from django.shortcuts import redirect
+from django.contrib.auth.models import Permission
+
+# Valor de permisos_del_usuario para superusuarios: tienen todos los permisos
+TODOS_LOS_PERMISOS = object()
+
+
+def permisos_del_usuario(request):
+    """
+    Permisos del usuario de la request como {'app_label.codename', ...}.
+    Se calculan con una sola consulta (propios + de sus grupos) y quedan
+    guardados en la request para el resto de los chequeos.
+    """
+    if not hasattr(request, '_permisos_usuario'):
+        user = request.user
+        if not user.is_active or not user.is_authenticated:
+            permisos = set()
+        elif user.is_superuser:
+            permisos = TODOS_LOS_PERMISOS
+        else:
+            permisos = {
+                f'{app_label}.{codename}'
+                for app_label, codename in Permission.objects.filter(
+                    Q(user=user) | Q(group__user=user)
+                ).values_list('content_type__app_label', 'codename').distinct()
+            }
+        request._permisos_usuario = permisos
+    return request._permisos_usuario
+
+
+class ObjetoUnicoMixin:
+    """
+    Guarda el resultado de get_object() durante la request. Si el objeto no
+    existe, también se recuerda el 404 para no volver a consultar.
+    """
+
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return super().get_object(queryset)
+        if not hasattr(self, '_objeto_cacheado'):
+            try:
+                self._objeto_cacheado = super().get_object()
+            except Http404 as error:
+                self._objeto_cacheado = error
+        if isinstance(self._objeto_cacheado, Http404):
+            raise self._objeto_cacheado
+        return self._objeto_cacheado
+
+
+class PermisosPorRequestMixin(PermissionRequiredMixin):
+    """PermissionRequiredMixin que usa permisos_del_usuario en vez de user.has_perms."""
+
+    def has_permission(self):
+        permisos = permisos_del_usuario(self.request)
+        if permisos is TODOS_LOS_PERMISOS:
+            return True
+        return all(permiso in permisos for permiso in self.get_permission_required())
+
+
+# Mixin personalizado para verificar que el usuario es el autor del evento
+class AutorRequeridoMixin(ObjetoUnicoMixin, UserPassesTestMixin):
+    """
+    Mixin que verifica que el usuario autenticado sea el autor del evento.
+    Maneja correctamente el caso cuando el evento no existe.
+    """
+    raise_exception = False  # Para poder redirigir en lugar de mostrar 403/404
+
+    def test_func(self):
+        """
+        Verifica que el evento existe y pertenece al usuario actual.
+        Compara autor_id para no consultar el autor.
+        """
+        try:
+            evento = self.get_object()
+        except Http404:
+            return False
+        return evento.autor_id is not None and evento.autor_id == self.request.user.pk
+
+    def handle_no_permission(self):
+        """
+        Maneja cuando el evento no existe o no pertenece al usuario.
+        """
+        try:
+            self.get_object()
+            messages.error(self.request, '🚫 No tienes permiso para realizar esta acción en este evento.')
+        except Http404:
+            messages.error(self.request, '🚫 El evento que buscas no existe o no tienes acceso a él.')
+
+        return redirect('acceso_denegado')
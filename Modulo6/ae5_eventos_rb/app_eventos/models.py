@@ -1,6 +1,70 @@
 from django.db import models
+from django.db.models import Prefetch
+from django.utils import timezone
 from django.contrib.auth.models import User
 
+
+class EventoQuerySet(models.QuerySet):
+    def con_participantes(self):
+        """
+        Trae el autor en la misma consulta. El total de participantes ya viene
+        en la columna participantes_count, no hace falta contarlos.
+        """
+        return self.select_related('autor')
+
+    # Consultas por fecha. Todas ordenan por (fecha_inicio, id), el mismo
+    # orden del índice evento_inicio_id_idx, para paginar con despues_de()
+
+    def por_fecha(self):
+        return self.order_by('fecha_inicio', 'id')
+
+    def proximos(self, ahora=None):
+        """Eventos que aún no comienzan"""
+        return self.filter(fecha_inicio__gte=ahora or timezone.now()).por_fecha()
+
+    def en_curso(self, ahora=None):
+        """Eventos que ya comenzaron y todavía no terminan"""
+        ahora = ahora or timezone.now()
+        return self.filter(fecha_inicio__lte=ahora, fecha_fin__gt=ahora).por_fecha()
+
+    def en_rango(self, desde, hasta):
+        """Eventos que ocurren (aunque sea en parte) entre `desde` y `hasta`"""
+        return self.filter(fecha_inicio__lt=hasta, fecha_fin__gt=desde).por_fecha()
+
+    def despues_de(self, fecha_inicio, pk):
+        """
+        Paginación por clave (keyset): eventos que van después de
+        (fecha_inicio, pk). A diferencia de OFFSET, el costo no crece con el
+        número de página.
+        """
+        # fecha_inicio >= x como condición propia (y no dentro de un OR) para
+        # que la base la use como límite del recorrido del índice
+        return self.filter(fecha_inicio__gte=fecha_inicio).exclude(fecha_inicio=fecha_inicio, id__lte=pk)
+
+    def con_primeros_participantes(self, cantidad=5):
+        """Precarga los primeros `cantidad` participantes de cada evento en `primeros_participantes`"""
+        return self.prefetch_related(Prefetch(
+            'participantes',
+            queryset=User.objects.order_by('username')[:cantidad],
+            to_attr='primeros_participantes',
+        ))
+
+
+def ids_eventos_participando(user):
+    """
+    Conjunto con los ids de los eventos en los que participa `user`.
+    Se calcula una vez por request y queda guardado en el usuario, así
+    esta_participando no consulta la base para cada evento de una lista.
+    """
+    if not user.is_authenticated:
+        return set()
+    if not hasattr(user, '_ids_eventos_participando'):
+        user._ids_eventos_participando = set(
+            user.eventos_participando.values_list('id', flat=True)
+        )
+    return user._ids_eventos_participando
+
+
 # Create your models here.
 class Evento(models.Model):
     titulo = models.CharField(max_length=200)
@@ -10,14 +74,44 @@ class Evento(models.Model):
     ubicacion = models.CharField(max_length=300)
     autor = models.ForeignKey(User, on_delete=models.CASCADE, null=True, related_name='eventos_creados')
     participantes = models.ManyToManyField(User, related_name='eventos_participando', blank=True)
+    # Copia del total de participantes, mantenida por app_eventos.servicios y
+    # por la señal m2m_changed (para add/remove directos y el admin)
+    participantes_count = models.PositiveIntegerField(default=0, editable=False)
+    capacidad = models.PositiveIntegerField(null=True, blank=True, help_text='Vacío = sin límite')
+
+    objects = EventoQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['fecha_inicio', 'id'], name='evento_inicio_id_idx'),
+            models.Index(fields=['fecha_fin'], name='evento_fin_idx'),
+            models.Index(fields=['autor', 'fecha_inicio'], name='evento_autor_inicio_idx'),
+        ]
 
     def __str__(self):
         return self.titulo
-    
+
+    def save(self, *args, **kwargs):
+        # participantes_count solo se cambia con UPDATE ... F() (servicios.py y
+        # signals.py); editar el evento desde una instancia leída antes de una
+        # inscripción no debe pisar el contador
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                campo.attname for campo in self._meta.concrete_fields
+                if not campo.primary_key and campo.attname != 'participantes_count'
+            ]
+        super().save(*args, **kwargs)
+
     def total_participantes(self):
-        """Retorna el número total de participantes"""
-        return self.participantes.count()
-    
+        """Retorna el número total de participantes (sin consultar la base)"""
+        return self.participantes_count
+
+    def esta_lleno(self):
+        return self.capacidad is not None and self.participantes_count >= self.capacidad
+
     def esta_participando(self, user):
         """Verifica si un usuario está participando en el evento"""
-        return self.participantes.filter(id=user.id).exists()
\ No newline at end of file
+        ids = getattr(user, '_ids_eventos_participando', None)
+        if ids is not None:
+            return self.pk in ids
+        return self.participantes.filter(id=user.id).exists()
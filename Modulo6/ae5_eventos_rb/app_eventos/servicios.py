@@ -0,0 +1,64 @@
+"""
+Inscripción y retiro de participantes en eventos.
+
+La pertenencia se verifica con una búsqueda por (evento, usuario) en la
+tabla intermedia, que tiene índice único, sin cargar la lista de
+participantes. El contador participantes_count se actualiza con F() en la
+misma transacción que la fila intermedia, y el cupo se reserva con un
+UPDATE condicional (... WHERE participantes_count < capacidad): dos
+inscripciones simultáneas nunca superan la capacidad.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from .models import Evento
+
+Participacion = Evento.participantes.through
+
+UNIDO = 'unido'
+YA_PARTICIPA = 'ya_participa'
+EVENTO_LLENO = 'evento_lleno'
+RETIRADO = 'retirado'
+NO_PARTICIPABA = 'no_participaba'
+
+
+def esta_participando(evento_id, user_id):
+    return Participacion.objects.filter(evento_id=evento_id, user_id=user_id).exists()
+
+
+def unirse(evento, user):
+    """
+    Inscribe a `user` en `evento`. Devuelve UNIDO, YA_PARTICIPA o EVENTO_LLENO.
+    """
+    if esta_participando(evento.pk, user.pk):
+        return YA_PARTICIPA
+    try:
+        with transaction.atomic():
+            reservado = Evento.objects.filter(
+                Q(capacidad__isnull=True) | Q(participantes_count__lt=F('capacidad')),
+                pk=evento.pk,
+            ).update(participantes_count=F('participantes_count') + 1)
+            if not reservado:
+                return EVENTO_LLENO
+            Participacion.objects.create(evento_id=evento.pk, user_id=user.pk)
+    except IntegrityError:
+        # Otra request del mismo usuario se inscribió primero; el cupo se revierte con la transacción
+        return YA_PARTICIPA
+    return UNIDO
+
+
+def salirse(evento, user):
+    """Retira a `user` de `evento`. Devuelve RETIRADO o NO_PARTICIPABA."""
+    with transaction.atomic():
+        borrados, _ = Participacion.objects.filter(evento_id=evento.pk, user_id=user.pk).delete()
+        if not borrados:
+            return NO_PARTICIPABA
+        Evento.objects.filter(pk=evento.pk).update(participantes_count=F('participantes_count') - 1)
+    return RETIRADO
+
+
+def recalcular_participantes(eventos_ids):
+    """Vuelve a contar los participantes de los eventos indicados (una consulta por evento)"""
+    for evento_id in eventos_ids:
+        Evento.objects.filter(pk=evento_id).update(
+            participantes_count=Participacion.objects.filter(evento_id=evento_id).count()
+        )
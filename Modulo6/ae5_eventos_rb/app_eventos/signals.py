@@ -0,0 +1,62 @@
+from django.db.models import F
+from django.contrib.auth.models import User
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from .consultas import invalidar_calendario
+from .models import Evento
+from .servicios import Participacion, recalcular_participantes
+
+
+@receiver(m2m_changed, sender=Evento.participantes.through)
+def actualizar_participantes_count(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Mantiene participantes_count cuando se usa evento.participantes.add/remove/clear
+    (o user.eventos_participando) directamente, por ejemplo desde el admin.
+    """
+    if action == 'pre_clear' and reverse:
+        # Después del clear ya no se sabe en qué eventos estaba el usuario
+        instance._eventos_antes_de_limpiar = list(
+            sender.objects.filter(user_id=instance.pk).values_list('evento_id', flat=True)
+        )
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        if action == 'post_add':
+            # En post_add, pk_set solo trae los usuarios realmente agregados
+            if pk_set:
+                Evento.objects.filter(pk=instance.pk).update(
+                    participantes_count=F('participantes_count') + len(pk_set)
+                )
+        else:
+            recalcular_participantes([instance.pk])
+        instance.refresh_from_db(fields=['participantes_count'])
+        return
+
+    # Lado del usuario: pk_set son ids de eventos
+    if action == 'post_add':
+        Evento.objects.filter(pk__in=pk_set or ()).update(participantes_count=F('participantes_count') + 1)
+    elif action == 'post_remove':
+        recalcular_participantes(pk_set or ())
+    else:
+        recalcular_participantes(getattr(instance, '_eventos_antes_de_limpiar', ()))
+
+
+@receiver(pre_delete, sender=User)
+def recordar_eventos_del_usuario(sender, instance, **kwargs):
+    # Al eliminar un usuario sus filas intermedias se borran en cascada, sin m2m_changed
+    instance._eventos_antes_de_eliminar = list(
+        Participacion.objects.filter(user_id=instance.pk).values_list('evento_id', flat=True)
+    )
+
+
+@receiver(post_delete, sender=User)
+def descontar_usuario_eliminado(sender, instance, **kwargs):
+    recalcular_participantes(getattr(instance, '_eventos_antes_de_eliminar', ()))
+
+
+@receiver([post_save, post_delete], sender=Evento)
+def actualizar_calendario(sender, **kwargs):
+    """Un evento nuevo, editado o eliminado cambia el resumen por mes."""
+    invalidar_calendario()
@@ -1,3 +1,364 @@
-from django.test import TestCase
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
 
-# Create your tests here.
+from django.contrib.auth.models import Group, Permission, User
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.db import connection, OperationalError
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import consultas, servicios
+from .forms import EventoForm
+from .models import Evento
+
+# Caché propia de cada proceso de pruebas: settings.py usa una caché en archivo
+# compartida que sobrevive entre corridas
+CACHE_LOCAL = override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+
+
+def crear_evento(autor, **extra):
+    inicio = timezone.now() + timedelta(days=1)
+    return Evento.objects.create(titulo='Charla', descripcion='', ubicacion='Online',
+                                 fecha_inicio=inicio, fecha_fin=inicio + timedelta(hours=1),
+                                 autor=autor, **extra)
+
+
+@CACHE_LOCAL
+class ConsultasListasEventosTest(TestCase):
+    """
+    Las listas de eventos deben hacer una cantidad fija de consultas, sin
+    importar cuántos eventos o participantes haya.
+    """
+    EVENTOS = 60
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.autor = User.objects.create_user('organizador', password='clave')
+        cls.usuario = User.objects.create_user('asistente', password='clave')
+        otros = [User.objects.create_user(f'persona{i}', password='clave') for i in range(8)]
+        inicio = timezone.now() + timedelta(days=1)
+        cls.eventos = Evento.objects.bulk_create([
+            Evento(titulo=f'Evento {i}', descripcion='Descripción', ubicacion='Santiago',
+                   fecha_inicio=inicio + timedelta(days=i), fecha_fin=inicio + timedelta(days=i, hours=2),
+                   autor=cls.autor)
+            for i in range(cls.EVENTOS)
+        ])
+        for i, evento in enumerate(cls.eventos):
+            evento.participantes.add(*otros[:i % len(otros)])
+            if i % 3 == 0:
+                evento.participantes.add(cls.usuario)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_lista_eventos(self):
+        self.client.force_login(self.usuario)
+        # sesión + usuario + página de eventos + ids en los que participa + resumen por mes
+        with self.assertNumQueries(5):
+            respuesta = self.client.get(reverse('lista_eventos'))
+        self.assertEqual(len(respuesta.context['eventos']), consultas.EVENTOS_POR_PAGINA)
+        self.assertContains(respuesta, 'Salirse del Evento', count=7)
+
+        # El resumen por mes ya está en caché
+        with self.assertNumQueries(4):
+            self.client.get(reverse('lista_eventos'))
+
+    def test_mis_eventos(self):
+        self.client.force_login(self.autor)
+        # sesión + usuario + eventos con conteo + primeros participantes
+        with self.assertNumQueries(4):
+            respuesta = self.client.get(reverse('mis_eventos'))
+        evento = respuesta.context['eventos'][6]
+        self.assertEqual(evento.total_participantes(), 7)
+        self.assertEqual(len(evento.primeros_participantes), 5)
+
+    def test_participantes_evento(self):
+        self.client.force_login(self.autor)
+        evento = self.eventos[3]
+        with self.assertNumQueries(4):
+            respuesta = self.client.get(reverse('participantes_evento', args=[evento.pk]))
+        self.assertEqual(len(respuesta.context['participantes']), 4)
+
+    def test_info_usuario(self):
+        self.client.force_login(self.autor)
+        with self.assertNumQueries(4):
+            respuesta = self.client.get(reverse('info_usuario'))
+        self.assertEqual(respuesta.context['total_eventos_creados'], self.EVENTOS)
+
+    def test_metodos_sin_anotacion_siguen_funcionando(self):
+        evento = Evento.objects.get(pk=self.eventos[3].pk)
+        self.assertEqual(evento.total_participantes(), 4)
+        self.assertTrue(evento.esta_participando(self.usuario))
+        self.assertFalse(evento.esta_participando(self.autor))
+
+
+@CACHE_LOCAL
+class InscripcionTest(TestCase):
+
+    def setUp(self):
+        self.autor = User.objects.create_user('autor', password='clave')
+        self.usuarios = [User.objects.create_user(f'u{i}', password='clave') for i in range(3)]
+        self.evento = crear_evento(self.autor, capacidad=2)
+
+    def test_contador_y_capacidad(self):
+        u0, u1, u2 = self.usuarios
+        self.assertEqual(servicios.unirse(self.evento, u0), servicios.UNIDO)
+        self.assertEqual(servicios.unirse(self.evento, u0), servicios.YA_PARTICIPA)
+        self.assertEqual(servicios.unirse(self.evento, u1), servicios.UNIDO)
+        self.assertEqual(servicios.unirse(self.evento, u2), servicios.EVENTO_LLENO)
+        self.assertEqual(servicios.salirse(self.evento, u0), servicios.RETIRADO)
+        self.assertEqual(servicios.salirse(self.evento, u0), servicios.NO_PARTICIPABA)
+        self.assertEqual(servicios.unirse(self.evento, u2), servicios.UNIDO)
+
+        self.evento.refresh_from_db()
+        self.assertEqual(self.evento.participantes_count, 2)
+        self.assertEqual(self.evento.participantes.count(), 2)
+
+    def test_consultas_no_dependen_de_los_participantes(self):
+        evento = crear_evento(self.autor)
+        evento.participantes.add(*[User.objects.create_user(f'p{i}') for i in range(200)])
+        with CaptureQueriesContext(connection) as consultas:
+            servicios.unirse(evento, self.usuarios[0])
+            servicios.salirse(evento, self.usuarios[0])
+        sentencias = [c['sql'] for c in consultas.captured_queries
+                      if not c['sql'].startswith(('SAVEPOINT', 'RELEASE'))]
+        # exists + update + insert / delete + update; ninguna trae la lista de participantes
+        self.assertEqual(len(sentencias), 5)
+        self.assertFalse(any('auth_user' in sql for sql in sentencias))
+
+    def test_add_remove_directos_mantienen_el_contador(self):
+        u0, u1, u2 = self.usuarios
+        self.evento.participantes.add(u0, u1)
+        self.evento.participantes.add(u0)
+        self.assertEqual(self.evento.participantes_count, 2)
+        self.evento.participantes.remove(u0, u2)
+        self.assertEqual(self.evento.participantes_count, 1)
+        u1.eventos_participando.clear()
+        self.evento.refresh_from_db()
+        self.assertEqual(self.evento.participantes_count, 0)
+
+    def test_eliminar_usuario_libera_su_cupo(self):
+        u0, u1, u2 = self.usuarios
+        otro = crear_evento(self.autor, capacidad=1)
+        servicios.unirse(self.evento, u0)
+        servicios.unirse(self.evento, u1)
+        servicios.unirse(otro, u0)
+        self.assertEqual(servicios.unirse(otro, u2), servicios.EVENTO_LLENO)
+
+        u0.delete()
+        self.evento.refresh_from_db()
+        otro.refresh_from_db()
+        self.assertEqual(self.evento.participantes_count, 1)
+        self.assertEqual(otro.participantes_count, 0)
+        self.assertEqual(servicios.unirse(otro, u2), servicios.UNIDO)
+
+        # También al borrar varios usuarios con un queryset
+        User.objects.filter(pk__in=[u1.pk, u2.pk]).delete()
+        self.evento.refresh_from_db()
+        otro.refresh_from_db()
+        self.assertEqual((self.evento.participantes_count, otro.participantes_count), (0, 0))
+
+    def test_editar_durante_una_inscripcion_no_pisa_el_contador(self):
+        # El formulario de edición se arma con el evento leído antes de que otro usuario se una
+        form = EventoForm({
+            'titulo': 'Charla editada', 'descripcion': 'Nueva', 'ubicacion': 'Valparaíso',
+            'fecha_inicio': self.evento.fecha_inicio, 'fecha_fin': self.evento.fecha_fin,
+            'capacidad': 3,
+        }, instance=Evento.objects.get(pk=self.evento.pk))
+        self.assertTrue(form.is_valid(), form.errors)
+        servicios.unirse(self.evento, self.usuarios[0])
+        servicios.unirse(self.evento, self.usuarios[1])
+        form.save()
+
+        self.evento.refresh_from_db()
+        self.assertEqual(self.evento.titulo, 'Charla editada')
+        self.assertEqual(self.evento.capacidad, 3)
+        self.assertEqual(self.evento.participantes_count, 2)
+
+
+@CACHE_LOCAL
+class InscripcionConcurrenteTest(TransactionTestCase):
+    """Muchas inscripciones simultáneas nunca superan la capacidad del evento."""
+    CAPACIDAD = 10
+    USUARIOS = 60
+
+    def _unirse(self, usuario):
+        try:
+            # SQLite bloquea la base completa al escribir: se reintenta
+            for _ in range(100):
+                try:
+                    return servicios.unirse(self.evento, usuario)
+                except OperationalError:
+                    time.sleep(0.01)
+            raise AssertionError('No se pudo inscribir')
+        finally:
+            connection.close()
+
+    def test_capacidad_con_hilos(self):
+        autor = User.objects.create_user('autor', password='clave')
+        self.evento = crear_evento(autor, capacidad=self.CAPACIDAD)
+        usuarios = User.objects.bulk_create([User(username=f'c{i}') for i in range(self.USUARIOS)])
+
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            resultados = list(pool.map(self._unirse, usuarios))
+
+        self.evento.refresh_from_db()
+        self.assertEqual(resultados.count(servicios.UNIDO), self.CAPACIDAD)
+        self.assertEqual(self.evento.participantes_count, self.CAPACIDAD)
+        self.assertEqual(self.evento.participantes.count(), self.CAPACIDAD)
+
+
+@CACHE_LOCAL
+class AutorYPermisosTest(TestCase):
+    """Editar y eliminar consultan el evento una sola vez por request."""
+
+    @classmethod
+    def setUpTestData(cls):
+        editores = Group.objects.create(name='Editores')
+        editores.permissions.add(Permission.objects.get(codename='change_evento'))
+        cls.autor = User.objects.create_user('autor', password='clave')
+        cls.autor.groups.add(editores)
+        cls.autor.user_permissions.add(Permission.objects.get(codename='delete_evento'))
+        cls.otro = User.objects.create_user('otro', password='clave')
+        cls.otro.groups.add(editores)
+        cls.evento = crear_evento(cls.autor)
+
+    def consultas_a_eventos(self, consultas):
+        return [c for c in consultas.captured_queries
+                if c['sql'].startswith('SELECT') and 'FROM "app_eventos_evento"' in c['sql']]
+
+    def test_editar_una_consulta_del_evento(self):
+        self.client.force_login(self.autor)
+        # sesión + usuario + permisos (propios y de grupos juntos) + evento
+        with self.assertNumQueries(4), CaptureQueriesContext(connection) as consultas:
+            respuesta = self.client.get(reverse('editar_evento', args=[self.evento.pk]))
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(len(self.consultas_a_eventos(consultas)), 1)
+
+    def test_eliminar_una_consulta_del_evento(self):
+        self.client.force_login(self.autor)
+        with CaptureQueriesContext(connection) as consultas:
+            respuesta = self.client.post(reverse('eliminar_evento', args=[self.evento.pk]))
+        self.assertRedirects(respuesta, reverse('mis_eventos'), fetch_redirect_response=False)
+        self.assertEqual(len(self.consultas_a_eventos(consultas)), 1)
+        self.assertFalse(Evento.objects.filter(pk=self.evento.pk).exists())
+        self.assertIn('eliminado exitosamente', str(list(get_messages(respuesta.wsgi_request))[0]))
+
+    def test_no_autor_y_evento_inexistente(self):
+        self.client.force_login(self.otro)
+        respuesta = self.client.get(reverse('editar_evento', args=[self.evento.pk]))
+        self.assertRedirects(respuesta, reverse('acceso_denegado'), fetch_redirect_response=False)
+
+        with CaptureQueriesContext(connection) as consultas:
+            respuesta = self.client.get(reverse('editar_evento', args=[999]))
+        self.assertRedirects(respuesta, reverse('acceso_denegado'), fetch_redirect_response=False)
+        self.assertEqual(len(self.consultas_a_eventos(consultas)), 1)
+
+    def test_sin_permiso_de_eliminar(self):
+        evento = crear_evento(self.otro)
+        self.client.force_login(self.otro)
+        respuesta = self.client.post(reverse('eliminar_evento', args=[evento.pk]))
+        self.assertRedirects(respuesta, reverse('acceso_denegado'), fetch_redirect_response=False)
+        self.assertTrue(Evento.objects.filter(pk=evento.pk).exists())
+
+
+@CACHE_LOCAL
+class ConsultasPorFechaTest(TestCase):
+    """Ventanas de tiempo, paginación por clave y resumen mensual en caché."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.autor = User.objects.create_user('autor', password='clave')
+        cls.ahora = timezone.now()
+        inicio = cls.ahora - timedelta(days=10, hours=-1)
+        # Dos por día desde hace casi 10 días; varios comparten fecha_inicio para probar el desempate por id
+        cls.eventos = Evento.objects.bulk_create([
+            Evento(titulo=f'E{i}', descripcion='', ubicacion='Online', autor=cls.autor,
+                   fecha_inicio=inicio + timedelta(days=i // 2),
+                   fecha_fin=inicio + timedelta(days=i // 2, hours=2 if i != 6 else 24 * 20))
+            for i in range(50)
+        ])
+
+    def setUp(self):
+        cache.clear()
+
+    def test_ventanas_de_tiempo(self):
+        proximos = list(Evento.objects.proximos(self.ahora))
+        self.assertTrue(all(e.fecha_inicio >= self.ahora for e in proximos))
+        self.assertEqual(len(proximos), 30)
+        # E6 empezó hace 7 días y dura 20
+        self.assertEqual([e.titulo for e in Evento.objects.en_curso(self.ahora)], ['E6'])
+
+        desde = self.eventos[10].fecha_inicio
+        en_rango = Evento.objects.en_rango(desde, desde + timedelta(days=1))
+        self.assertEqual([e.titulo for e in en_rango], ['E6', 'E10', 'E11'])
+
+    def test_paginacion_por_clave_recorre_todo_sin_repetir(self):
+        vistos, eventos = [], Evento.objects.por_fecha()
+        while True:
+            pagina, cursor = consultas.paginar(eventos, cantidad=7)
+            vistos += [e.pk for e in pagina]
+            if cursor is None:
+                break
+            eventos = Evento.objects.despues_de(*consultas.decodificar_cursor(cursor)).por_fecha()
+        self.assertEqual(vistos, [e.pk for e in Evento.objects.por_fecha()])
+        for cursor in ('basura', '', '1_2_3', '99999999999999999999_1', '-99999999999999999_1',
+                       '0_-1', f'0_{2 ** 64}', '1.5_2'):
+            self.assertIsNone(consultas.decodificar_cursor(cursor), cursor)
+        ultimo = Evento.objects.por_fecha().last()
+        self.assertEqual(consultas.decodificar_cursor(consultas.codificar_cursor(ultimo)),
+                         (ultimo.fecha_inicio, ultimo.pk))
+
+    def test_paginas_en_la_vista(self):
+        respuesta = self.client.get(reverse('lista_eventos'))
+        siguiente = respuesta.context['url_siguiente']
+        respuesta = self.client.get(reverse('lista_eventos') + siguiente)
+        self.assertEqual(len(respuesta.context['eventos']), 10)
+        self.assertNotIn('url_siguiente', respuesta.context)
+
+        desde = self.eventos[10].fecha_inicio.date()
+        respuesta = self.client.get(reverse('eventos_en_rango'), {'desde': desde, 'hasta': desde})
+        self.assertIn('E10', [e.titulo for e in respuesta.context['eventos']])
+        self.assertEqual(self.client.get(reverse('eventos_en_rango'), {'desde': 'x'}).status_code, 404)
+        # Un cursor fuera de rango se ignora: primera página, sin error 500
+        respuesta = self.client.get(reverse('lista_eventos'), {'despues': '99999999999999999999_1'})
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(len(respuesta.context['eventos']), consultas.EVENTOS_POR_PAGINA)
+        self.assertEqual(self.client.get(reverse('eventos_del_mes', args=[2026, 13])).status_code, 404)
+
+    def test_anios_fuera_de_rango_son_404(self):
+        for url in (reverse('eventos_del_mes', args=[9999, 5]),
+                    reverse('eventos_del_mes', args=[9999, 12]),
+                    reverse('eventos_del_mes', args=[0, 1]),
+                    reverse('eventos_en_rango') + '?desde=9999-01-01&hasta=9999-01-02',
+                    reverse('eventos_en_rango') + '?desde=9999-12-31&hasta=9999-12-31',
+                    reverse('eventos_en_rango') + '?desde=2026-01-01&hasta=9999-12-31',
+                    reverse('calendario_eventos', args=[9999])):
+            self.assertEqual(self.client.get(url).status_code, 404, url)
+        # El último año aceptado funciona en todas las vistas
+        for url in (reverse('eventos_del_mes', args=[consultas.ANIO_MAX, 12]),
+                    reverse('eventos_en_rango') + '?desde=9998-12-31&hasta=9998-12-31',
+                    reverse('calendario_eventos', args=[consultas.ANIO_MAX])):
+            self.assertEqual(self.client.get(url).status_code, 200, url)
+
+    def test_conteo_por_mes_en_cache_e_invalidacion(self):
+        anio = self.ahora.year
+        with self.assertNumQueries(1):
+            conteo = consultas.conteo_por_mes(anio)
+        with self.assertNumQueries(0):
+            self.assertEqual(consultas.conteo_por_mes(anio), conteo)
+        self.assertEqual(sum(conteo.values()),
+                         Evento.objects.filter(fecha_inicio__year=anio).count())
+
+        crear_evento(self.autor)
+        manana = timezone.localtime() + timedelta(days=1)
+        nuevo = consultas.conteo_por_mes(manana.year)
+        self.assertEqual(sum(nuevo.values()),
+                         Evento.objects.filter(fecha_inicio__year=manana.year).count())
+
+        respuesta = self.client.get(reverse('calendario_eventos', args=[manana.year]))
+        self.assertEqual(respuesta.json()['meses'][str(manana.month)], nuevo[manana.month])
@@ -1,12 +1,16 @@
 from django.urls import path
 from .views import (
-    ListaEventos, MisEventos,
+    ListaEventos, CalendarioEventos, MisEventos,
     CrearEvento, EditarEvento, EliminarEvento, AccesoDenegadoView,
     UnirseEventoView, SalirseEventoView, ParticipantesEventoView
 )
 
 urlpatterns = [
     path('', ListaEventos.as_view(), name='lista_eventos'),
+    path('en-curso/', ListaEventos.as_view(vista='en_curso'), name='eventos_en_curso'),
+    path('mes/<int:anio>/<int:mes>/', ListaEventos.as_view(vista='mes'), name='eventos_del_mes'),
+    path('rango/', ListaEventos.as_view(vista='rango'), name='eventos_en_rango'),
+    path('calendario/<int:anio>/', CalendarioEventos.as_view(), name='calendario_eventos'),
     path('mis_eventos/', MisEventos.as_view(), name='mis_eventos'),
     path('crear_evento/', CrearEvento.as_view(), name='crear_evento'),
     path('editar_evento/<int:pk>/', EditarEvento.as_view(), name='editar_evento'),
@@ -1,47 +1,21 @@
+from datetime import datetime, timedelta
 from django.shortcuts import render, redirect, get_object_or_404
 from django.views.generic import ListView, UpdateView, DeleteView, CreateView, TemplateView
 from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin, UserPassesTestMixin
 from django.contrib.auth import authenticate, login, logout
 from django.contrib import messages
 from django.views import View
+from django.http import Http404, JsonResponse
+from django.utils import timezone
 from django.urls import reverse_lazy
 from django.core.exceptions import PermissionDenied
-from .models import Evento
+from .mixins import AutorRequeridoMixin, PermisosPorRequestMixin
+from .models import Evento, ids_eventos_participando
+from . import consultas, servicios
 from .forms import EventoForm
 
 # Create your views here.
 
-# Mixin personalizado para verificar que el usuario es el autor del evento
-class AutorRequeridoMixin(UserPassesTestMixin):
-    """
-    Mixin que verifica que el usuario autenticado sea el autor del evento.
-    Maneja correctamente el caso cuando el evento no existe.
-    """
-    raise_exception = False  # Para poder redirigir en lugar de mostrar 403/404
-    
-    def test_func(self):
-        """
-        Verifica que el evento existe y pertenece al usuario actual.
-        """
-        try:
-            evento = self.get_object()
-            return evento.autor == self.request.user
-        except Exception:
-            return False
-    
-    def handle_no_permission(self):
-        """
-        Maneja cuando el evento no existe o no pertenece al usuario.
-        """
-        try:
-            evento = self.get_object()
-            messages.error(self.request, '🚫 No tienes permiso para realizar esta acción en este evento.')
-        except Exception:
-            messages.error(self.request, '🚫 El evento que buscas no existe o no tienes acceso a él.')
-        
-        return redirect('acceso_denegado')
-
-
 # Mixin personalizado para manejo de permisos con mensajes
 class PermissionDeniedMixin:
     """
@@ -117,10 +91,91 @@ def custom_page_not_found_view(request, exception=None):
 
 
 class ListaEventos(ListView):
+    """
+    Lista de eventos por fecha, paginada por clave (?despues=<cursor>).
+    `vista` elige la ventana de tiempo:
+    - 'proximos': eventos que aún no comienzan (por defecto)
+    - 'en_curso': eventos que están ocurriendo ahora
+    - 'mes': eventos del mes indicado en la URL (anio, mes)
+    - 'rango': eventos entre ?desde=AAAA-MM-DD y ?hasta=AAAA-MM-DD (inclusive)
+    """
     model = Evento
     template_name = 'list_eventos.html'
     context_object_name = 'eventos'
-    
+    vista = 'proximos'
+    titulos = {
+        'proximos': 'Próximos Eventos',
+        'en_curso': 'Eventos en Curso',
+        'mes': 'Eventos del Mes',
+        'rango': 'Eventos por Fechas',
+    }
+
+    def get_rango(self):
+        if self.vista == 'mes':
+            try:
+                return consultas.rango_del_mes(self.kwargs['anio'], self.kwargs['mes'])
+            except ValueError:
+                raise Http404('Mes no válido')
+        zona = timezone.get_current_timezone()
+        try:
+            desde = datetime.strptime(self.request.GET['desde'], '%Y-%m-%d')
+            hasta = datetime.strptime(self.request.GET['hasta'], '%Y-%m-%d')
+            # Mismos años que el calendario: el día siguiente a `hasta` y el
+            # resumen del año de `desde` tienen que existir
+            consultas.validar_anio(desde.year)
+            consultas.validar_anio(hasta.year)
+        except (KeyError, ValueError):
+            raise Http404('Rango de fechas no válido')
+        return desde.replace(tzinfo=zona), hasta.replace(tzinfo=zona) + timedelta(days=1)
+
+    def get_queryset(self):
+        # Autor y total de participantes en la misma consulta, ordenados por el índice de fechas
+        eventos = Evento.objects.con_participantes()
+        posicion = consultas.decodificar_cursor(self.request.GET.get('despues'))
+        if posicion:
+            # El cursor va antes que la ventana: SQLite usa en el índice solo
+            # la primera condición sobre fecha_inicio
+            eventos = eventos.despues_de(*posicion)
+        if self.vista == 'en_curso':
+            return eventos.en_curso()
+        if self.vista in ('mes', 'rango'):
+            self.rango = self.get_rango()
+            return eventos.en_rango(*self.rango)
+        return eventos.proximos()
+
+    def get(self, request, *args, **kwargs):
+        # Solo la página pedida; sin COUNT(*) ni OFFSET
+        self.object_list, self.siguiente = consultas.paginar(self.get_queryset())
+        return self.render_to_response(self.get_context_data())
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # Ids de los eventos del usuario: una consulta para toda la lista
+        context['eventos_participando_ids'] = ids_eventos_participando(self.request.user)
+        context['titulo'] = self.titulos[self.vista]
+        if self.siguiente:
+            # Conserva los filtros (desde/hasta) en el enlace a la página siguiente
+            parametros = self.request.GET.copy()
+            parametros['despues'] = self.siguiente
+            context['url_siguiente'] = f'?{parametros.urlencode()}'
+
+        # Resumen del año para el calendario (en caché)
+        fecha = self.rango[0] if self.vista in ('mes', 'rango') else timezone.localtime()
+        context['anio'] = fecha.year
+        context['conteo_por_mes'] = consultas.conteo_por_mes(fecha.year).items()
+        return context
+
+
+class CalendarioEventos(View):
+    """Cantidad de eventos por mes de un año, en JSON, para widgets de calendario."""
+
+    def get(self, request, anio):
+        try:
+            conteo = consultas.conteo_por_mes(anio)
+        except ValueError:
+            raise Http404('Año no válido')
+        return JsonResponse({'anio': anio, 'meses': conteo})
+
 class MisEventos(LoginRequiredMixin, ListView):
     model = Evento
     template_name = 'mis_eventos.html'
@@ -136,7 +191,8 @@ class MisEventos(LoginRequiredMixin, ListView):
     
     def get_queryset(self):
         # Solo muestra eventos del usuario logueado
-        return Evento.objects.filter(autor=self.request.user)
+        return (Evento.objects.filter(autor=self.request.user)
+                .con_participantes().con_primeros_participantes(5))
 
 
 class CrearEvento(LoginRequiredMixin, CreateView):
@@ -162,7 +218,7 @@ class CrearEvento(LoginRequiredMixin, CreateView):
         return super().dispatch(request, *args, **kwargs)
     
 
-class EditarEvento(AutorRequeridoMixin, LoginRequiredMixin, PermissionRequiredMixin, UpdateView):
+class EditarEvento(AutorRequeridoMixin, LoginRequiredMixin, PermisosPorRequestMixin, UpdateView):
     model = Evento
     form_class = EventoForm
     template_name = 'editar_evento.html'
@@ -189,7 +245,7 @@ class EditarEvento(AutorRequeridoMixin, LoginRequiredMixin, PermissionRequiredMi
         return super().form_valid(form)
 
 
-class EliminarEvento(AutorRequeridoMixin, LoginRequiredMixin, PermissionRequiredMixin, DeleteView):
+class EliminarEvento(AutorRequeridoMixin, LoginRequiredMixin, PermisosPorRequestMixin, DeleteView):
     model = Evento
     template_name = 'eliminar_evento.html'
     permission_required = 'app_eventos.delete_evento'
@@ -210,11 +266,10 @@ class EliminarEvento(AutorRequeridoMixin, LoginRequiredMixin, PermissionRequired
         messages.error(self.request, '🚫 No tienes los permisos necesarios para eliminar eventos.')
         return redirect('acceso_denegado')
     
-    def delete(self, request, *args, **kwargs):
-        evento = self.get_object()
-        titulo_evento = evento.titulo
-        messages.success(request, f'✓ El evento "{titulo_evento}" ha sido eliminado exitosamente.')
-        return super().delete(request, *args, **kwargs)
+    def form_valid(self, form):
+        # DeleteView elimina en form_valid (POST); self.object ya es el evento cacheado
+        messages.success(self.request, f'✓ El evento "{self.object.titulo}" ha sido eliminado exitosamente.')
+        return super().form_valid(form)
 
 
 class UnirseEventoView(LoginRequiredMixin, View):
@@ -226,13 +281,12 @@ class UnirseEventoView(LoginRequiredMixin, View):
     def post(self, request, pk):
         evento = get_object_or_404(Evento, pk=pk) # Obtener el evento o devolver 404
         
-        if request.user in evento.participantes.all():#si el usuario ya está en la lista de participantes
-            # El usuario ya está inscrito, lo removemos
-            evento.participantes.remove(request.user)# eliminar al usuario de los participantes 
+        # Si estaba inscrito se retira; si no, se inscribe (búsqueda por índice, sin cargar participantes)
+        if servicios.salirse(evento, request.user) == servicios.RETIRADO:
             messages.success(request, f'✓ Te has retirado del evento "{evento.titulo}".')
+        elif servicios.unirse(evento, request.user) == servicios.EVENTO_LLENO:
+            messages.warning(request, f'⚠️ El evento "{evento.titulo}" ya no tiene cupos disponibles.')
         else:
-            # El usuario no está inscrito, lo agregamos
-            evento.participantes.add(request.user)
             messages.success(request, f'✓ Te has unido al evento "{evento.titulo}"!')
         
         # Redirigir a la página anterior o a la lista de eventos
@@ -272,13 +326,12 @@ class UnirseEvento(LoginRequiredMixin, View):
         evento = get_object_or_404(Evento, pk=pk)
         user = request.user
         
-        if evento.esta_participando(user):
-            # El usuario ya está participando, lo removemos
-            evento.participantes.remove(user)
+        if servicios.salirse(evento, user) == servicios.RETIRADO:
+            # El usuario estaba participando y se retiró
             messages.success(request, f'✓ Ya no participas en "{evento.titulo}".')
+        elif servicios.unirse(evento, user) == servicios.EVENTO_LLENO:
+            messages.warning(request, f'⚠️ "{evento.titulo}" ya no tiene cupos disponibles.')
         else:
-            # El usuario no está participando, lo agregamos
-            evento.participantes.add(user)
             messages.success(request, f'✓ ¡Te has unido a "{evento.titulo}"!')
         
         # Redirigir a la página anterior o a la lista de eventos
@@ -299,11 +352,13 @@ class UnirseEventoView(LoginRequiredMixin, View):
             messages.warning(request, '⚠️ Eres el organizador de este evento.')
             return redirect('lista_eventos')
         
-        # Verificar si ya está participando
-        if evento.esta_participando(request.user):
+        # Inscribir: verifica si ya participa y reserva el cupo de forma atómica
+        resultado = servicios.unirse(evento, request.user)
+        if resultado == servicios.YA_PARTICIPA:
             messages.info(request, 'ℹ️ Ya estás participando en este evento.')
+        elif resultado == servicios.EVENTO_LLENO:
+            messages.warning(request, '⚠️ El evento alcanzó su capacidad máxima.')
         else:
-            evento.participantes.add(request.user)
             messages.success(request, f'✓ Te has unido al evento "{evento.titulo}" exitosamente.')
         
         return redirect('lista_eventos')
@@ -318,9 +373,8 @@ class SalirseEventoView(LoginRequiredMixin, View):
     def post(self, request, pk):
         evento = get_object_or_404(Evento, pk=pk)
         
-        # Verificar si está participando
-        if evento.esta_participando(request.user):
-            evento.participantes.remove(request.user)
+        # Retirar (si no estaba participando no se borra nada)
+        if servicios.salirse(evento, request.user) == servicios.RETIRADO:
             messages.success(request, f'✓ Te has salido del evento "{evento.titulo}".')
         else:
             messages.warning(request, '⚠️ No estás participando en este evento.')
@@ -336,7 +390,7 @@ class ParticipantesEventoView(TemplateView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        evento = get_object_or_404(Evento, pk=self.kwargs['pk'])
+        evento = get_object_or_404(Evento.objects.con_participantes(), pk=self.kwargs['pk'])
         context['evento'] = evento
         context['participantes'] = evento.participantes.all().order_by('username')
         return context
\ No newline at end of file
@@ -5,6 +5,7 @@ from django.contrib import messages
 from django.shortcuts import redirect
 from django.urls import reverse_lazy
 from django.views.generic import CreateView, UpdateView, TemplateView
+from app_eventos.models import Evento
 from .forms import RegistroForm, PerfilForm
 
 
@@ -174,12 +175,18 @@ class InfoUsuarioView(LoginRequiredMixin, TemplateView):
         context = super().get_context_data(**kwargs)
         user = self.request.user
         
-        # Eventos creados por el usuario
-        context['eventos_creados'] = user.evento_set.all().order_by('-fecha_inicio')
-        context['total_eventos_creados'] = user.evento_set.count()
+        # Eventos creados por el usuario (con su total de participantes)
+        eventos_creados = list(
+            Evento.objects.filter(autor=user).con_participantes().order_by('-fecha_inicio')
+        )
+        context['eventos_creados'] = eventos_creados
+        context['total_eventos_creados'] = len(eventos_creados)
         
         # Eventos en los que participa
-        context['eventos_participando'] = user.eventos_participando.all().order_by('-fecha_inicio')
-        context['total_eventos_participando'] = user.eventos_participando.count()
+        eventos_participando = list(
+            user.eventos_participando.select_related('autor').order_by('-fecha_inicio')
+        )
+        context['eventos_participando'] = eventos_participando
+        context['total_eventos_participando'] = len(eventos_participando)
         
         return context
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import tempfile
 from pathlib import Path
 from django.contrib.messages import constants as messages_constants
 
@@ -84,6 +85,20 @@ DATABASES = {
 }
 
 
+# Caché compartida por todos los procesos del servidor (gunicorn/uwsgi con varios
+# workers): el resumen mensual del calendario (app_eventos/consultas.py) se invalida
+# con señales, y con la caché local en memoria solo se enteraría el worker que
+# guardó el evento. FileBasedCache no necesita dependencias pero solo se comparte
+# dentro de una máquina; con varios servidores usar Redis o Memcached
+# (django.core.cache.backends.redis.RedisCache).
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': Path(tempfile.gettempdir()) / 'eventos_cache',
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class BicicletasConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app_bicicletas'
+
+    def ready(self):
+        import app_bicicletas.signals
@@ -0,0 +1,95 @@
+"""
+Consultas del catálogo de bicicletas.
+
+- Filtros por tipo, disponibilidad, año y rango de precio
+- Paginación por cursor (keyset): cada página se pide con el id de la última
+  bicicleta mostrada, así el costo no crece con el número de página
+- Proyección con .only() de los campos que usa el listado
+- Caché de cada página por combinación de filtros/cursor, invalidada al
+  guardar o eliminar una Bicicleta (ver app_bicicletas/signals.py). Es la
+  única capa de caché del catálogo; la plantilla no cachea fragmentos aparte.
+  Vive en la caché compartida (CACHES en bikeshop/settings.py) para que la
+  invalidación llegue a todos los workers.
+"""
+import hashlib
+import time
+from django.core.cache import cache
+from .models import Bicicleta
+
+
+POR_PAGINA = 12
+TIEMPO_CACHE = 60 * 10
+CLAVE_VERSION = 'catalogo:version'
+
+CAMPOS_LISTADO = (
+    'id', 'marca', 'modelo', 'tipo', 'precio', 'disponible', 'anio', 'imagen',
+    'resumen_resenas__total', 'resumen_resenas__suma_puntuaciones',
+)
+
+
+def version_catalogo():
+    """
+    Versión actual del catálogo; cambia cada vez que se invalida. Si la
+    caché pierde la clave (reinicio o limpieza), la nueva versión parte del
+    reloj y no repite una anterior con páginas viejas todavía guardadas.
+    """
+    return cache.get_or_set(CLAVE_VERSION, time.time_ns, None)
+
+
+def invalidar_catalogo():
+    """Invalida todas las páginas cacheadas del catálogo."""
+    try:
+        cache.incr(CLAVE_VERSION)
+    except ValueError:
+        cache.set(CLAVE_VERSION, time.time_ns(), None)
+
+
+def filtrar_bicicletas(filtros):
+    """
+    Aplica los filtros del catálogo. `filtros` es el cleaned_data de
+    FiltroCatalogoForm (los valores vacíos se ignoran).
+    """
+    bicicletas = Bicicleta.objects.select_related('resumen_resenas').only(*CAMPOS_LISTADO)
+
+    if filtros.get('tipo'):
+        bicicletas = bicicletas.filter(tipo=filtros['tipo'])
+    if filtros.get('disponible'):
+        bicicletas = bicicletas.filter(disponible=True)
+    if filtros.get('anio'):
+        bicicletas = bicicletas.filter(anio=filtros['anio'])
+    if filtros.get('precio_min') is not None:
+        bicicletas = bicicletas.filter(precio__gte=filtros['precio_min'])
+    if filtros.get('precio_max') is not None:
+        bicicletas = bicicletas.filter(precio__lte=filtros['precio_max'])
+
+    return bicicletas.order_by('id')
+
+
+def clave_pagina(filtros, despues):
+    """Clave de caché única para una combinación de filtros y cursor."""
+    partes = [f'{campo}={filtros.get(campo)}' for campo in sorted(filtros)]
+    partes.append(f'despues={despues}')
+    resumen = hashlib.md5('&'.join(partes).encode()).hexdigest()
+    return f'catalogo:{version_catalogo()}:{resumen}'
+
+
+def obtener_pagina(filtros, despues=None, por_pagina=POR_PAGINA):
+    """
+    Devuelve (bicicletas, siguiente_cursor) para la página que empieza
+    después del id `despues`. siguiente_cursor es None en la última página.
+    """
+    clave = clave_pagina(filtros, despues)
+    pagina = cache.get(clave)
+
+    if pagina is None:
+        bicicletas = filtrar_bicicletas(filtros)
+        if despues:
+            bicicletas = bicicletas.filter(id__gt=despues)
+
+        # Se pide una fila extra para saber si hay página siguiente
+        bicicletas = list(bicicletas[:por_pagina + 1])
+        siguiente = bicicletas[por_pagina - 1].id if len(bicicletas) > por_pagina else None
+        pagina = (bicicletas[:por_pagina], siguiente)
+        cache.set(clave, pagina, TIEMPO_CACHE)
+
+    return pagina
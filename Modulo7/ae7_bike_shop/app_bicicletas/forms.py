@@ -13,4 +13,33 @@ class BicicletaForm(forms.ModelForm):
             'disponible': forms.CheckboxInput(attrs={'class': 'form-check-input'}),
             'anio': forms.NumberInput(attrs={'class': 'form-control', 'placeholder': 'Año'}),
             'imagen': forms.ClearableFileInput(attrs={'class': 'form-control'}),
-        }
\ No newline at end of file
+        }
+
+class FiltroCatalogoForm(forms.Form):
+    """Filtros opcionales del catálogo (se envían por GET)"""
+    tipo = forms.CharField(
+        required=False,
+        max_length=20,
+        widget=forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Tipo'})
+    )
+    disponible = forms.BooleanField(
+        required=False,
+        widget=forms.CheckboxInput(attrs={'class': 'form-check-input'})
+    )
+    anio = forms.IntegerField(
+        required=False,
+        widget=forms.NumberInput(attrs={'class': 'form-control', 'placeholder': 'Año'})
+    )
+    precio_min = forms.DecimalField(
+        required=False,
+        min_value=0,
+        decimal_places=0,
+        widget=forms.NumberInput(attrs={'class': 'form-control', 'placeholder': 'Precio mínimo'})
+    )
+    precio_max = forms.DecimalField(
+        required=False,
+        min_value=0,
+        decimal_places=0,
+        widget=forms.NumberInput(attrs={'class': 'form-control', 'placeholder': 'Precio máximo'})
+    )
+    despues = forms.IntegerField(required=False, min_value=0, widget=forms.HiddenInput)
@@ -0,0 +1,43 @@
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand
+from app_bicicletas.models import Bicicleta
+from app_bicicletas.miniaturas import generar_miniaturas
+from app_bicicletas.catalogo import invalidar_catalogo
+from app_eventos.models import Evento
+
+
+class Command(BaseCommand):
+    help = 'Genera las miniaturas faltantes de las imágenes de bicicletas y eventos ya subidas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--forzar', action='store_true', help='Regenerar aunque ya existan')
+        parser.add_argument('--hilos', type=int, default=4)
+
+    def procesar(self, nombre, forzar):
+        try:
+            return nombre, generar_miniaturas(nombre, forzar=forzar), None
+        except Exception as e:
+            return nombre, 0, e
+
+    def handle(self, *args, **options):
+        nombres = set()
+        for modelo in (Bicicleta, Evento):
+            nombres.update(
+                modelo.objects.exclude(imagen='').exclude(imagen__isnull=True)
+                .values_list('imagen', flat=True)
+            )
+
+        creadas = errores = 0
+        with ThreadPoolExecutor(max_workers=options['hilos']) as pool:
+            resultados = pool.map(lambda n: self.procesar(n, options['forzar']), sorted(nombres))
+            for nombre, cantidad, error in resultados:
+                if error:
+                    errores += 1
+                    self.stderr.write(f'✗ {nombre}: {error}')
+                else:
+                    creadas += cantidad
+
+        invalidar_catalogo()
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(nombres)} imágenes revisadas, {creadas} miniaturas creadas, {errores} errores'
+        ))
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_bicicletas', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bicicleta',
+            index=models.Index(fields=['tipo'], name='bicicleta_tipo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bicicleta',
+            index=models.Index(fields=['disponible'], name='bicicleta_disponible_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bicicleta',
+            index=models.Index(fields=['anio'], name='bicicleta_anio_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bicicleta',
+            index=models.Index(fields=['precio'], name='bicicleta_precio_idx'),
+        ),
+    ]
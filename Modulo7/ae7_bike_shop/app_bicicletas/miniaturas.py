@@ -0,0 +1,212 @@
+"""
+Miniaturas para las imágenes subidas (Bicicleta.imagen y Evento.imagen).
+
+Por cada imagen original se generan versiones reducidas en WebP y JPEG,
+guardadas junto al original:
+
+    bicicletas/foto.jpg  ->  bicicletas/foto_lista.webp
+                             bicicletas/foto_lista.jpg
+                             bicicletas/foto_detalle.webp ...
+
+La generación corre en un pool de hilos después del commit, así el
+request que sube la imagen no espera el redimensionado. Los nombres con que
+quedó guardada cada variante se anotan en la caché compartida: al mostrar
+una imagen no se pregunta al storage si la miniatura existe. Cuando la
+imagen cambia o se elimina, sus miniaturas se borran.
+"""
+import hashlib
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Tamaño máximo (ancho, alto) de cada variante
+TAMANOS = {
+    'mini': (160, 160),
+    'lista': (600, 400),
+    'detalle': (1200, 900),
+}
+
+FORMATOS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+# Si la caché no tiene las miniaturas de una imagen se revisa el storage una
+# vez y el resultado se guarda por este tiempo (puede estar generándose)
+TIEMPO_REVISADAS = 60 * 60
+
+_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='miniaturas')
+
+
+def ruta_miniatura(nombre, tamano, extension):
+    """Ruta de la miniatura para el archivo original `nombre`."""
+    base, _ = os.path.splitext(nombre)
+    return f'{base}_{tamano}.{extension}'
+
+
+def clave_miniaturas(nombre):
+    return f'miniaturas:{hashlib.md5(nombre.encode()).hexdigest()}'
+
+
+def miniaturas_guardadas(nombre, storage=default_storage):
+    """
+    {(tamaño, extensión): ruta} de las miniaturas ya generadas de `nombre`.
+    Se lee de la caché; solo si no está ahí se revisa el storage.
+    """
+    rutas = cache.get(clave_miniaturas(nombre))
+    if rutas is None:
+        rutas = {}
+        for tamano in TAMANOS:
+            for extension in FORMATOS:
+                ruta = ruta_miniatura(nombre, tamano, extension)
+                if storage.exists(ruta):
+                    rutas[tamano, extension] = ruta
+        cache.set(clave_miniaturas(nombre), rutas, TIEMPO_REVISADAS)
+    return rutas
+
+
+def generar_miniaturas(nombre, storage=default_storage, forzar=False):
+    """
+    Genera todas las variantes de la imagen `nombre` y anota en la caché
+    los nombres con que quedaron guardadas.
+    Devuelve la cantidad de archivos creados.
+    """
+    creadas = 0
+    rutas = {}
+    with storage.open(nombre, 'rb') as archivo:
+        original = ImageOps.exif_transpose(Image.open(archivo))
+        original.load()
+
+    if original.mode not in ('RGB', 'RGBA'):
+        original = original.convert('RGBA' if 'transparency' in original.info else 'RGB')
+
+    for tamano, dimensiones in TAMANOS.items():
+        imagen = original.copy()
+        imagen.thumbnail(dimensiones, Image.LANCZOS)
+
+        for extension, (formato, opciones) in FORMATOS.items():
+            ruta = ruta_miniatura(nombre, tamano, extension)
+            if not forzar and storage.exists(ruta):
+                rutas[tamano, extension] = ruta
+                continue
+
+            salida = imagen.convert('RGB') if formato == 'JPEG' else imagen
+            buffer = BytesIO()
+            salida.save(buffer, formato, **opciones)
+            if storage.exists(ruta):
+                storage.delete(ruta)
+            # El storage puede guardarla con otro nombre si la ruta ya está ocupada
+            rutas[tamano, extension] = storage.save(ruta, ContentFile(buffer.getvalue()))
+            creadas += 1
+
+    cache.set(clave_miniaturas(nombre), rutas, None)
+    return creadas
+
+
+def borrar_miniaturas(nombre, storage=default_storage):
+    """Elimina las miniaturas de la imagen `nombre` (las anotadas y las de nombre esperado)."""
+    rutas = set(cache.get(clave_miniaturas(nombre), {}).values())
+    rutas.update(
+        ruta_miniatura(nombre, tamano, extension) for tamano in TAMANOS for extension in FORMATOS
+    )
+    cache.delete(clave_miniaturas(nombre))
+    for ruta in rutas:
+        # delete() no falla si el archivo no existe
+        storage.delete(ruta)
+
+
+def _borrar_en_segundo_plano(nombre):
+    try:
+        borrar_miniaturas(nombre)
+    except Exception:
+        logger.exception('No se pudieron borrar las miniaturas de %s', nombre)
+
+
+def _generar_en_segundo_plano(nombre, al_terminar=None):
+    try:
+        generar_miniaturas(nombre, forzar=True)
+    except Exception:
+        logger.exception('No se pudieron generar las miniaturas de %s', nombre)
+        return
+    if al_terminar:
+        al_terminar()
+
+
+def programar_miniaturas(nombre, al_terminar=None):
+    """
+    Encola la generación de miniaturas para cuando la transacción actual
+    termine de guardarse. `al_terminar` se llama al finalizar (por ejemplo,
+    para invalidar páginas cacheadas que aún apuntan al original).
+    """
+    if nombre:
+        transaction.on_commit(
+            lambda: _pool.submit(_generar_en_segundo_plano, nombre, al_terminar)
+        )
+
+
+def programar_borrado_miniaturas(nombre):
+    """Encola el borrado de las miniaturas de `nombre` para después del commit."""
+    if nombre:
+        transaction.on_commit(lambda: _pool.submit(_borrar_en_segundo_plano, nombre))
+
+
+def url_miniatura(imagen, tamano, extension='jpg', storage=default_storage):
+    """
+    URL de la miniatura si ya existe; si todavía no se genera, la del original.
+    """
+    if not imagen:
+        return ''
+    ruta = miniaturas_guardadas(imagen.name, storage).get((tamano, extension))
+    if ruta:
+        return storage.url(ruta)
+    return imagen.url
+
+
+def imagen_anterior(instancia, campo='imagen'):
+    """Nombre del archivo guardado en la BD ('' si la instancia es nueva o no tenía)."""
+    if not instancia.pk:
+        return ''
+    return type(instancia).objects.filter(pk=instancia.pk).values_list(campo, flat=True).first() or ''
+
+
+def imagen_cambio(instancia, campo='imagen', anterior=None):
+    """
+    Indica si el archivo de imagen cambió respecto a lo guardado en la BD.
+    Se usa en pre_save para no regenerar miniaturas en cada save().
+    `anterior` evita repetir la consulta si ya se leyó con imagen_anterior.
+    """
+    actual = getattr(instancia, campo)
+    if not actual:
+        return False
+    if not instancia.pk:
+        return True
+    if anterior is None:
+        anterior = imagen_anterior(instancia, campo)
+    return anterior != actual.name
+
+
+def registrar_cambio_imagen(instancia, campo='imagen'):
+    """
+    Para pre_save: anota en la instancia si la imagen cambió y cuál era la
+    anterior, para generar las miniaturas nuevas y borrar las viejas en post_save.
+    """
+    instancia._imagen_anterior = imagen_anterior(instancia, campo)
+    instancia._imagen_cambio = imagen_cambio(instancia, campo, instancia._imagen_anterior)
+
+
+def miniaturas_tras_guardar(instancia, campo='imagen', al_terminar=None):
+    """Para post_save: genera las miniaturas de la imagen nueva y borra las de la reemplazada."""
+    actual = getattr(instancia, campo)
+    if getattr(instancia, '_imagen_cambio', False):
+        programar_miniaturas(actual.name, al_terminar=al_terminar)
+    anterior = getattr(instancia, '_imagen_anterior', '')
+    if anterior and anterior != (actual.name if actual else ''):
+        programar_borrado_miniaturas(anterior)
@@ -8,7 +8,27 @@ class Bicicleta(models.Model):
     disponible = models.BooleanField(default=True)
     anio = models.IntegerField()
     imagen = models.ImageField(upload_to='bicicletas/', blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['tipo'], name='bicicleta_tipo_idx'),
+            models.Index(fields=['disponible'], name='bicicleta_disponible_idx'),
+            models.Index(fields=['anio'], name='bicicleta_anio_idx'),
+            models.Index(fields=['precio'], name='bicicleta_precio_idx'),
+        ]
+
     def precio_formateado(self):
         return f"{self.precio:,.0f}".replace(",", ".")
     def __str__(self):
-        return f"{self.marca} {self.modelo}"
\ No newline at end of file
+        return f"{self.marca} {self.modelo}"
+
+    @property
+    def calificacion(self):
+        """
+        Resumen de reseñas (promedio, total e histograma) o None si no tiene.
+        Usar select_related('resumen_resenas') en listados para evitar consultas extra.
+        """
+        try:
+            return self.resumen_resenas
+        except models.ObjectDoesNotExist:
+            return None
\ No newline at end of file
@@ -0,0 +1,27 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from .models import Bicicleta
+from .catalogo import invalidar_catalogo
+from .miniaturas import miniaturas_tras_guardar, programar_borrado_miniaturas, registrar_cambio_imagen
+
+
+@receiver(post_save, sender=Bicicleta)
+@receiver(post_delete, sender=Bicicleta)
+def invalidar_cache_catalogo(sender, **kwargs):
+    invalidar_catalogo()
+
+
+@receiver(pre_save, sender=Bicicleta)
+def detectar_cambio_imagen(sender, instance, **kwargs):
+    registrar_cambio_imagen(instance)
+
+
+@receiver(post_save, sender=Bicicleta)
+def generar_miniaturas_bicicleta(sender, instance, **kwargs):
+    miniaturas_tras_guardar(instance, al_terminar=invalidar_catalogo)
+
+
+@receiver(post_delete, sender=Bicicleta)
+def borrar_miniaturas_bicicleta(sender, instance, **kwargs):
+    if instance.imagen:
+        programar_borrado_miniaturas(instance.imagen.name)
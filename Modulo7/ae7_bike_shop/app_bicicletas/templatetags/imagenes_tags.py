@@ -0,0 +1,42 @@
+from django import template
+from django.core.files.storage import default_storage
+from django.utils.html import format_html
+from app_bicicletas.miniaturas import miniaturas_guardadas, url_miniatura, TAMANOS
+
+register = template.Library()
+
+
+@register.filter
+def miniatura(imagen, tamano='lista'):
+    """
+    URL de la miniatura JPEG de una imagen (o del original si aún no existe).
+    Uso: <img src="{{ bici.imagen|miniatura:'lista' }}">
+    """
+    return url_miniatura(imagen, tamano)
+
+
+@register.simple_tag
+def imagen_miniatura(imagen, tamano='lista', alt='', clase='', estilo=''):
+    """
+    Etiqueta <picture> con la variante WebP y respaldo JPEG del tamaño pedido.
+    Tamaños: mini (carrito, órdenes), lista (catálogos) y detalle.
+    Uso: {% imagen_miniatura bici.imagen 'lista' alt=bici.modelo clase='card-img-top' %}
+    """
+    if not imagen:
+        return ''
+    if tamano not in TAMANOS:
+        tamano = 'lista'
+
+    # Miniaturas anotadas en caché: no se consulta el storage en cada render
+    rutas = miniaturas_guardadas(imagen.name)
+    jpg, webp = rutas.get((tamano, 'jpg')), rutas.get((tamano, 'webp'))
+    img = format_html(
+        '<img src="{}" alt="{}" class="{}" style="{}" loading="lazy">',
+        default_storage.url(jpg) if jpg else imagen.url, alt, clase, estilo
+    )
+    if not webp:
+        return img
+    return format_html(
+        '<picture><source srcset="{}" type="image/webp">{}</picture>',
+        default_storage.url(webp), img
+    )
@@ -1,3 +1,146 @@
-from django.test import TestCase
+import tempfile
+from decimal import Decimal
+from io import BytesIO
+from unittest import mock
+from django.core.cache import cache
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from . import catalogo, miniaturas
+from .models import Bicicleta
 
-# Create your tests here.
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class CatalogoCacheTest(TestCase):
+    """Las páginas del catálogo se cachean una vez y se invalidan al cambiar una bicicleta."""
+
+    def setUp(self):
+        cache.clear()
+        self.bicicletas = Bicicleta.objects.bulk_create([
+            Bicicleta(marca='Trek', modelo=f'Marlin {i}', tipo='mtb', precio=Decimal('450000'), anio=2024)
+            for i in range(catalogo.POR_PAGINA + 3)
+        ])
+
+    def test_pagina_en_cache_hasta_que_cambia_una_bicicleta(self):
+        bicicletas, siguiente = catalogo.obtener_pagina({})
+        self.assertEqual(len(bicicletas), catalogo.POR_PAGINA)
+        self.assertEqual(siguiente, bicicletas[-1].id)
+        with self.assertNumQueries(0):
+            self.assertEqual(catalogo.obtener_pagina({})[1], siguiente)
+
+        primera = Bicicleta.objects.get(pk=self.bicicletas[0].pk)
+        primera.precio = Decimal('399000')
+        primera.save()
+        with self.assertNumQueries(1):
+            bicicletas, _ = catalogo.obtener_pagina({})
+        self.assertEqual(bicicletas[0].precio, Decimal('399000'))
+
+    def test_la_lista_muestra_los_datos_nuevos(self):
+        self.client.get(reverse('lista_bicicletas'))
+        primera = Bicicleta.objects.get(pk=self.bicicletas[0].pk)
+        primera.modelo = 'Marlin Pro'
+        primera.save()
+
+        respuesta = self.client.get(reverse('lista_bicicletas'))
+        self.assertContains(respuesta, 'Trek Marlin Pro')
+
+    def test_version_perdida_no_reutiliza_paginas_viejas(self):
+        version = catalogo.version_catalogo()
+        catalogo.obtener_pagina({})
+        cache.delete(catalogo.CLAVE_VERSION)
+        self.assertNotEqual(catalogo.version_catalogo(), version)
+
+        catalogo.invalidar_catalogo()
+        cache.delete(catalogo.CLAVE_VERSION)
+        catalogo.invalidar_catalogo()
+        self.assertNotEqual(catalogo.version_catalogo(), version)
+
+
+class StorageContado(FileSystemStorage):
+    """Storage en disco que cuenta las llamadas a exists()."""
+    consultas = 0
+
+    def exists(self, name):
+        StorageContado.consultas += 1
+        return super().exists(name)
+
+
+class StorageRenombra(FileSystemStorage):
+    """Guarda cada archivo con un nombre distinto al pedido, como al chocar con uno existente."""
+
+    def get_available_name(self, name, max_length=None):
+        base, extension = name.rsplit('.', 1)
+        return f'{base}_v2.{extension}'
+
+
+def imagen_jpeg(nombre='foto.jpg', color='red'):
+    buffer = BytesIO()
+    Image.new('RGB', (800, 600), color).save(buffer, 'JPEG')
+    return SimpleUploadedFile(nombre, buffer.getvalue(), content_type='image/jpeg')
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class MiniaturasTest(TestCase):
+    """Las miniaturas se anotan al generarse, se muestran sin exists() y se borran al reemplazar la imagen."""
+
+    def setUp(self):
+        cache.clear()
+        carpeta = tempfile.TemporaryDirectory()
+        self.addCleanup(carpeta.cleanup)
+        self.media = carpeta.name
+        ajuste = override_settings(MEDIA_ROOT=self.media)
+        ajuste.enable()
+        self.addCleanup(ajuste.disable)
+        # El pool corre la tarea en el mismo hilo para poder revisar el resultado
+        sincrono = mock.patch.object(miniaturas._pool, 'submit', side_effect=lambda funcion, *args: funcion(*args))
+        sincrono.start()
+        self.addCleanup(sincrono.stop)
+
+    def crear_bicicleta(self, imagen):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Bicicleta.objects.create(marca='Trek', modelo='Marlin', tipo='mtb',
+                                            precio=Decimal('450000'), anio=2024, imagen=imagen)
+
+    def test_render_no_consulta_el_storage(self):
+        bici = self.crear_bicicleta(imagen_jpeg())
+        StorageContado.consultas = 0
+        storage = StorageContado(location=self.media)
+        plantilla = Template("{% load imagenes_tags %}{% imagen_miniatura bici.imagen 'lista' %}")
+
+        with mock.patch('app_bicicletas.templatetags.imagenes_tags.default_storage', storage):
+            html = plantilla.render(Context({'bici': bici}))
+        self.assertEqual(miniaturas.url_miniatura(bici.imagen, 'mini', storage=storage),
+                         storage.url(miniaturas.ruta_miniatura(bici.imagen.name, 'mini', 'jpg')))
+        self.assertEqual(StorageContado.consultas, 0)
+        self.assertIn(miniaturas.ruta_miniatura(bici.imagen.name, 'lista', 'webp'), html)
+        self.assertIn(miniaturas.ruta_miniatura(bici.imagen.name, 'lista', 'jpg'), html)
+
+    def test_usa_el_nombre_que_devuelve_el_storage(self):
+        nombre = default_storage.save('bicicletas/foto.jpg', imagen_jpeg())
+        storage = StorageRenombra(location=self.media)
+        miniaturas.generar_miniaturas(nombre, storage=storage)
+
+        guardadas = miniaturas.miniaturas_guardadas(nombre, storage)
+        self.assertEqual(guardadas['lista', 'jpg'], 'bicicletas/foto_lista_v2.jpg')
+        self.assertTrue(storage.exists(guardadas['lista', 'jpg']))
+
+    def test_cambiar_la_imagen_borra_las_miniaturas_viejas(self):
+        bici = self.crear_bicicleta(imagen_jpeg('vieja.jpg'))
+        viejas = list(miniaturas.miniaturas_guardadas(bici.imagen.name).values())
+        self.assertEqual(len(viejas), len(miniaturas.TAMANOS) * len(miniaturas.FORMATOS))
+        self.assertTrue(all(default_storage.exists(ruta) for ruta in viejas))
+
+        bici.imagen = imagen_jpeg('nueva.jpg', 'blue')
+        with self.captureOnCommitCallbacks(execute=True):
+            bici.save()
+        self.assertFalse(any(default_storage.exists(ruta) for ruta in viejas))
+        nuevas = miniaturas.miniaturas_guardadas(bici.imagen.name).values()
+        self.assertTrue(all(default_storage.exists(ruta) for ruta in nuevas))
+
+        # Eliminar la bicicleta también borra sus miniaturas
+        with self.captureOnCommitCallbacks(execute=True):
+            bici.delete()
+        self.assertFalse(any(default_storage.exists(ruta) for ruta in nuevas))
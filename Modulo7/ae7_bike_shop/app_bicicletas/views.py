@@ -1,18 +1,35 @@
 from django.shortcuts import get_object_or_404, render
 from .models import Bicicleta
 from django.shortcuts import render, redirect
-from .forms import BicicletaForm
+from .forms import BicicletaForm, FiltroCatalogoForm
+from .catalogo import obtener_pagina
+from app_clientes.identidad import obtener_grupos
 from django.contrib.auth.decorators import login_required, permission_required, user_passes_test
 from django.contrib import messages
 
 
 def es_personal(user):
-    return user.groups.filter(name='Personal').exists()
+    return 'Personal' in obtener_grupos(user)
 
 
 def lista_bicicletas(request):
-    bicicletas = Bicicleta.objects.all()
-    return render(request, 'bicicletas/lista_bicicletas.html', {'bicicletas': bicicletas})
+    form = FiltroCatalogoForm(request.GET or None)
+    filtros = form.cleaned_data.copy() if form.is_valid() else {}
+    despues = filtros.pop('despues', None)
+
+    bicicletas, siguiente = obtener_pagina(filtros, despues)
+
+    # Parámetros de filtro para los enlaces de paginación
+    params = request.GET.copy()
+    params.pop('despues', None)
+
+    return render(request, 'bicicletas/lista_bicicletas.html', {
+        'bicicletas': bicicletas,
+        'form': form,
+        'siguiente': siguiente,
+        'es_primera_pagina': not despues,
+        'filtros_query': params.urlencode(),
+    })
 
 
 @login_required(login_url='login')
@@ -8,12 +8,27 @@ El carrito se guarda en request.session['carrito'] como un diccionario:
         'precio': str (Decimal se serializa como string)
     }
 }
+
+Se usa una sola instancia por request (ver obtener_carrito y
+CarritoMiddleware): las bicicletas se cargan con una única consulta y los
+totales quedan en caché hasta que el carrito se modifica.
 """
 from decimal import Decimal
 from django.conf import settings
 from app_bicicletas.models import Bicicleta
 
 
+def obtener_carrito(request):
+    """
+    Devuelve el carrito del request, creándolo solo la primera vez.
+    Vistas y template tags comparten así la misma instancia.
+    """
+    carrito = getattr(request, '_carrito', None)
+    if carrito is None:
+        carrito = request._carrito = Carrito(request)
+    return carrito
+
+
 class Carrito:
     """
     Clase para manejar el carrito de compras usando sesiones.
@@ -31,6 +46,15 @@ class Carrito:
             carrito = self.session[settings.CART_SESSION_ID] = {}
         
         self.carrito = carrito
+        self._items = None
+        self._precio_total = None
+    
+    def _invalidar(self):
+        """
+        Descartar los items y totales calculados.
+        """
+        self._items = None
+        self._precio_total = None
     
     def agregar(self, bicicleta, cantidad=1, actualizar_cantidad=False):
         """
@@ -61,6 +85,7 @@ class Carrito:
         Marcar la sesión como modificada para asegurar que se guarde.
         """
         self.session.modified = True
+        self._invalidar()
     
     def eliminar(self, bicicleta):
         """
@@ -72,23 +97,35 @@ class Carrito:
             del self.carrito[bicicleta_id]
             self.guardar()
     
-    def __iter__(self):
+    def _cargar_items(self):
         """
-        Iterar sobre los items del carrito y obtener las bicicletas desde la BD.
+        Construir los items del carrito con una sola consulta a la BD.
+        Los datos de la sesión no se modifican.
         """
-        bicicletas_ids = self.carrito.keys()
-        # Obtener las bicicletas y agregarlas al carrito
-        bicicletas = Bicicleta.objects.filter(id__in=bicicletas_ids)
-        
-        carrito = self.carrito.copy()
+        bicicletas = Bicicleta.objects.in_bulk(list(self.carrito.keys()))
         
-        for bicicleta in bicicletas:
-            carrito[str(bicicleta.id)]['bicicleta'] = bicicleta
-        
-        for item in carrito.values():
-            item['precio'] = Decimal(item['precio'])
-            item['total_precio'] = item['precio'] * item['cantidad']
-            yield item
+        items = []
+        for bicicleta_id, datos in self.carrito.items():
+            precio = Decimal(datos['precio'])
+            item = {
+                'cantidad': datos['cantidad'],
+                'precio': precio,
+                'total_precio': precio * datos['cantidad'],
+            }
+            bicicleta = bicicletas.get(int(bicicleta_id))
+            if bicicleta is not None:
+                item['bicicleta'] = bicicleta
+            items.append(item)
+        return items
+    
+    def __iter__(self):
+        """
+        Iterar sobre los items del carrito con sus bicicletas.
+        La consulta se hace solo en la primera iteración.
+        """
+        if self._items is None:
+            self._items = self._cargar_items()
+        return iter(self._items)
     
     def __len__(self):
         """
@@ -100,14 +137,18 @@ class Carrito:
         """
         Calcular el precio total de todos los items en el carrito.
         """
-        return sum(
-            Decimal(item['precio']) * item['cantidad']
-            for item in self.carrito.values()
-        )
+        if self._precio_total is None:
+            self._precio_total = sum(
+                (Decimal(item['precio']) * item['cantidad'] for item in self.carrito.values()),
+                Decimal('0')
+            )
+        return self._precio_total
     
     def limpiar(self):
         """
         Limpiar el carrito de la sesión.
         """
-        del self.session[settings.CART_SESSION_ID]
+        if settings.CART_SESSION_ID in self.session:
+            del self.session[settings.CART_SESSION_ID]
+        self.carrito = {}
         self.guardar()
@@ -0,0 +1,16 @@
+from django.utils.functional import SimpleLazyObject
+from .carrito import obtener_carrito
+
+
+class CarritoMiddleware:
+    """
+    Deja disponible request.carrito con una única instancia de Carrito por request.
+    El carrito se crea de forma perezosa, solo si alguna vista o template lo usa.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.carrito = SimpleLazyObject(lambda: obtener_carrito(request))
+        return self.get_response(request)
@@ -1,5 +1,5 @@
 from django import template
-from app_carrito.carrito import Carrito
+from app_carrito.carrito import obtener_carrito
 
 register = template.Library()
 
@@ -10,7 +10,7 @@ def cantidad_total_carrito(request):
     Template tag para mostrar la cantidad total de items en el carrito.
     Uso: {% cantidad_total_carrito request %}
     """
-    carrito = Carrito(request)
+    carrito = obtener_carrito(request)
     return len(carrito)
 
 
@@ -20,5 +20,5 @@ def total_carrito(request):
     Template tag para mostrar el total del carrito.
     Uso: {% total_carrito request %}
     """
-    carrito = Carrito(request)
+    carrito = obtener_carrito(request)
     return carrito.obtener_precio_total()
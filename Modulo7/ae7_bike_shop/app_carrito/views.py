@@ -3,12 +3,14 @@ from django.views.decorators.http import require_POST
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.utils import timezone
+from django.core.exceptions import ValidationError
 from decimal import Decimal
 import uuid
 from app_bicicletas.models import Bicicleta
-from app_ordenes.models import Orden, DetalleOrden
-from app_clientes.models import Cliente
-from .carrito import Carrito
+from app_ordenes.models import Orden
+from app_ordenes.servicios import crear_orden
+from app_clientes.identidad import obtener_cliente
+from .carrito import obtener_carrito
 from .forms import CarritoAgregarBicicletaForm
 
 
@@ -17,7 +19,7 @@ def carrito_agregar(request, bicicleta_id):
     """
     Agregar una bicicleta al carrito.
     """
-    carrito = Carrito(request)
+    carrito = obtener_carrito(request)
     bicicleta = get_object_or_404(Bicicleta, id=bicicleta_id)
     form = CarritoAgregarBicicletaForm(request.POST)
     
@@ -38,7 +40,7 @@ def carrito_eliminar(request, bicicleta_id):
     """
     Eliminar una bicicleta del carrito.
     """
-    carrito = Carrito(request)
+    carrito = obtener_carrito(request)
     bicicleta = get_object_or_404(Bicicleta, id=bicicleta_id)
     carrito.eliminar(bicicleta)
     messages.info(request, f'🗑️ {bicicleta.marca} {bicicleta.modelo} eliminado del carrito')
@@ -50,7 +52,7 @@ def carrito_detalle(request):
     """
     Mostrar el detalle del carrito.
     """
-    carrito = Carrito(request)
+    carrito = obtener_carrito(request)
     
     # Crear formularios para cada item del carrito
     for item in carrito:
@@ -73,21 +75,16 @@ def iniciar_checkout(request):
     Iniciar el proceso de checkout con Mercado Pago.
     Redirige a la página de pago.
     """
-    carrito = Carrito(request)
+    carrito = obtener_carrito(request)
     
     if len(carrito) == 0:
         messages.warning(request, '⚠️ Tu carrito está vacío')
         return redirect('carrito_detalle')
     
     # Verificar si el usuario tiene un cliente asociado
-    try:
-        cliente = Cliente.objects.get(email=request.user.email)
-    except Cliente.DoesNotExist:
+    if not request.cliente:
         # Crear un cliente automáticamente si no existe
-        cliente = Cliente.objects.create(
-            nombre=request.user.get_full_name() or request.user.username,
-            email=request.user.email
-        )
+        request.cliente = obtener_cliente(request.user, crear=True)
         messages.info(request, '✅ Perfil de cliente creado automáticamente')
     
     return redirect('checkout_mercadopago')
@@ -98,7 +95,7 @@ def checkout_mercadopago(request):
     """
     Página de checkout con simulación de Mercado Pago.
     """
-    carrito = Carrito(request)
+    carrito = obtener_carrito(request)
     
     if len(carrito) == 0:
         messages.warning(request, '⚠️ Tu carrito está vacío')
@@ -129,7 +126,7 @@ def procesar_pago_mercadopago(request):
     Procesar el pago simulado de Mercado Pago.
     Crea la orden y simula el procesamiento del pago.
     """
-    carrito = Carrito(request)
+    carrito = obtener_carrito(request)
     
     if len(carrito) == 0:
         messages.warning(request, '⚠️ Tu carrito está vacío')
@@ -139,31 +136,19 @@ def procesar_pago_mercadopago(request):
     payment_method = request.POST.get('payment_method')
     
     # Verificar cliente
-    try:
-        cliente = Cliente.objects.get(email=request.user.email)
-    except Cliente.DoesNotExist:
-        cliente = Cliente.objects.create(
-            nombre=request.user.get_full_name() or request.user.username,
-            email=request.user.email
-        )
-    
-    # Crear la orden
-    orden = Orden.objects.create(
-        cliente=cliente,
-        estado='pagado'  # Simulación: estado pagado directamente
-    )
+    cliente = request.cliente or obtener_cliente(request.user, crear=True)
     
-    # Crear los detalles de la orden
-    for item in carrito:
-        DetalleOrden.objects.create(
-            orden=orden,
-            bicicleta=item['bicicleta'],
-            precio_unitario=item['precio'],
-            cantidad=item['cantidad']
+    # Crear la orden con todos sus detalles en una sola transacción
+    try:
+        orden = crear_orden(
+            cliente,
+            carrito,
+            estado='pagado'  # Simulación: estado pagado directamente
         )
-    
-    # Calcular el total de la orden
-    orden.calcular_total()
+    except ValidationError as e:
+        for error in e.messages:
+            messages.error(request, f'⚠️ {error}')
+        return redirect('carrito_detalle')
     
     # Preparar información del pago para mostrar
     payment_info = {
@@ -240,10 +225,9 @@ def mis_ordenes(request):
     """
     Mostrar las órdenes del usuario actual.
     """
-    try:
-        cliente = Cliente.objects.get(email=request.user.email)
-        ordenes = Orden.objects.filter(cliente=cliente).prefetch_related('detalles__bicicleta').order_by('-fecha')
-    except Cliente.DoesNotExist:
+    if request.cliente:
+        ordenes = Orden.objects.filter(cliente=request.cliente).prefetch_related('detalles__bicicleta').order_by('-fecha')
+    else:
         ordenes = []
         messages.info(request, 'ℹ️ Aún no tienes órdenes')
     
@@ -0,0 +1,94 @@
+"""
+Estadísticas de clientes para el panel de administración.
+
+Todas las cifras se calculan en la base de datos con anotaciones y
+subconsultas, de modo que el número de consultas SQL no depende de la
+cantidad de clientes registrados.
+"""
+from decimal import Decimal
+from django.db.models import (
+    Avg, Count, DecimalField, IntegerField, OuterRef, Q, Subquery, Sum, Value
+)
+from django.db.models.functions import Coalesce
+from .models import Cliente
+
+
+def _subconsulta_conteo(queryset, campo):
+    """
+    Devuelve una subconsulta escalar que cuenta las filas de `queryset`
+    agrupadas por `campo` (la columna que apunta al cliente).
+    """
+    conteo = queryset.order_by().values(campo).annotate(total=Count('pk')).values('total')
+    return Coalesce(Subquery(conteo, output_field=IntegerField()), Value(0))
+
+
+def clientes_con_estadisticas():
+    """
+    Queryset de clientes anotado con:
+    - total_ordenes
+    - total_gastado (solo órdenes pagadas)
+    - total_resenas (vinculadas por email del usuario)
+    - total_inscripciones
+    """
+    from app_ordenes.models import ESTADOS_PAGADOS, Orden
+    from app_resenas.models import Resena
+    from app_eventos.models import Inscripcion
+
+    ordenes = Orden.objects.filter(cliente=OuterRef('pk'))
+    gastado = (
+        ordenes.filter(estado__in=ESTADOS_PAGADOS)
+        .order_by()
+        .values('cliente')
+        .annotate(suma=Sum('total'))
+        .values('suma')
+    )
+    monto = DecimalField(max_digits=12, decimal_places=2)
+
+    return Cliente.objects.select_related('perfil').annotate(
+        total_ordenes=_subconsulta_conteo(ordenes, 'cliente'),
+        total_gastado=Coalesce(
+            Subquery(gastado, output_field=monto),
+            Value(Decimal('0')),
+            output_field=monto,
+        ),
+        total_resenas=_subconsulta_conteo(
+            Resena.objects.filter(usuario__email=OuterRef('email')), 'usuario__email'
+        ),
+        total_inscripciones=_subconsulta_conteo(
+            Inscripcion.objects.filter(cliente=OuterRef('pk')), 'cliente'
+        ),
+    ).order_by('-created_at')
+
+
+def resumen_clientes(clientes=None):
+    """
+    Calcula las estadísticas generales del panel en una sola consulta.
+    """
+    if clientes is None:
+        clientes = clientes_con_estadisticas()
+
+    resumen = clientes.aggregate(
+        total_clientes=Count('pk'),
+        clientes_con_ordenes=Count('pk', filter=Q(total_ordenes__gt=0)),
+        clientes_con_resenas=Count('pk', filter=Q(total_resenas__gt=0)),
+        clientes_con_inscripciones=Count('pk', filter=Q(total_inscripciones__gt=0)),
+        promedio_gasto=Avg('total_gastado', filter=Q(total_gastado__gt=0)),
+    )
+    resumen['promedio_gasto'] = resumen['promedio_gasto'] or 0
+    return resumen
+
+
+def total_ingresos():
+    """Suma de todas las órdenes pagadas."""
+    from app_ordenes.models import ESTADOS_PAGADOS, Orden
+
+    return Orden.objects.filter(estado__in=ESTADOS_PAGADOS).aggregate(
+        total=Sum('total')
+    )['total'] or 0
+
+
+def top_clientes(clientes=None, limite=5):
+    """Clientes con mayor gasto, ordenados en la base de datos."""
+    if clientes is None:
+        clientes = clientes_con_estadisticas()
+    return clientes.filter(total_gastado__gt=0).order_by('-total_gastado')[:limite]
@@ -0,0 +1,81 @@
+"""
+Resolución del Cliente y de los grupos del usuario autenticado.
+
+Ambos se resuelven una sola vez por request (ver ClienteMiddleware) y se
+guardan en caché por unos minutos. La caché se invalida desde
+app_clientes/signals.py cuando cambia el cliente, su perfil o los grupos
+del usuario.
+"""
+from django.core.cache import cache
+from .models import Cliente
+
+
+TIEMPO_CACHE = 60 * 5
+
+# Marca para recordar en caché que el usuario no tiene Cliente
+SIN_CLIENTE = 'sin-cliente'
+
+
+def clave_cliente(email):
+    return f'cliente:email:{email.lower()}'
+
+
+def clave_grupos(user_id):
+    return f'grupos:usuario:{user_id}'
+
+
+def obtener_cliente(user, crear=False):
+    """
+    Devuelve el Cliente asociado al email del usuario (o None).
+    Con crear=True lo crea si no existe, como hacían las vistas de checkout
+    y eventos.
+    """
+    if not user.is_authenticated or not user.email:
+        return None
+
+    # Memo por request: request.user es el mismo objeto durante todo el request
+    cliente = getattr(user, '_cliente_cache', None)
+    if cliente is None:
+        cliente = cache.get(clave_cliente(user.email))
+        if cliente is None:
+            cliente = Cliente.objects.filter(email=user.email).first() or SIN_CLIENTE
+            cache.set(clave_cliente(user.email), cliente, TIEMPO_CACHE)
+        user._cliente_cache = cliente
+
+    if cliente == SIN_CLIENTE:
+        if not crear:
+            return None
+        cliente, _ = Cliente.objects.get_or_create(
+            email=user.email,
+            defaults={'nombre': user.get_full_name() or user.username}
+        )
+        user._cliente_cache = cliente
+        cache.set(clave_cliente(user.email), cliente, TIEMPO_CACHE)
+
+    return cliente
+
+
+def obtener_grupos(user):
+    """
+    Conjunto con los nombres de los grupos del usuario.
+    """
+    if not user.is_authenticated:
+        return frozenset()
+
+    grupos = getattr(user, '_grupos_cache', None)
+    if grupos is None:
+        grupos = cache.get(clave_grupos(user.pk))
+        if grupos is None:
+            grupos = frozenset(user.groups.values_list('name', flat=True))
+            cache.set(clave_grupos(user.pk), grupos, TIEMPO_CACHE)
+        user._grupos_cache = grupos
+    return grupos
+
+
+def invalidar_cliente(email):
+    if email:
+        cache.delete(clave_cliente(email))
+
+
+def invalidar_grupos(*user_ids):
+    cache.delete_many([clave_grupos(user_id) for user_id in user_ids])
@@ -0,0 +1,24 @@
+from django.utils.functional import SimpleLazyObject
+from .identidad import obtener_cliente, obtener_grupos
+
+
+class ClienteMiddleware:
+    """
+    Resuelve una sola vez por request:
+    - request.cliente: Cliente del usuario autenticado (o None)
+    - request.grupos: nombres de los grupos del usuario (frozenset)
+
+    Ambos son perezosos: un request que no los usa no consulta la caché ni la
+    base. Como request.cliente es un objeto perezoso, se compara por verdad
+    (`if request.cliente:`) y no con `is None`.
+
+    Debe ir después de AuthenticationMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.cliente = SimpleLazyObject(lambda: obtener_cliente(request.user))
+        request.grupos = SimpleLazyObject(lambda: obtener_grupos(request.user))
+        return self.get_response(request)
@@ -1,8 +1,71 @@
-from django.db.models.signals import post_save
+from django.contrib.auth.models import User
+from django.db.models.signals import pre_save, post_save, post_delete, m2m_changed
 from django.dispatch import receiver
 from .models import Cliente, PerfilCliente
+from .identidad import invalidar_cliente, invalidar_grupos
 
 @receiver(post_save, sender=Cliente)
 def crear_perfil_cliente(sender, instance, created, **kwargs):
     if created:
         PerfilCliente.objects.create(cliente=instance)
+
+
+@receiver(pre_save, sender=Cliente)
+@receiver(pre_save, sender=User)
+def recordar_email_anterior(sender, instance, update_fields=None, **kwargs):
+    """
+    Guarda el email que tenía la fila antes del save, para invalidar también
+    la clave del email viejo si cambia. Los save() que no tocan el email (por
+    ejemplo el de last_login al iniciar sesión) no hacen la consulta.
+    """
+    if instance.pk is None or (update_fields is not None and 'email' not in update_fields):
+        instance._email_anterior = None
+        return
+    instance._email_anterior = (
+        sender.objects.filter(pk=instance.pk).values_list('email', flat=True).first()
+    )
+
+
+def _invalidar_email_anterior(instance):
+    anterior = getattr(instance, '_email_anterior', None)
+    if anterior and anterior.lower() != (instance.email or '').lower():
+        invalidar_cliente(anterior)
+
+
+@receiver(post_save, sender=Cliente)
+@receiver(post_delete, sender=Cliente)
+def invalidar_cache_cliente(sender, instance, **kwargs):
+    invalidar_cliente(instance.email)
+    _invalidar_email_anterior(instance)
+
+
+@receiver(post_save, sender=PerfilCliente)
+def invalidar_cache_perfil(sender, instance, **kwargs):
+    invalidar_cliente(instance.cliente.email)
+
+
+@receiver(post_save, sender=User)
+def invalidar_cache_usuario(sender, instance, **kwargs):
+    invalidar_cliente(instance.email)
+    _invalidar_email_anterior(instance)
+    invalidar_grupos(instance.pk)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidar_cache_grupos(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear' and reverse:
+        # group.user_set.clear(): post_clear no trae los usuarios, se anotan antes
+        instance._usuarios_antes_de_clear = list(instance.user_set.values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    # Se invalida después del cambio: si se hiciera antes, otro request podría
+    # volver a guardar en caché los grupos viejos mientras tanto
+    if not reverse:
+        # user.groups.add(...) / remove / clear
+        invalidar_grupos(instance.pk)
+    elif action == 'post_clear':
+        invalidar_grupos(*instance.__dict__.pop('_usuarios_antes_de_clear', ()))
+    elif pk_set:
+        # group.user_set.add(...) / remove
+        invalidar_grupos(*pk_set)
@@ -1,3 +1,58 @@
-from django.test import TestCase
+from django.contrib.auth.models import Group, User
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from .identidad import clave_cliente, clave_grupos, obtener_cliente, obtener_grupos
+from .middleware import ClienteMiddleware
+from .models import Cliente
 
-# Create your tests here.
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class IdentidadCacheTest(TestCase):
+    """Cliente y grupos en caché: se resuelven solo si se usan y se invalidan al cambiar."""
+
+    def setUp(self):
+        cache.clear()
+        self.usuario = User.objects.create_user('ana', 'ana@bikeshop.cl', 'clave')
+        self.cliente = Cliente.objects.create(nombre='Ana', email='ana@bikeshop.cl')
+        self.grupo = Group.objects.create(name='Personal')
+
+    def usuario_nuevo(self):
+        """El mismo usuario como llegaría en otro request (sin el memo por request)."""
+        return User.objects.get(pk=self.usuario.pk)
+
+    def test_middleware_no_consulta_si_no_se_usa(self):
+        request = RequestFactory().get('/')
+        request.user = self.usuario
+        middleware = ClienteMiddleware(lambda request: HttpResponse())
+
+        with self.assertNumQueries(0):
+            middleware(request)
+        with self.assertNumQueries(1):
+            self.assertTrue(request.cliente)
+            self.assertEqual(request.cliente.pk, self.cliente.pk)
+
+    def test_cambio_de_email_invalida_la_clave_anterior(self):
+        obtener_cliente(self.usuario_nuevo())
+        self.assertIsNotNone(cache.get(clave_cliente('ana@bikeshop.cl')))
+
+        self.cliente.email = 'ana.perez@bikeshop.cl'
+        self.cliente.save()
+        self.assertIsNone(cache.get(clave_cliente('ana@bikeshop.cl')))
+        # El usuario con el email viejo ya no tiene cliente
+        self.assertIsNone(obtener_cliente(self.usuario_nuevo()))
+
+    def test_grupos_se_invalidan_al_agregar_y_al_vaciar(self):
+        self.assertEqual(obtener_grupos(self.usuario_nuevo()), frozenset())
+
+        self.grupo.user_set.add(self.usuario)
+        self.assertEqual(obtener_grupos(self.usuario_nuevo()), {'Personal'})
+
+        self.grupo.user_set.clear()
+        self.assertIsNone(cache.get(clave_grupos(self.usuario.pk)))
+        self.assertEqual(obtener_grupos(self.usuario_nuevo()), frozenset())
+
+        self.usuario.groups.add(self.grupo)
+        obtener_grupos(self.usuario_nuevo())
+        self.usuario.groups.clear()
+        self.assertEqual(obtener_grupos(self.usuario_nuevo()), frozenset())
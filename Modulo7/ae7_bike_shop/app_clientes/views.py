@@ -4,21 +4,26 @@ from django.contrib.auth.decorators import login_required, permission_required,
 from django.contrib import messages
 from django.views.decorators.http import require_http_methods
 from django.contrib.auth.models import User, Group
-from django.db.models import Count, Sum, Avg, Q
+from django.core.paginator import Paginator
 from .forms import ClienteRegistroForm, ClienteLoginForm, PerfilClienteForm
 from .models import Cliente, PerfilCliente
+from .identidad import obtener_cliente, obtener_grupos
+from .estadisticas import clientes_con_estadisticas, resumen_clientes, total_ingresos, top_clientes
+
+
+CLIENTES_POR_PAGINA = 50
 
 
 # Función auxiliar para verificar si el usuario es personal
 def es_personal(user):
     """Verifica si el usuario pertenece al grupo 'Personal'"""
-    return user.groups.filter(name='Personal').exists()
+    return 'Personal' in obtener_grupos(user)
 
 
 # Función auxiliar para verificar si el usuario es cliente
 def es_cliente(user):
     """Verifica si el usuario pertenece al grupo 'Cliente'"""
-    return user.groups.filter(name='Cliente').exists()
+    return 'Cliente' in obtener_grupos(user)
 
 
 @require_http_methods(["GET", "POST"])
@@ -90,7 +95,7 @@ def perfil(request):
     """
     Vista para mostrar y editar el perfil del usuario
     """
-    cliente = Cliente.objects.get(email=request.user.email)
+    cliente = request.cliente or obtener_cliente(request.user, crear=True)
     perfil, created = PerfilCliente.objects.get_or_create(cliente=cliente)
 
     if request.method == 'POST':
@@ -180,69 +185,29 @@ def panel_clientes(request):
     Vista de administración: muestra listado de clientes y estadísticas
     Solo accesible para usuarios staff/admin
     """
-    from app_ordenes.models import Orden
-    from app_resenas.models import Resena
-    from app_eventos.models import Inscripcion
-    
-    # Obtener todos los clientes con anotaciones
-    clientes = Cliente.objects.select_related('perfil').order_by('-created_at')
-    
-    # Agregar estadísticas manualmente para cada cliente
-    clientes_con_stats = []
-    for cliente in clientes:
-        # Buscar el usuario asociado por email
-        try:
-            user = User.objects.get(email=cliente.email)
-            total_resenas = Resena.objects.filter(usuario=user).count()
-        except User.DoesNotExist:
-            total_resenas = 0
-        
-        # Obtener estadísticas
-        ordenes = Orden.objects.filter(cliente=cliente)
-        total_ordenes = ordenes.count()
-        total_gastado_dict = ordenes.filter(estado='pagado').aggregate(total=Sum('total'))
-        total_gastado = total_gastado_dict['total'] if total_gastado_dict['total'] else 0
-        total_inscripciones = Inscripcion.objects.filter(cliente=cliente).count()
-        
-        # Agregar atributos al cliente
-        cliente.total_ordenes = total_ordenes
-        cliente.total_gastado = total_gastado
-        cliente.total_resenas = total_resenas
-        cliente.total_inscripciones = total_inscripciones
-        clientes_con_stats.append(cliente)
-    
-    # Estadísticas generales
-    total_clientes = len(clientes_con_stats)
-    clientes_con_ordenes = len([c for c in clientes_con_stats if c.total_ordenes > 0])
-    clientes_con_resenas = len([c for c in clientes_con_stats if c.total_resenas > 0])
-    clientes_con_inscripciones = len([c for c in clientes_con_stats if c.total_inscripciones > 0])
-    
-    # Total de ingresos
-    total_ingresos = Orden.objects.filter(estado='pagado').aggregate(
-        total=Sum('total')
-    )['total'] or 0
-    
-    # Promedio de gasto por cliente
-    clientes_con_gasto = [c for c in clientes_con_stats if c.total_gastado > 0]
-    promedio_gasto = sum(c.total_gastado for c in clientes_con_gasto) / len(clientes_con_gasto) if clientes_con_gasto else 0
-    
-    # Top 5 clientes por gasto
-    top_clientes = sorted([c for c in clientes_con_stats if c.total_gastado > 0], 
-                         key=lambda x: x.total_gastado, reverse=True)[:5]
-    
+    clientes = clientes_con_estadisticas()
+
+    # Estadísticas generales calculadas en la base de datos
+    resumen = resumen_clientes(clientes)
+
+    # Listado paginado de clientes
+    paginator = Paginator(clientes, CLIENTES_POR_PAGINA)
+    clientes_pagina = paginator.get_page(request.GET.get('page'))
+
     # Clientes recientes (últimos 10)
-    clientes_recientes = clientes_con_stats[:10]
-    
+    clientes_recientes = clientes[:10]
+
     contexto = {
-        'clientes': clientes_con_stats,
+        'clientes': clientes_pagina,
+        'page_obj': clientes_pagina,
         'clientes_recientes': clientes_recientes,
-        'total_clientes': total_clientes,
-        'clientes_con_ordenes': clientes_con_ordenes,
-        'clientes_con_resenas': clientes_con_resenas,
-        'clientes_con_inscripciones': clientes_con_inscripciones,
-        'total_ingresos': total_ingresos,
-        'promedio_gasto': promedio_gasto,
-        'top_clientes': top_clientes,
+        'total_clientes': resumen['total_clientes'],
+        'clientes_con_ordenes': resumen['clientes_con_ordenes'],
+        'clientes_con_resenas': resumen['clientes_con_resenas'],
+        'clientes_con_inscripciones': resumen['clientes_con_inscripciones'],
+        'total_ingresos': total_ingresos(),
+        'promedio_gasto': resumen['promedio_gasto'],
+        'top_clientes': top_clientes(clientes),
     }
     
     return render(request, 'clientes/panel_clientes.html', contexto)
@@ -5,3 +5,6 @@ class AppEventosConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app_eventos'
     verbose_name = 'Eventos y Salidas'
+
+    def ready(self):
+        import app_eventos.signals
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from app_clientes.models import Cliente
 from django.core.exceptions import ValidationError
 from django.utils import timezone
@@ -137,22 +137,22 @@ class Inscripcion(models.Model):
         if self.evento.evento_pasado():
             raise ValidationError('No se puede inscribir a un evento que ya pasó.')
     
-    def save(self, *args, **kwargs):
+    def save(self, *args, cupos_reservados=False, **kwargs):
         # Calcular total al guardar
         if not self.total_pagado:
             self.total_pagado = self.evento.precio * self.num_personas
         
-        # Si es nueva inscripción, reducir cupos
-        if not self.pk and self.estado == 'confirmada':
-            self.evento.cupo_disponible -= self.num_personas
-            self.evento.save()
+        # Si es nueva inscripción, reducir cupos con un UPDATE condicional
+        reservar = not self.pk and self.estado == 'confirmada' and not cupos_reservados
         
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            if reservar:
+                from .reservas import reservar_cupos
+                if not reservar_cupos(self.evento_id, self.num_personas):
+                    raise ValidationError('No hay suficientes cupos disponibles para este evento.')
+            super().save(*args, **kwargs)
     
     def cancelar(self):
         """Cancela la inscripción y libera cupos"""
-        if self.estado != 'cancelada':
-            self.estado = 'cancelada'
-            self.evento.cupo_disponible += self.num_personas
-            self.evento.save()
-            self.save()
+        from .reservas import cancelar
+        return cancelar(self)
@@ -0,0 +1,109 @@
+"""
+Reserva y liberación de cupos de eventos sin condiciones de carrera.
+
+Los cupos nunca se leen y se vuelven a guardar desde Python: se descuentan
+con un UPDATE condicional (... WHERE cupo_disponible >= n) usando F(), de
+modo que dos inscripciones simultáneas no pueden vender el mismo cupo.
+"""
+from django.db import transaction
+from django.db.models import F
+from .models import Evento, Inscripcion
+
+
+class ResultadoReserva:
+    """
+    Resultado de intentar inscribirse en un evento.
+    """
+    EXITOSA = 'exitosa'
+    AGOTADO = 'agotado'
+
+    def __init__(self, estado, inscripcion=None, cupos_disponibles=None):
+        self.estado = estado
+        self.inscripcion = inscripcion
+        self.cupos_disponibles = cupos_disponibles
+
+    @property
+    def exitosa(self):
+        return self.estado == self.EXITOSA
+
+    @property
+    def agotado(self):
+        return self.estado == self.AGOTADO
+
+    def __bool__(self):
+        return self.exitosa
+
+
+def reservar_cupos(evento_id, cantidad):
+    """
+    Descuenta `cantidad` cupos solo si alcanzan.
+    Devuelve True si la reserva se aplicó.
+    """
+    actualizados = Evento.objects.filter(
+        pk=evento_id,
+        cupo_disponible__gte=cantidad
+    ).update(cupo_disponible=F('cupo_disponible') - cantidad)
+    return actualizados == 1
+
+
+def liberar_cupos(evento_id, cantidad):
+    """
+    Devuelve `cantidad` cupos al evento.
+    """
+    Evento.objects.filter(pk=evento_id).update(
+        cupo_disponible=F('cupo_disponible') + cantidad
+    )
+
+
+def cupos_actuales(evento_id):
+    return Evento.objects.filter(pk=evento_id).values_list('cupo_disponible', flat=True).first()
+
+
+def inscribir(evento, cliente, num_personas=1, **datos):
+    """
+    Crea una inscripción confirmada descontando los cupos de forma atómica.
+
+    Si no quedan cupos suficientes no se crea nada y se devuelve un
+    ResultadoReserva con estado AGOTADO.
+    """
+    with transaction.atomic():
+        if not reservar_cupos(evento.pk, num_personas):
+            return ResultadoReserva(
+                ResultadoReserva.AGOTADO,
+                cupos_disponibles=cupos_actuales(evento.pk)
+            )
+
+        inscripcion = Inscripcion(
+            evento=evento,
+            cliente=cliente,
+            num_personas=num_personas,
+            estado='confirmada',
+            total_pagado=evento.precio * num_personas,
+            **datos
+        )
+        # Los cupos ya se descontaron arriba
+        inscripcion.save(cupos_reservados=True)
+        evento.cupo_disponible = cupos_actuales(evento.pk)
+
+    return ResultadoReserva(
+        ResultadoReserva.EXITOSA,
+        inscripcion=inscripcion,
+        cupos_disponibles=evento.cupo_disponible
+    )
+
+
+def cancelar(inscripcion):
+    """
+    Cancela la inscripción y libera sus cupos una sola vez, aunque se
+    llame en paralelo. Devuelve True si esta llamada hizo la cancelación.
+    """
+    with transaction.atomic():
+        cancelada = Inscripcion.objects.filter(
+            pk=inscripcion.pk
+        ).exclude(estado='cancelada').update(estado='cancelada')
+        if cancelada:
+            liberar_cupos(inscripcion.evento_id, inscripcion.num_personas)
+            inscripcion.evento.cupo_disponible = cupos_actuales(inscripcion.evento_id)
+
+    inscripcion.estado = 'cancelada'
+    return bool(cancelada)
@@ -0,0 +1,20 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from app_bicicletas.miniaturas import miniaturas_tras_guardar, programar_borrado_miniaturas, registrar_cambio_imagen
+from .models import Evento
+
+
+@receiver(pre_save, sender=Evento)
+def detectar_cambio_imagen(sender, instance, **kwargs):
+    registrar_cambio_imagen(instance)
+
+
+@receiver(post_save, sender=Evento)
+def generar_miniaturas_evento(sender, instance, **kwargs):
+    miniaturas_tras_guardar(instance)
+
+
+@receiver(post_delete, sender=Evento)
+def borrar_miniaturas_evento(sender, instance, **kwargs):
+    if instance.imagen:
+        programar_borrado_miniaturas(instance.imagen.name)
@@ -1 +1,82 @@
-# This file is needed for Django to recognize this directory as a Python package
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from decimal import Decimal
+from django.db import connection, OperationalError
+from django.test import TransactionTestCase
+from django.utils import timezone
+from app_clientes.models import Cliente
+from .models import Evento, Inscripcion
+from .reservas import inscribir, cancelar
+
+
+class ReservaConcurrenteTest(TransactionTestCase):
+    """
+    Prueba de estrés: cientos de inscripciones en paralelo contra el mismo
+    evento nunca deben vender más cupos de los que existen.
+
+    Corre contra la base configurada en DATABASES (SQLite, MySQL o Postgres).
+    """
+    CUPOS = 50
+    SOLICITUDES = 300
+    HILOS = 32
+
+    def setUp(self):
+        self.evento = Evento.objects.create(
+            nombre='Salida al Volcán',
+            descripcion='Prueba de concurrencia',
+            tipo_evento='volcan',
+            dificultad='intermedio',
+            destino='Volcán Osorno',
+            punto_encuentro='Plaza',
+            fecha_hora=timezone.now() + timedelta(days=7),
+            duracion_horas=Decimal('5.0'),
+            distancia_km=Decimal('40.0'),
+            cupo_maximo=self.CUPOS,
+            cupo_disponible=self.CUPOS,
+            precio=Decimal('15000'),
+        )
+        self.clientes = Cliente.objects.bulk_create([
+            Cliente(nombre=f'Ciclista {i}', email=f'ciclista{i}@bikeshop.cl')
+            for i in range(self.SOLICITUDES)
+        ])
+
+    def _inscribir(self, cliente):
+        try:
+            for _ in range(50):
+                try:
+                    return inscribir(self.evento, cliente, num_personas=1).exitosa
+                except OperationalError:
+                    # SQLite bloquea la tabla completa bajo escritura concurrente
+                    time.sleep(0.01)
+            return False
+        finally:
+            connection.close()
+
+    def test_no_se_venden_mas_cupos_de_los_disponibles(self):
+        with ThreadPoolExecutor(max_workers=self.HILOS) as pool:
+            resultados = list(pool.map(self._inscribir, self.clientes))
+
+        self.evento.refresh_from_db()
+        confirmadas = Inscripcion.objects.filter(evento=self.evento, estado='confirmada').count()
+
+        self.assertEqual(sum(resultados), confirmadas)
+        self.assertLessEqual(confirmadas, self.CUPOS)
+        self.assertGreaterEqual(self.evento.cupo_disponible, 0)
+        self.assertEqual(self.evento.cupo_disponible, self.CUPOS - confirmadas)
+        self.assertEqual(confirmadas, self.CUPOS)
+
+    def test_evento_agotado(self):
+        resultado = inscribir(self.evento, self.clientes[0], num_personas=self.CUPOS + 1)
+
+        self.assertTrue(resultado.agotado)
+        self.assertIsNone(resultado.inscripcion)
+        self.assertEqual(resultado.cupos_disponibles, self.CUPOS)
+
+    def test_cancelar_libera_cupos_una_sola_vez(self):
+        inscripcion = inscribir(self.evento, self.clientes[0], num_personas=3).inscripcion
+
+        self.assertTrue(cancelar(inscripcion))
+        self.assertFalse(cancelar(inscripcion))
+        self.evento.refresh_from_db()
+        self.assertEqual(self.evento.cupo_disponible, self.CUPOS)
@@ -3,7 +3,8 @@ from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.utils import timezone
 from .models import Evento, Inscripcion
-from app_clientes.models import Cliente
+from .reservas import inscribir
+from app_clientes.identidad import obtener_cliente
 
 
 def lista_eventos(request):
@@ -42,15 +43,11 @@ def detalle_evento(request, evento_id):
     
     # Verificar si el usuario ya está inscrito
     ya_inscrito = False
-    if request.user.is_authenticated:
-        try:
-            cliente = Cliente.objects.get(email=request.user.email)
-            ya_inscrito = Inscripcion.objects.filter(
-                evento=evento,
-                cliente=cliente
-            ).exclude(estado='cancelada').exists()
-        except Cliente.DoesNotExist:
-            pass
+    if request.cliente:
+        ya_inscrito = Inscripcion.objects.filter(
+            evento=evento,
+            cliente=request.cliente
+        ).exclude(estado='cancelada').exists()
     
     context = {
         'evento': evento,
@@ -72,13 +69,7 @@ def inscribirse_evento(request, evento_id):
         return redirect('detalle_evento', evento_id=evento_id)
     
     # Obtener o crear cliente
-    try:
-        cliente = Cliente.objects.get(email=request.user.email)
-    except Cliente.DoesNotExist:
-        cliente = Cliente.objects.create(
-            nombre=request.user.get_full_name() or request.user.username,
-            email=request.user.email
-        )
+    cliente = request.cliente or obtener_cliente(request.user, crear=True)
     
     # Verificar si ya está inscrito
     if Inscripcion.objects.filter(evento=evento, cliente=cliente).exclude(estado='cancelada').exists():
@@ -91,27 +82,24 @@ def inscribirse_evento(request, evento_id):
         telefono_emergencia = request.POST.get('telefono_emergencia', '')
         observaciones = request.POST.get('observaciones', '')
         
-        # Verificar cupos disponibles
-        if evento.cupo_disponible < num_personas:
-            messages.error(
-                request,
-                f'⚠️ No hay suficientes cupos. Solo quedan {evento.cupo_disponible} cupos disponibles.'
-            )
-            return redirect('detalle_evento', evento_id=evento_id)
-        
-        # Crear inscripción
-        total = evento.precio * num_personas
-        inscripcion = Inscripcion.objects.create(
-            evento=evento,
-            cliente=cliente,
+        # Reservar cupos e inscribir de forma atómica
+        resultado = inscribir(
+            evento,
+            cliente,
             num_personas=num_personas,
             contacto_emergencia=contacto_emergencia,
             telefono_emergencia=telefono_emergencia,
-            observaciones=observaciones,
-            estado='confirmada',
-            total_pagado=total
+            observaciones=observaciones
         )
         
+        if resultado.agotado:
+            messages.error(
+                request,
+                f'⚠️ No hay suficientes cupos. Solo quedan {resultado.cupos_disponibles} cupos disponibles.'
+            )
+            return redirect('detalle_evento', evento_id=evento_id)
+        
+        total = resultado.inscripcion.total_pagado
         messages.success(
             request,
             f'✅ ¡Inscripción exitosa! Te esperamos en {evento.nombre}. Total: ${total}'
@@ -129,12 +117,11 @@ def mis_inscripciones(request):
     """
     Mostrar las inscripciones del usuario actual.
     """
-    try:
-        cliente = Cliente.objects.get(email=request.user.email)
+    if request.cliente:
         inscripciones = Inscripcion.objects.filter(
-            cliente=cliente
+            cliente=request.cliente
         ).select_related('evento').order_by('-fecha_inscripcion')
-    except Cliente.DoesNotExist:
+    else:
         inscripciones = []
         messages.info(request, 'ℹ️ Aún no tienes inscripciones a eventos.')
     
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class OrdenesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app_ordenes'
+
+    def ready(self):
+        import app_ordenes.signals
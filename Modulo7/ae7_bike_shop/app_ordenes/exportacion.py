@@ -0,0 +1,121 @@
+"""
+Exportación en streaming de órdenes, detalles, clientes e inscripciones.
+
+Las filas se leen en lotes de chunk_size paginados por clave (pk > último
+id del lote anterior, LIMIT chunk_size) y se escriben de a una en la
+respuesta, así la memoria usada no depende del tamaño de la tabla: nunca se
+arma el queryset completo ni el archivo completo en memoria. Se pagina en
+vez de usar .iterator() porque con MySQL (mysqlclient, el backend de este
+proyecto) .iterator() trae todo el resultado al cliente antes de entregar
+la primera fila; los lotes por clave acotan la memoria en cualquier base.
+Los datos relacionados (cliente, bicicleta, evento) salen del mismo JOIN,
+sin consultas extra por fila.
+"""
+import csv
+import json
+from django.core.serializers.json import DjangoJSONEncoder
+from app_clientes.models import Cliente
+from app_eventos.models import Inscripcion
+from .models import Orden, DetalleOrden
+
+
+TAMANO_LOTE = 2000
+
+FORMATOS = {
+    'csv': 'text/csv; charset=utf-8',
+    'json': 'application/json',
+}
+
+# nombre -> (modelo, [(columna, campo de values_list), ...])
+EXPORTACIONES = {
+    'ordenes': (Orden, [
+        ('id', 'id'),
+        ('fecha', 'fecha'),
+        ('cliente_id', 'cliente_id'),
+        ('cliente', 'cliente__nombre'),
+        ('email', 'cliente__email'),
+        ('estado', 'estado'),
+        ('total', 'total'),
+    ]),
+    'detalles': (DetalleOrden, [
+        ('id', 'id'),
+        ('orden_id', 'orden_id'),
+        ('fecha', 'orden__fecha'),
+        ('estado', 'orden__estado'),
+        ('email', 'orden__cliente__email'),
+        ('bicicleta_id', 'bicicleta_id'),
+        ('marca', 'bicicleta__marca'),
+        ('modelo', 'bicicleta__modelo'),
+        ('cantidad', 'cantidad'),
+        ('precio_unitario', 'precio_unitario'),
+    ]),
+    'clientes': (Cliente, [
+        ('id', 'id'),
+        ('nombre', 'nombre'),
+        ('email', 'email'),
+        ('creado', 'created_at'),
+        ('telefono', 'perfil__telefono'),
+        ('direccion', 'perfil__direccion'),
+    ]),
+    'inscripciones': (Inscripcion, [
+        ('id', 'id'),
+        ('evento_id', 'evento_id'),
+        ('evento', 'evento__nombre'),
+        ('fecha_evento', 'evento__fecha_hora'),
+        ('email', 'cliente__email'),
+        ('fecha_inscripcion', 'fecha_inscripcion'),
+        ('num_personas', 'num_personas'),
+        ('estado', 'estado'),
+        ('pagado', 'pagado'),
+        ('total_pagado', 'total_pagado'),
+    ]),
+}
+
+
+class _Eco:
+    """Archivo falso para csv.writer: devuelve la línea en vez de guardarla."""
+
+    def write(self, valor):
+        return valor
+
+
+def filas(nombre, chunk_size=TAMANO_LOTE):
+    """
+    Itera las filas de la exportación `nombre` como tuplas, en orden de id.
+    Hace una consulta por cada `chunk_size` filas.
+    """
+    modelo, columnas = EXPORTACIONES[nombre]
+    campos = [campo for _, campo in columnas]
+    consulta = modelo.objects.order_by('pk').values_list('pk', *campos)
+    lote = list(consulta[:chunk_size])
+    while lote:
+        for fila in lote:
+            yield fila[1:]
+        if len(lote) < chunk_size:
+            return
+        lote = list(consulta.filter(pk__gt=lote[-1][0])[:chunk_size])
+
+
+def lineas_csv(nombre, chunk_size=TAMANO_LOTE):
+    """Genera el CSV línea por línea, partiendo por los encabezados."""
+    writer = csv.writer(_Eco())
+    yield writer.writerow([columna for columna, _ in EXPORTACIONES[nombre][1]])
+    for fila in filas(nombre, chunk_size):
+        yield writer.writerow(fila)
+
+
+def lineas_json(nombre, chunk_size=TAMANO_LOTE):
+    """Genera un arreglo JSON con un objeto por fila, sin armarlo completo."""
+    columnas = [columna for columna, _ in EXPORTACIONES[nombre][1]]
+    separador = '['
+    for fila in filas(nombre, chunk_size):
+        yield separador + json.dumps(dict(zip(columnas, fila)), cls=DjangoJSONEncoder, ensure_ascii=False)
+        separador = ',\n'
+    yield '[]' if separador == '[' else ']\n'
+
+
+def exportar(nombre, formato, chunk_size=TAMANO_LOTE):
+    """Generador de la exportación `nombre` en `formato` ('csv' o 'json')."""
+    if formato == 'csv':
+        return lineas_csv(nombre, chunk_size)
+    return lineas_json(nombre, chunk_size)
@@ -0,0 +1,22 @@
+from datetime import timedelta
+from django import forms
+from django.utils import timezone
+
+
+class RangoFechasForm(forms.Form):
+    """Rango de fechas para los reportes de ventas (por defecto, últimos 30 días)"""
+    desde = forms.DateField(widget=forms.DateInput(attrs={'type': 'date', 'class': 'form-control'}))
+    hasta = forms.DateField(widget=forms.DateInput(attrs={'type': 'date', 'class': 'form-control'}))
+
+    def __init__(self, data=None, *args, **kwargs):
+        hoy = timezone.localdate()
+        if not data or not data.get('desde') or not data.get('hasta'):
+            data = {'desde': hoy - timedelta(days=30), 'hasta': hoy}
+        super().__init__(data, *args, **kwargs)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        desde, hasta = cleaned_data.get('desde'), cleaned_data.get('hasta')
+        if desde and hasta and desde > hasta:
+            raise forms.ValidationError('La fecha inicial no puede ser posterior a la final.')
+        return cleaned_data
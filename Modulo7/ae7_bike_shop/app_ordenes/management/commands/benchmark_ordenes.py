@@ -0,0 +1,79 @@
+import time
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from app_bicicletas.models import Bicicleta
+from app_clientes.models import Cliente
+from app_ordenes.models import Orden, DetalleOrden
+from app_ordenes.servicios import crear_orden
+
+
+class Rollback(Exception):
+    """Se usa para deshacer los datos de prueba al terminar cada medición."""
+
+
+def crear_orden_anterior(cliente, items, estado='pendiente'):
+    """Flujo original del checkout: un INSERT por detalle y luego calcular_total()."""
+    orden = Orden.objects.create(cliente=cliente, estado=estado)
+    for item in items:
+        DetalleOrden.objects.create(
+            orden=orden,
+            bicicleta=item['bicicleta'],
+            precio_unitario=item['precio'],
+            cantidad=item['cantidad']
+        )
+    orden.calcular_total()
+    return orden
+
+
+class Command(BaseCommand):
+    help = 'Compara el checkout anterior (create por línea) con crear_orden (bulk_create)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lineas', type=int, nargs='+', default=[1, 10, 100])
+        parser.add_argument('--repeticiones', type=int, default=20)
+
+    def medir(self, funcion, items, repeticiones):
+        tiempos = []
+        consultas = 0
+        for _ in range(repeticiones):
+            try:
+                with transaction.atomic():
+                    cliente = Cliente.objects.create(nombre='Benchmark', email='benchmark@bikeshop.cl')
+                    with CaptureQueriesContext(connection) as ctx:
+                        inicio = time.perf_counter()
+                        funcion(cliente, items, estado='pagado')
+                        tiempos.append(time.perf_counter() - inicio)
+                    consultas = len(ctx)
+                    raise Rollback
+            except Rollback:
+                pass
+        tiempos.sort()
+        return tiempos[len(tiempos) // 2] * 1000, consultas
+
+    def handle(self, *args, **options):
+        for n in options['lineas']:
+            try:
+                with transaction.atomic():
+                    bicicletas = Bicicleta.objects.bulk_create([
+                        Bicicleta(marca='Bench', modelo=f'B-{i}', tipo='mtb',
+                                  precio=Decimal('100000'), anio=2024)
+                        for i in range(n)
+                    ])
+                    items = [
+                        {'bicicleta': b, 'cantidad': 2, 'precio': b.precio}
+                        for b in bicicletas
+                    ]
+                    anterior = self.medir(crear_orden_anterior, items, options['repeticiones'])
+                    nuevo = self.medir(crear_orden, items, options['repeticiones'])
+                    raise Rollback
+            except Rollback:
+                pass
+
+            self.stdout.write(
+                f'{n:>4} líneas | anterior: {anterior[0]:8.2f} ms ({anterior[1]} consultas) | '
+                f'bulk: {nuevo[0]:8.2f} ms ({nuevo[1]} consultas)'
+            )
+
+        self.stdout.write(self.style.SUCCESS('Benchmark finalizado'))
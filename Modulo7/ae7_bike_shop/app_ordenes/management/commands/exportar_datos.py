@@ -0,0 +1,24 @@
+import sys
+from django.core.management.base import BaseCommand
+from app_ordenes.exportacion import EXPORTACIONES, FORMATOS, TAMANO_LOTE, exportar
+
+
+class Command(BaseCommand):
+    help = 'Exporta órdenes, detalles, clientes o inscripciones a CSV/JSON sin cargar la tabla en memoria'
+
+    def add_arguments(self, parser):
+        parser.add_argument('nombre', choices=EXPORTACIONES.keys())
+        parser.add_argument('--formato', choices=FORMATOS.keys(), default='csv')
+        parser.add_argument('--salida', help='Archivo de destino (por defecto, la salida estándar)')
+        parser.add_argument('--chunk-size', type=int, default=TAMANO_LOTE)
+
+    def handle(self, *args, **options):
+        lineas = exportar(options['nombre'], options['formato'], options['chunk_size'])
+
+        if not options['salida']:
+            sys.stdout.writelines(lineas)
+            return
+
+        with open(options['salida'], 'w', encoding='utf-8', newline='') as archivo:
+            archivo.writelines(lineas)
+        self.stderr.write(self.style.SUCCESS(f"Exportación guardada en {options['salida']}"))
@@ -0,0 +1,144 @@
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+from app_bicicletas.models import Bicicleta
+from app_clientes.models import Cliente
+from app_ordenes.models import Orden, DetalleOrden
+from app_ordenes.reportes import ESTADOS_PAGADOS, reconstruir, resumen_rango
+
+
+class Command(BaseCommand):
+    help = (
+        'Genera órdenes pagadas sintéticas repartidas en los últimos días, '
+        'reconstruye los acumulados y compara el reporte contra recorrer DetalleOrden'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--detalles', type=int, default=1_000_000,
+                            help='Detalles de orden a generar (se crean órdenes hasta llegar)')
+        parser.add_argument('--ordenes', type=int, default=None,
+                            help='Cantidad fija de órdenes (en vez de --detalles)')
+        parser.add_argument('--max-lineas', type=int, default=3,
+                            help='Máximo de detalles por orden (promedio ~ la mitad)')
+        parser.add_argument('--dias', type=int, default=365)
+        parser.add_argument('--clientes', type=int, default=1000)
+        parser.add_argument('--lote', type=int, default=5000)
+        parser.add_argument('--semilla', type=int, default=7)
+        parser.add_argument('--solo-medir', action='store_true',
+                            help='No genera datos, solo mide los reportes')
+
+    def preparar_catalogo(self, n_clientes):
+        bicicletas = list(Bicicleta.objects.values_list('id', 'precio'))
+        if not bicicletas:
+            Bicicleta.objects.bulk_create([
+                Bicicleta(marca='Sintética', modelo=f'S-{i}', tipo=tipo,
+                          precio=Decimal(random.randint(100, 2000) * 1000), anio=2024)
+                for i, tipo in enumerate(['mtb', 'ruta', 'enduro', 'trail', 'bmx'] * 10)
+            ])
+            bicicletas = list(Bicicleta.objects.values_list('id', 'precio'))
+
+        faltan = n_clientes - Cliente.objects.filter(email__endswith='@sintetico.cl').count()
+        if faltan > 0:
+            inicio = Cliente.objects.count()
+            Cliente.objects.bulk_create([
+                Cliente(nombre=f'Cliente sintético {inicio + i}', email=f'c{inicio + i}@sintetico.cl')
+                for i in range(faltan)
+            ], batch_size=1000)
+        clientes = list(Cliente.objects.filter(email__endswith='@sintetico.cl').values_list('id', flat=True))
+        return bicicletas, clientes
+
+    def generar(self, opciones):
+        random.seed(opciones['semilla'])
+        bicicletas, clientes = self.preparar_catalogo(opciones['clientes'])
+        ahora = timezone.now()
+        lote = opciones['lote']
+        lineas = creadas = 0
+
+        while True:
+            if opciones['ordenes'] is not None:
+                n = min(lote, opciones['ordenes'] - creadas)
+            else:
+                n = lote if lineas < opciones['detalles'] else 0
+            if n <= 0:
+                break
+            with transaction.atomic():
+                anterior = Orden.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+                # bulk_create no dispara señales: los acumulados se reconstruyen al final
+                ordenes = Orden.objects.bulk_create([
+                    Orden(cliente_id=random.choice(clientes), estado='pagado') for _ in range(n)
+                ])
+                if ordenes[0].pk:
+                    ids = [orden.pk for orden in ordenes]
+                else:
+                    # MySQL no devuelve los ids de bulk_create y no tienen por qué ser
+                    # consecutivos: se vuelven a leer. La transacción ve sus propias filas
+                    # y no las que otras conexiones confirmen mientras tanto
+                    ids = list(
+                        Orden.objects.filter(pk__gt=anterior).order_by('pk').values_list('pk', flat=True)
+                    )
+
+                detalles = []
+                max_lineas = min(opciones['max_lineas'], len(bicicletas))
+                for orden_id in ids:
+                    for bicicleta_id, precio in random.sample(bicicletas, random.randint(1, max_lineas)):
+                        detalles.append(DetalleOrden(
+                            orden_id=orden_id, bicicleta_id=bicicleta_id,
+                            cantidad=random.randint(1, 3), precio_unitario=precio
+                        ))
+                DetalleOrden.objects.bulk_create(detalles, batch_size=lote)
+                lineas += len(detalles)
+
+                # fecha es auto_now_add: se reparte en el rango con un UPDATE por día
+                por_dia = {}
+                for orden_id in ids:
+                    por_dia.setdefault(random.randrange(opciones['dias']), []).append(orden_id)
+                for dia, pks in por_dia.items():
+                    Orden.objects.filter(pk__in=pks).update(fecha=ahora - timedelta(days=dia))
+
+            creadas += n
+            self.stdout.write(f'  {creadas} órdenes / {lineas} detalles')
+
+        inicio = time.perf_counter()
+        dias = reconstruir()
+        self.stdout.write(f'Acumulados reconstruidos ({dias} días) en {time.perf_counter() - inicio:.2f} s')
+
+    def medir(self, dias):
+        hasta = timezone.localdate()
+        desde = hasta - timedelta(days=dias)
+
+        inicio = time.perf_counter()
+        reporte = resumen_rango(desde, hasta)
+        list(reporte['dias']), list(reporte['bicicletas']), list(reporte['tipos']), list(reporte['clientes'])
+        acumulados = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        detalles = DetalleOrden.objects.filter(
+            orden__estado__in=ESTADOS_PAGADOS,
+            orden__fecha__date__gte=desde, orden__fecha__date__lte=hasta
+        )
+        subtotal = Sum(F('cantidad') * F('precio_unitario'))
+        detalles.aggregate(u=Sum('cantidad'), i=subtotal, o=Count('orden', distinct=True))
+        list(detalles.values('bicicleta_id').annotate(u=Sum('cantidad'), i=subtotal).order_by('-u')[:10])
+        list(detalles.values('bicicleta__tipo').annotate(u=Sum('cantidad'), i=subtotal))
+        list(detalles.values('orden__cliente_id').annotate(u=Sum('cantidad'), i=subtotal).order_by('-i')[:10])
+        directo = time.perf_counter() - inicio
+
+        self.stdout.write(
+            f'{dias:>4} días | acumulados: {acumulados * 1000:9.2f} ms | '
+            f'DetalleOrden: {directo * 1000:9.2f} ms'
+        )
+
+    def handle(self, *args, **opciones):
+        if not opciones['solo_medir']:
+            self.generar(opciones)
+
+        self.stdout.write(f'Detalles en la BD: {DetalleOrden.objects.count()}')
+        for dias in (7, 30, 365):
+            self.medir(dias)
+
+        self.stdout.write(self.style.SUCCESS('Benchmark finalizado'))
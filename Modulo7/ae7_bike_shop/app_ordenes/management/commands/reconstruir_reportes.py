@@ -0,0 +1,16 @@
+from datetime import date
+from django.core.management.base import BaseCommand
+from app_ordenes.reportes import reconstruir
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye los acumulados diarios de ventas a partir de las órdenes pagadas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--desde', type=date.fromisoformat, help='AAAA-MM-DD')
+        parser.add_argument('--hasta', type=date.fromisoformat, help='AAAA-MM-DD')
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        dias = reconstruir(options['desde'], options['hasta'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'{dias} días de ventas recalculados'))
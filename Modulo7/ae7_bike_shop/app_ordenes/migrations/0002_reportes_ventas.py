@@ -0,0 +1,82 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_bicicletas', '0002_indices_catalogo'),
+        ('app_clientes', '0001_initial'),
+        ('app_ordenes', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VentaDiaria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField(unique=True)),
+                ('ordenes', models.IntegerField(default=0)),
+                ('unidades', models.IntegerField(default=0)),
+                ('ingresos', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+            options={
+                'verbose_name': 'Venta diaria',
+                'verbose_name_plural': 'Ventas diarias',
+                'ordering': ['fecha'],
+            },
+        ),
+        migrations.AddField(
+            model_name='orden',
+            name='en_reportes',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.CreateModel(
+            name='VentaDiariaTipo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField()),
+                ('tipo', models.CharField(max_length=20)),
+                ('unidades', models.IntegerField(default=0)),
+                ('ingresos', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+            options={
+                'verbose_name': 'Venta diaria por tipo',
+                'verbose_name_plural': 'Ventas diarias por tipo',
+                'unique_together': {('fecha', 'tipo')},
+            },
+        ),
+        migrations.CreateModel(
+            name='VentaDiariaBicicleta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField()),
+                ('unidades', models.IntegerField(default=0)),
+                ('ingresos', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('bicicleta', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ventas_diarias', to='app_bicicletas.bicicleta')),
+            ],
+            options={
+                'verbose_name': 'Venta diaria por bicicleta',
+                'verbose_name_plural': 'Ventas diarias por bicicleta',
+                'unique_together': {('fecha', 'bicicleta')},
+            },
+        ),
+        migrations.CreateModel(
+            name='VentaDiariaCliente',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField()),
+                ('ordenes', models.IntegerField(default=0)),
+                ('unidades', models.IntegerField(default=0)),
+                ('ingresos', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('cliente', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ventas_diarias', to='app_clientes.cliente')),
+            ],
+            options={
+                'verbose_name': 'Venta diaria por cliente',
+                'verbose_name_plural': 'Ventas diarias por cliente',
+                'unique_together': {('fecha', 'cliente')},
+            },
+        ),
+    ]
@@ -0,0 +1,68 @@
+from django.db import migrations
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+
+# Copia de app_ordenes.models.ESTADOS_PAGADOS al momento de esta migración
+ESTADOS_PAGADOS = ('pagado', 'pagada')
+
+
+def cargar_reportes(apps, schema_editor):
+    # Las órdenes pagadas antes de 0002 no pasaron por las señales: se suman aquí.
+    # Misma consulta que app_ordenes.reportes.reconstruir, con los modelos históricos
+    Orden = apps.get_model('app_ordenes', 'Orden')
+    DetalleOrden = apps.get_model('app_ordenes', 'DetalleOrden')
+    VentaDiaria = apps.get_model('app_ordenes', 'VentaDiaria')
+    VentaDiariaBicicleta = apps.get_model('app_ordenes', 'VentaDiariaBicicleta')
+    VentaDiariaTipo = apps.get_model('app_ordenes', 'VentaDiariaTipo')
+    VentaDiariaCliente = apps.get_model('app_ordenes', 'VentaDiariaCliente')
+
+    ordenes = Orden.objects.filter(estado__in=ESTADOS_PAGADOS).annotate(dia=TruncDate('fecha')).order_by()
+    detalles = DetalleOrden.objects.filter(orden__estado__in=ESTADOS_PAGADOS).annotate(
+        dia=TruncDate('orden__fecha')
+    ).order_by()
+    subtotal = Sum(F('cantidad') * F('precio_unitario'))
+
+    ordenes_por_dia = dict(ordenes.values_list('dia').annotate(n=Count('id')))
+    ordenes_por_cliente = {
+        (dia, cliente): n
+        for dia, cliente, n in ordenes.values_list('dia', 'cliente_id').annotate(n=Count('id'))
+    }
+
+    filas = {
+        VentaDiaria: [
+            VentaDiaria(fecha=fila['dia'], ordenes=ordenes_por_dia.get(fila['dia'], 0),
+                        unidades=fila['u'], ingresos=fila['i'])
+            for fila in detalles.values('dia').annotate(u=Sum('cantidad'), i=subtotal)
+        ],
+        VentaDiariaBicicleta: [
+            VentaDiariaBicicleta(fecha=fila['dia'], bicicleta_id=fila['bicicleta_id'],
+                                 unidades=fila['u'], ingresos=fila['i'])
+            for fila in detalles.values('dia', 'bicicleta_id').annotate(u=Sum('cantidad'), i=subtotal)
+        ],
+        VentaDiariaTipo: [
+            VentaDiariaTipo(fecha=fila['dia'], tipo=fila['bicicleta__tipo'],
+                            unidades=fila['u'], ingresos=fila['i'])
+            for fila in detalles.values('dia', 'bicicleta__tipo').annotate(u=Sum('cantidad'), i=subtotal)
+        ],
+        VentaDiariaCliente: [
+            VentaDiariaCliente(fecha=fila['dia'], cliente_id=fila['orden__cliente_id'],
+                               ordenes=ordenes_por_cliente.get((fila['dia'], fila['orden__cliente_id']), 0),
+                               unidades=fila['u'], ingresos=fila['i'])
+            for fila in detalles.values('dia', 'orden__cliente_id').annotate(u=Sum('cantidad'), i=subtotal)
+        ],
+    }
+    for modelo, nuevas in filas.items():
+        modelo.objects.all().delete()
+        modelo.objects.bulk_create(nuevas, batch_size=5000)
+    Orden.objects.filter(estado__in=ESTADOS_PAGADOS).update(en_reportes=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_ordenes', '0002_reportes_ventas'),
+    ]
+
+    operations = [
+        migrations.RunPython(cargar_reportes, migrations.RunPython.noop),
+    ]
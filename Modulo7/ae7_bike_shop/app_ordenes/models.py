@@ -2,6 +2,11 @@ from django.db import models
 from app_clientes.models import Cliente
 from app_bicicletas.models import Bicicleta
 
+# Estados que cuentan como venta: 'pagado' lo guarda el checkout y 'pagada'
+# es la opción del admin. Lo usan los reportes diarios y las estadísticas de clientes.
+ESTADOS_PAGADOS = ('pagado', 'pagada')
+
+
 class Orden(models.Model):
     cliente = models.ForeignKey(
         Cliente,
@@ -24,6 +29,8 @@ class Orden(models.Model):
         through='DetalleOrden',
         related_name='ordenes'
     )
+    # Indica si la orden ya está sumada en los reportes diarios
+    en_reportes = models.BooleanField(default=False, editable=False)
 
     def calcular_total(self):
         """Calcula y actualiza el total de la orden basado en los detalles"""
@@ -35,6 +42,16 @@ class Orden(models.Model):
         self.save()
         return total
 
+    def save(self, *args, **kwargs):
+        # en_reportes solo se cambia con UPDATE condicionales (app_ordenes/reportes.py);
+        # un save() desde una instancia desactualizada no debe pisarlo
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                campo.attname for campo in self._meta.concrete_fields
+                if not campo.primary_key and campo.attname != 'en_reportes'
+            ]
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"Orden #{self.id} - {self.cliente.nombre}"
 
@@ -66,4 +83,64 @@ class DetalleOrden(models.Model):
 
     class Meta:
         verbose_name = "Detalle de Orden"
-        verbose_name_plural = "Detalles de Órdenes"
\ No newline at end of file
+        verbose_name_plural = "Detalles de Órdenes"
+
+# ---------------------------------------------------------------------------
+# Reportes de ventas: acumulados diarios
+# Se actualizan cuando una orden queda pagada (ver app_ordenes/reportes.py)
+# ---------------------------------------------------------------------------
+
+class VentaDiaria(models.Model):
+    """Totales de ventas pagadas por día"""
+    fecha = models.DateField(unique=True)
+    ordenes = models.IntegerField(default=0)
+    unidades = models.IntegerField(default=0)
+    ingresos = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    def __str__(self):
+        return f"{self.fecha} - ${self.ingresos}"
+
+    class Meta:
+        verbose_name = "Venta diaria"
+        verbose_name_plural = "Ventas diarias"
+        ordering = ['fecha']
+
+
+class VentaDiariaBicicleta(models.Model):
+    """Unidades e ingresos por bicicleta y día"""
+    fecha = models.DateField()
+    bicicleta = models.ForeignKey(Bicicleta, on_delete=models.CASCADE, related_name='ventas_diarias')
+    unidades = models.IntegerField(default=0)
+    ingresos = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        verbose_name = "Venta diaria por bicicleta"
+        verbose_name_plural = "Ventas diarias por bicicleta"
+        unique_together = ['fecha', 'bicicleta']
+
+
+class VentaDiariaTipo(models.Model):
+    """Unidades e ingresos por tipo de bicicleta y día"""
+    fecha = models.DateField()
+    tipo = models.CharField(max_length=20)
+    unidades = models.IntegerField(default=0)
+    ingresos = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        verbose_name = "Venta diaria por tipo"
+        verbose_name_plural = "Ventas diarias por tipo"
+        unique_together = ['fecha', 'tipo']
+
+
+class VentaDiariaCliente(models.Model):
+    """Órdenes, unidades e ingresos por cliente y día"""
+    fecha = models.DateField()
+    cliente = models.ForeignKey(Cliente, on_delete=models.CASCADE, related_name='ventas_diarias')
+    ordenes = models.IntegerField(default=0)
+    unidades = models.IntegerField(default=0)
+    ingresos = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        verbose_name = "Venta diaria por cliente"
+        verbose_name_plural = "Ventas diarias por cliente"
+        unique_together = ['fecha', 'cliente']
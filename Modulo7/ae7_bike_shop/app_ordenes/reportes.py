@@ -0,0 +1,231 @@
+"""
+Motor de reportes de ventas.
+
+Las ventas se acumulan por día en cuatro tablas (VentaDiaria,
+VentaDiariaBicicleta, VentaDiariaTipo y VentaDiariaCliente). Cada orden se
+suma una sola vez cuando pasa a estado pagado y se resta si deja de estarlo
+(Orden.en_reportes evita contarla dos veces). Los detalles que se agregan,
+editan o eliminan en una orden ya sumada ajustan solo su línea
+(acumular_detalle). Los reportes por rango de fechas leen estas tablas en
+vez de recorrer DetalleOrden.
+"""
+from collections import defaultdict
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from app_bicicletas.models import Bicicleta
+from .models import (
+    ESTADOS_PAGADOS, Orden, DetalleOrden, VentaDiaria, VentaDiariaBicicleta, VentaDiariaTipo,
+    VentaDiariaCliente,
+)
+
+
+def _sumar(modelo, filtros, crear=True, **valores):
+    """
+    Suma `valores` a la fila de `modelo` identificada por `filtros`,
+    creándola si no existe (con crear=False solo actualiza si ya existe).
+    """
+    if crear:
+        modelo.objects.get_or_create(**filtros)
+    modelo.objects.filter(**filtros).update(**{
+        campo: F(campo) + valor for campo, valor in valores.items()
+    })
+
+
+def acumular_orden(orden_id, signo=1, ordenes=None):
+    """
+    Suma (signo=1) o resta (signo=-1) una orden en los acumulados diarios.
+    Devuelve False si la orden ya estaba en ese estado (no hace nada).
+    """
+    if ordenes is None:
+        ordenes = Orden.objects.all()
+
+    with transaction.atomic():
+        marcada = ordenes.filter(pk=orden_id, en_reportes=(signo < 0)).update(
+            en_reportes=(signo > 0)
+        )
+        if not marcada:
+            return False
+
+        orden = Orden.objects.only('fecha', 'cliente_id').get(pk=orden_id)
+        fecha = timezone.localdate(orden.fecha)
+
+        detalles = DetalleOrden.objects.filter(orden_id=orden_id).values(
+            'bicicleta_id', 'bicicleta__tipo', 'cantidad', 'precio_unitario'
+        )
+
+        por_bicicleta = defaultdict(lambda: [0, Decimal('0')])
+        por_tipo = defaultdict(lambda: [0, Decimal('0')])
+        for detalle in detalles:
+            subtotal = detalle['cantidad'] * detalle['precio_unitario']
+            for acumulado, clave in ((por_bicicleta, detalle['bicicleta_id']),
+                                     (por_tipo, detalle['bicicleta__tipo'])):
+                acumulado[clave][0] += detalle['cantidad']
+                acumulado[clave][1] += subtotal
+
+        unidades = sum(u for u, _ in por_bicicleta.values())
+        ingresos = sum((i for _, i in por_bicicleta.values()), Decimal('0'))
+
+        _sumar(VentaDiaria, {'fecha': fecha},
+               ordenes=signo, unidades=signo * unidades, ingresos=signo * ingresos)
+        _sumar(VentaDiariaCliente, {'fecha': fecha, 'cliente_id': orden.cliente_id},
+               ordenes=signo, unidades=signo * unidades, ingresos=signo * ingresos)
+        for bicicleta_id, (u, i) in por_bicicleta.items():
+            _sumar(VentaDiariaBicicleta, {'fecha': fecha, 'bicicleta_id': bicicleta_id},
+                   unidades=signo * u, ingresos=signo * i)
+        for tipo, (u, i) in por_tipo.items():
+            _sumar(VentaDiariaTipo, {'fecha': fecha, 'tipo': tipo},
+                   unidades=signo * u, ingresos=signo * i)
+
+    return True
+
+
+def acumular_detalle(orden_id, bicicleta_id, cantidad, precio_unitario, signo=1):
+    """
+    Suma (signo=1) o resta (signo=-1) una línea de detalle en los acumulados
+    de su orden, solo si la orden ya está sumada en los reportes. Las órdenes
+    que todavía no están pagadas no se tocan: al pagarse, acumular_orden
+    suma todos sus detalles de una vez. Devuelve False si no hizo nada.
+    """
+    with transaction.atomic():
+        # El bloqueo de la fila ordena este ajuste con el UPDATE de en_reportes
+        # de acumular_orden: la línea se cuenta una vez, con la orden o aquí
+        orden = (
+            Orden.objects.select_for_update().filter(pk=orden_id, en_reportes=True)
+            .values('fecha', 'cliente_id').first()
+        )
+        if orden is None:
+            return False
+
+        fecha = timezone.localdate(orden['fecha'])
+        unidades = signo * cantidad
+        ingresos = signo * cantidad * precio_unitario
+        # Al restar no se crean filas: la bicicleta puede estar eliminándose
+        crear = signo > 0
+        _sumar(VentaDiaria, {'fecha': fecha}, crear, unidades=unidades, ingresos=ingresos)
+        _sumar(VentaDiariaCliente, {'fecha': fecha, 'cliente_id': orden['cliente_id']}, crear,
+               unidades=unidades, ingresos=ingresos)
+        _sumar(VentaDiariaBicicleta, {'fecha': fecha, 'bicicleta_id': bicicleta_id}, crear,
+               unidades=unidades, ingresos=ingresos)
+        tipo = Bicicleta.objects.filter(pk=bicicleta_id).values_list('tipo', flat=True).first()
+        if tipo is not None:
+            _sumar(VentaDiariaTipo, {'fecha': fecha, 'tipo': tipo}, crear,
+                   unidades=unidades, ingresos=ingresos)
+
+    return True
+
+
+def sincronizar_orden(orden_id):
+    """
+    Deja la orden sumada en los reportes si está pagada y la resta si dejó
+    de estarlo. Es idempotente: se puede llamar en cada save().
+    """
+    pagadas = Orden.objects.filter(estado__in=ESTADOS_PAGADOS)
+    if acumular_orden(orden_id, 1, ordenes=pagadas):
+        return True
+    return acumular_orden(orden_id, -1, ordenes=Orden.objects.exclude(estado__in=ESTADOS_PAGADOS))
+
+
+def reconstruir(desde=None, hasta=None, batch_size=5000):
+    """
+    Recalcula los acumulados de un rango de fechas (o de todo el historial)
+    a partir de DetalleOrden, con consultas agrupadas y bulk_create.
+    """
+    detalles = DetalleOrden.objects.filter(orden__estado__in=ESTADOS_PAGADOS)
+    ordenes = Orden.objects.filter(estado__in=ESTADOS_PAGADOS)
+    rango = {}
+    if desde:
+        rango['fecha__date__gte'] = desde
+    if hasta:
+        rango['fecha__date__lte'] = hasta
+
+    detalles = detalles.filter(**{f'orden__{k}': v for k, v in rango.items()}).annotate(
+        dia=TruncDate('orden__fecha')
+    ).order_by()
+    ordenes = ordenes.filter(**rango).annotate(dia=TruncDate('fecha')).order_by()
+    subtotal = Sum(F('cantidad') * F('precio_unitario'))
+
+    ordenes_por_dia = dict(ordenes.values_list('dia').annotate(n=Count('id')))
+    ordenes_por_cliente = {
+        (dia, cliente): n
+        for dia, cliente, n in ordenes.values_list('dia', 'cliente_id').annotate(n=Count('id'))
+    }
+
+    diarias = [
+        VentaDiaria(fecha=fila['dia'], ordenes=ordenes_por_dia.get(fila['dia'], 0),
+                    unidades=fila['u'], ingresos=fila['i'])
+        for fila in detalles.values('dia').annotate(u=Sum('cantidad'), i=subtotal)
+    ]
+    por_bicicleta = [
+        VentaDiariaBicicleta(fecha=fila['dia'], bicicleta_id=fila['bicicleta_id'],
+                             unidades=fila['u'], ingresos=fila['i'])
+        for fila in detalles.values('dia', 'bicicleta_id').annotate(u=Sum('cantidad'), i=subtotal)
+    ]
+    por_tipo = [
+        VentaDiariaTipo(fecha=fila['dia'], tipo=fila['bicicleta__tipo'],
+                        unidades=fila['u'], ingresos=fila['i'])
+        for fila in detalles.values('dia', 'bicicleta__tipo').annotate(u=Sum('cantidad'), i=subtotal)
+    ]
+    por_cliente = [
+        VentaDiariaCliente(fecha=fila['dia'], cliente_id=fila['orden__cliente_id'],
+                           ordenes=ordenes_por_cliente.get((fila['dia'], fila['orden__cliente_id']), 0),
+                           unidades=fila['u'], ingresos=fila['i'])
+        for fila in detalles.values('dia', 'orden__cliente_id').annotate(u=Sum('cantidad'), i=subtotal)
+    ]
+
+    filtro_fechas = {}
+    if desde:
+        filtro_fechas['fecha__gte'] = desde
+    if hasta:
+        filtro_fechas['fecha__lte'] = hasta
+
+    with transaction.atomic():
+        for modelo, filas in ((VentaDiaria, diarias), (VentaDiariaBicicleta, por_bicicleta),
+                              (VentaDiariaTipo, por_tipo), (VentaDiariaCliente, por_cliente)):
+            modelo.objects.filter(**filtro_fechas).delete()
+            modelo.objects.bulk_create(filas, batch_size=batch_size)
+        ordenes.update(en_reportes=True)
+        Orden.objects.filter(**rango).exclude(estado__in=ESTADOS_PAGADOS).update(en_reportes=False)
+
+    return len(diarias)
+
+
+def resumen_rango(desde, hasta, limite=10):
+    """
+    Reporte de ventas entre dos fechas (inclusive), leído desde los acumulados.
+    """
+    rango = {'fecha__gte': desde, 'fecha__lte': hasta}
+
+    dias = VentaDiaria.objects.filter(**rango).order_by('fecha')
+    totales = dias.aggregate(ordenes=Sum('ordenes'), unidades=Sum('unidades'), ingresos=Sum('ingresos'))
+
+    bicicletas = (
+        VentaDiariaBicicleta.objects.filter(**rango)
+        .values('bicicleta_id', 'bicicleta__marca', 'bicicleta__modelo')
+        .annotate(unidades=Sum('unidades'), ingresos=Sum('ingresos'))
+        .order_by('-unidades')[:limite]
+    )
+    tipos = (
+        VentaDiariaTipo.objects.filter(**rango)
+        .values('tipo')
+        .annotate(unidades=Sum('unidades'), ingresos=Sum('ingresos'))
+        .order_by('-ingresos')
+    )
+    clientes = (
+        VentaDiariaCliente.objects.filter(**rango)
+        .values('cliente_id', 'cliente__nombre', 'cliente__email')
+        .annotate(ordenes=Sum('ordenes'), unidades=Sum('unidades'), ingresos=Sum('ingresos'))
+        .order_by('-ingresos')[:limite]
+    )
+
+    return {
+        'dias': dias,
+        'ordenes': totales['ordenes'] or 0,
+        'unidades': totales['unidades'] or 0,
+        'ingresos': totales['ingresos'] or 0,
+        'bicicletas': bicicletas,
+        'tipos': tipos,
+        'clientes': clientes,
+    }
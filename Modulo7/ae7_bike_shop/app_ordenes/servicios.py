@@ -0,0 +1,68 @@
+"""
+Servicios para construir órdenes a partir del carrito.
+
+La orden completa se valida antes de escribir nada y luego se guarda en una
+sola transacción: un INSERT para la Orden (con el total ya calculado) y un
+bulk_create para todos sus detalles.
+"""
+from decimal import Decimal
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from .models import Orden, DetalleOrden
+
+
+def validar_items(items):
+    """
+    Valida todas las líneas del carrito de una vez.
+
+    Cada item debe traer 'bicicleta', 'cantidad' y 'precio' (tal como los
+    entrega Carrito.__iter__). Devuelve la lista de items y el total.
+    Lanza ValidationError con todos los problemas encontrados.
+    """
+    items = list(items)
+    errores = []
+    total = Decimal('0')
+
+    if not items:
+        raise ValidationError('El carrito está vacío.')
+
+    for item in items:
+        bicicleta = item.get('bicicleta')
+        if bicicleta is None:
+            errores.append('Una de las bicicletas del carrito ya no existe.')
+            continue
+        if not bicicleta.disponible:
+            errores.append(f'{bicicleta.marca} {bicicleta.modelo} no está disponible.')
+        if item['cantidad'] < 1:
+            errores.append(f'Cantidad inválida para {bicicleta.marca} {bicicleta.modelo}.')
+        total += Decimal(item['precio']) * item['cantidad']
+
+    if errores:
+        raise ValidationError(errores)
+
+    return items, total
+
+
+def crear_orden(cliente, items, estado='pendiente'):
+    """
+    Crea una Orden con todos sus detalles en una transacción.
+
+    - Valida todo el carrito antes de escribir
+    - Calcula el total en la misma pasada
+    - Inserta la Orden una sola vez y los detalles con bulk_create
+    """
+    items, total = validar_items(items)
+
+    with transaction.atomic():
+        orden = Orden.objects.create(cliente=cliente, estado=estado, total=total)
+        DetalleOrden.objects.bulk_create([
+            DetalleOrden(
+                orden=orden,
+                bicicleta=item['bicicleta'],
+                precio_unitario=item['precio'],
+                cantidad=item['cantidad'],
+            )
+            for item in items
+        ])
+
+    return orden
@@ -0,0 +1,48 @@
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+from .models import Orden, DetalleOrden
+from .reportes import acumular_detalle, acumular_orden, sincronizar_orden
+
+
+@receiver(post_save, sender=Orden)
+def actualizar_reportes(sender, instance, **kwargs):
+    # Se espera al commit para que los detalles (bulk_create, inlines del
+    # admin) ya estén guardados cuando se sumen
+    orden_id = instance.pk
+    transaction.on_commit(lambda: sincronizar_orden(orden_id))
+
+
+@receiver(pre_delete, sender=Orden)
+def descontar_orden_eliminada(sender, instance, **kwargs):
+    # Los detalles todavía existen en pre_delete
+    acumular_orden(instance.pk, -1)
+
+
+@receiver(pre_save, sender=DetalleOrden)
+def recordar_detalle_anterior(sender, instance, **kwargs):
+    """Recordar la línea guardada para poder descontarla al editar"""
+    instance._anterior = None
+    if instance.pk:
+        instance._anterior = DetalleOrden.objects.filter(pk=instance.pk).values_list(
+            'orden_id', 'bicicleta_id', 'cantidad', 'precio_unitario'
+        ).first()
+
+
+@receiver(post_save, sender=DetalleOrden)
+def ajustar_reportes_detalle(sender, instance, **kwargs):
+    # Solo tiene efecto si la orden ya está sumada (ver acumular_detalle)
+    anterior = getattr(instance, '_anterior', None)
+    actual = (instance.orden_id, instance.bicicleta_id, instance.cantidad, instance.precio_unitario)
+    if anterior == actual:
+        return
+    if anterior:
+        acumular_detalle(*anterior, signo=-1)
+    acumular_detalle(*actual, signo=1)
+
+
+@receiver(post_delete, sender=DetalleOrden)
+def descontar_detalle_eliminado(sender, instance, **kwargs):
+    # Al eliminar la orden completa, pre_delete ya la descontó (en_reportes=False)
+    acumular_detalle(instance.orden_id, instance.bicicleta_id, instance.cantidad,
+                     instance.precio_unitario, signo=-1)
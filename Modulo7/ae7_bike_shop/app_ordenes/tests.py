@@ -1,3 +1,246 @@
+import gc
+import json
+import os
+import resource
+from importlib import import_module
+from decimal import Decimal
+from unittest import skipUnless
+from django.apps import apps
+from django.contrib.auth.models import User
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from app_bicicletas.models import Bicicleta
+from app_clientes.estadisticas import total_ingresos
+from app_clientes.models import Cliente
+from . import exportacion, reportes
+from .models import Orden, DetalleOrden, VentaDiaria, VentaDiariaBicicleta, VentaDiariaCliente, VentaDiariaTipo
 
-# Create your tests here.
+
+def rss_actual():
+    """Memoria residente actual del proceso, en bytes (Linux)."""
+    with open('/proc/self/statm') as statm:
+        return int(statm.read().split()[1]) * resource.getpagesize()
+
+
+class ExportacionStreamingTest(TestCase):
+    """
+    Exporta cientos de miles de detalles de orden y verifica que la memoria
+    del proceso no crece con el tamaño de la tabla. La cota viene de leer en
+    lotes por clave, no del backend: vale igual con MySQL que con SQLite.
+    """
+    FILAS = 500_000
+    LINEAS_POR_ORDEN = 10
+    LOTE = 10_000
+    TECHO_RSS = 40 * 1024 * 1024
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user('staff', 'staff@bikeshop.cl', 'clave', is_staff=True)
+        cliente = Cliente.objects.create(nombre='Exportación', email='exportacion@bikeshop.cl')
+        bicicletas = Bicicleta.objects.bulk_create([
+            Bicicleta(marca='Trek', modelo=f'X-{i}', tipo='mtb', precio=Decimal('250000'), anio=2024)
+            for i in range(20)
+        ])
+
+        ordenes = cls.FILAS // cls.LINEAS_POR_ORDEN
+        Orden.objects.bulk_create(
+            (Orden(cliente=cliente, estado='pagado', total=Decimal('500000')) for _ in range(ordenes)),
+            batch_size=cls.LOTE
+        )
+        orden_ids = list(Orden.objects.values_list('id', flat=True))
+        for inicio in range(0, ordenes, cls.LOTE // cls.LINEAS_POR_ORDEN):
+            DetalleOrden.objects.bulk_create([
+                DetalleOrden(orden_id=orden_id, bicicleta=bicicletas[i % len(bicicletas)],
+                             cantidad=2, precio_unitario=Decimal('250000'))
+                for orden_id in orden_ids[inicio:inicio + cls.LOTE // cls.LINEAS_POR_ORDEN]
+                for i in range(cls.LINEAS_POR_ORDEN)
+            ])
+        del orden_ids
+
+    def setUp(self):
+        self.client.force_login(self.staff)
+
+    @skipUnless(os.path.exists('/proc/self/statm'), 'requiere /proc para medir la memoria')
+    def test_csv_de_500k_filas_con_memoria_acotada(self):
+        respuesta = self.client.get(reverse('exportar_datos', args=['detalles', 'csv']))
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertTrue(respuesta.streaming)
+
+        gc.collect()
+        inicial = rss_actual()
+        maximo = inicial
+        lineas = 0
+        for parte in respuesta.streaming_content:
+            lineas += parte.count(b'\n')
+            if lineas % 10_000 == 0:
+                maximo = max(maximo, rss_actual())
+
+        self.assertEqual(lineas, self.FILAS + 1)
+        self.assertLess(maximo - inicial, self.TECHO_RSS,
+                        f'La exportación creció {(maximo - inicial) / 2**20:.1f} MB')
+
+    def test_lotes_por_clave(self):
+        ordenes = self.FILAS // self.LINEAS_POR_ORDEN
+        # Una consulta por lote (LIMIT) más la que confirma que no quedan filas
+        with self.assertNumQueries(ordenes // self.LOTE + 1):
+            ids = [fila[0] for fila in exportacion.filas('ordenes', chunk_size=self.LOTE)]
+        self.assertEqual(ids, list(Orden.objects.order_by('pk').values_list('pk', flat=True)))
+        with self.assertNumQueries(1):
+            self.assertEqual(len(list(exportacion.filas('ordenes', chunk_size=ordenes + 1))), ordenes)
+
+    def test_json_y_permisos(self):
+        respuesta = self.client.get(reverse('exportar_datos', args=['ordenes', 'json']))
+        ordenes = json.loads(b''.join(respuesta.streaming_content))
+        self.assertEqual(len(ordenes), self.FILAS // self.LINEAS_POR_ORDEN)
+        self.assertEqual(ordenes[0]['email'], 'exportacion@bikeshop.cl')
+
+        respuesta = self.client.get(reverse('exportar_datos', args=['inscripciones', 'json']))
+        self.assertEqual(json.loads(b''.join(respuesta.streaming_content)), [])
+
+        self.assertEqual(self.client.get(reverse('exportar_datos', args=['usuarios', 'csv'])).status_code, 404)
+
+        self.client.logout()
+        respuesta = self.client.get(reverse('exportar_datos', args=['clientes', 'csv']))
+        self.assertEqual(respuesta.status_code, 302)
+
+
+class ReportesVentasTest(TestCase):
+    """Acumulados diarios: se suman al pagar, se restan al dejar de estar pagada o al eliminar."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.cliente = Cliente.objects.create(nombre='Ana', email='ana@bikeshop.cl')
+        cls.mtb = Bicicleta.objects.create(marca='Trek', modelo='Marlin', tipo='mtb',
+                                           precio=Decimal('300000'), anio=2024)
+        cls.ruta = Bicicleta.objects.create(marca='Giant', modelo='TCR', tipo='ruta',
+                                            precio=Decimal('900000'), anio=2024)
+
+    def crear_orden(self, estado):
+        with self.captureOnCommitCallbacks(execute=True):
+            orden = Orden.objects.create(cliente=self.cliente, estado=estado)
+            DetalleOrden.objects.bulk_create([
+                DetalleOrden(orden=orden, bicicleta=self.mtb, cantidad=2, precio_unitario=Decimal('300000')),
+                DetalleOrden(orden=orden, bicicleta=self.ruta, cantidad=1, precio_unitario=Decimal('900000')),
+            ])
+        return orden
+
+    def cambiar_estado(self, orden, estado):
+        orden.estado = estado
+        with self.captureOnCommitCallbacks(execute=True):
+            orden.save()
+
+    def resumen(self):
+        hoy = timezone.localdate()
+        datos = reportes.resumen_rango(hoy, hoy)
+        return datos['ordenes'], datos['unidades'], datos['ingresos']
+
+    def test_transiciones_de_estado(self):
+        orden = self.crear_orden('pendiente')
+        self.assertEqual(self.resumen(), (0, 0, 0))
+
+        self.cambiar_estado(orden, 'pagada')
+        self.assertEqual(self.resumen(), (1, 3, Decimal('1500000')))
+        # Guardar otra vez (o desde una instancia desactualizada) no la suma dos veces
+        self.cambiar_estado(orden, 'pagada')
+        self.cambiar_estado(Orden.objects.get(pk=orden.pk), 'pagado')
+        self.assertEqual(self.resumen(), (1, 3, Decimal('1500000')))
+
+        self.cambiar_estado(orden, 'cancelada')
+        self.assertEqual(self.resumen(), (0, 0, 0))
+        self.assertEqual(VentaDiariaTipo.objects.get(tipo='ruta').unidades, 0)
+        orden.refresh_from_db()
+        self.assertFalse(orden.en_reportes)
+
+    def test_acumular_orden_es_idempotente(self):
+        orden = self.crear_orden('pagado')
+        self.assertFalse(reportes.acumular_orden(orden.pk, 1))
+        self.assertTrue(reportes.acumular_orden(orden.pk, -1))
+        self.assertFalse(reportes.acumular_orden(orden.pk, -1))
+        self.assertEqual(self.resumen(), (0, 0, 0))
+
+    def test_eliminar_orden_pagada_la_descuenta(self):
+        self.crear_orden('pagado')
+        orden = self.crear_orden('pagada')
+        self.assertEqual(self.resumen(), (2, 6, Decimal('3000000')))
+        orden.delete()
+        self.assertEqual(self.resumen(), (1, 3, Decimal('1500000')))
+        self.assertEqual(VentaDiariaCliente.objects.get().ordenes, 1)
+        # Eliminar una orden no pagada no toca los acumulados
+        self.crear_orden('pendiente').delete()
+        self.assertEqual(self.resumen(), (1, 3, Decimal('1500000')))
+
+    def test_cambios_de_detalle_en_orden_pagada(self):
+        orden = self.crear_orden('pagado')
+        otra = Bicicleta.objects.create(marca='Scott', modelo='Spark', tipo='mtb',
+                                        precio=Decimal('500000'), anio=2024)
+
+        nuevo = DetalleOrden.objects.create(orden=orden, bicicleta=otra, cantidad=1,
+                                            precio_unitario=Decimal('500000'))
+        self.assertEqual(self.resumen(), (1, 4, Decimal('2000000')))
+
+        nuevo.cantidad = 3
+        nuevo.save()
+        self.assertEqual(self.resumen(), (1, 6, Decimal('3000000')))
+        self.assertEqual(VentaDiariaBicicleta.objects.get(bicicleta=otra).unidades, 3)
+        self.assertEqual(VentaDiariaTipo.objects.get(tipo='mtb').unidades, 5)
+
+        orden.detalles.get(bicicleta=self.ruta).delete()
+        self.assertEqual(self.resumen(), (1, 5, Decimal('2100000')))
+        self.assertEqual(VentaDiariaTipo.objects.get(tipo='ruta').unidades, 0)
+
+        # Lo incremental coincide con recalcular desde DetalleOrden (sin las filas que quedaron en 0)
+        def por_bicicleta():
+            return sorted(VentaDiariaBicicleta.objects.exclude(unidades=0)
+                          .values_list('bicicleta_id', 'unidades', 'ingresos'))
+
+        incremental = por_bicicleta()
+        reportes.reconstruir()
+        self.assertEqual(por_bicicleta(), incremental)
+
+        # Eliminar la orden descuenta lo que quedaba, sin restar dos veces sus detalles
+        orden.delete()
+        self.assertEqual(self.resumen(), (0, 0, 0))
+
+    def test_detalles_de_orden_no_pagada_no_cuentan_hasta_pagarla(self):
+        orden = self.crear_orden('pendiente')
+        detalle = orden.detalles.get(bicicleta=self.mtb)
+        detalle.cantidad = 1
+        detalle.save()
+        self.assertEqual(self.resumen(), (0, 0, 0))
+
+        self.cambiar_estado(orden, 'pagada')
+        self.assertEqual(self.resumen(), (1, 2, Decimal('1200000')))
+
+    def test_reportes_y_estadisticas_cuentan_los_mismos_estados(self):
+        self.crear_orden('pagado')
+        self.crear_orden('pagada')
+        self.crear_orden('pendiente')
+        Orden.objects.update(total=Decimal('1500000'))
+        self.assertEqual(total_ingresos(), self.resumen()[2])
+
+    def test_reconstruir_coincide_con_lo_incremental(self):
+        for estado in ('pagado', 'pagada', 'cancelada'):
+            self.crear_orden(estado)
+        modelos = (VentaDiaria, VentaDiariaBicicleta, VentaDiariaTipo, VentaDiariaCliente)
+
+        def acumulados():
+            return [sorted(modelo.objects.values_list('fecha', 'unidades', 'ingresos')) for modelo in modelos]
+
+        incremental = acumulados()
+        # Órdenes pagadas que no pasaron por las señales (como las anteriores a la migración 0003)
+        for modelo in modelos:
+            modelo.objects.all().delete()
+        Orden.objects.update(en_reportes=False)
+
+        reportes.reconstruir()
+        self.assertEqual(acumulados(), incremental)
+        self.assertEqual(Orden.objects.filter(en_reportes=True).count(), 2)
+
+        # La migración 0003 hace la misma carga con los modelos históricos
+        for modelo in modelos:
+            modelo.objects.all().delete()
+        Orden.objects.update(en_reportes=False)
+        import_module('app_ordenes.migrations.0003_cargar_reportes_ventas').cargar_reportes(apps, None)
+        self.assertEqual(acumulados(), incremental)
+        self.assertEqual(Orden.objects.filter(en_reportes=True).count(), 2)
@@ -0,0 +1,8 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('ventas/', views.reporte_ventas, name='reporte_ventas'),
+    path('ventas/csv/<str:reporte>/', views.exportar_ventas_csv, name='exportar_ventas_csv'),
+    path('exportar/<str:nombre>/<str:formato>/', views.exportar_datos, name='exportar_datos'),
+]
@@ -1,3 +1,86 @@
+import csv
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required, user_passes_test
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.shortcuts import render
+from .forms import RangoFechasForm
+from .models import VentaDiaria, VentaDiariaBicicleta, VentaDiariaTipo, VentaDiariaCliente
+from .exportacion import EXPORTACIONES, FORMATOS, exportar
+from .reportes import resumen_rango
 
-# Create your views here.
+
+# Columnas de cada CSV: (modelo, encabezados, campos de values())
+REPORTES_CSV = {
+    'diario': (VentaDiaria, ['Fecha', 'Órdenes', 'Unidades', 'Ingresos'],
+               ['fecha', 'ordenes', 'unidades', 'ingresos']),
+    'bicicletas': (VentaDiariaBicicleta, ['Fecha', 'Bicicleta ID', 'Marca', 'Modelo', 'Unidades', 'Ingresos'],
+                   ['fecha', 'bicicleta_id', 'bicicleta__marca', 'bicicleta__modelo', 'unidades', 'ingresos']),
+    'tipos': (VentaDiariaTipo, ['Fecha', 'Tipo', 'Unidades', 'Ingresos'],
+              ['fecha', 'tipo', 'unidades', 'ingresos']),
+    'clientes': (VentaDiariaCliente, ['Fecha', 'Cliente ID', 'Nombre', 'Email', 'Órdenes', 'Unidades', 'Ingresos'],
+                 ['fecha', 'cliente_id', 'cliente__nombre', 'cliente__email', 'ordenes', 'unidades', 'ingresos']),
+}
+
+
+@login_required(login_url='login')
+@user_passes_test(lambda u: u.is_staff, login_url='lista_bicicletas')
+def reporte_ventas(request):
+    """
+    Reporte de ventas por rango de fechas (solo staff).
+    Lee los acumulados diarios, no las órdenes.
+    """
+    form = RangoFechasForm(request.GET)
+    reporte = None
+
+    if form.is_valid():
+        reporte = resumen_rango(form.cleaned_data['desde'], form.cleaned_data['hasta'])
+    else:
+        for error in form.non_field_errors():
+            messages.error(request, error)
+
+    return render(request, 'ordenes/reporte_ventas.html', {
+        'form': form,
+        'reporte': reporte,
+        'reportes_csv': REPORTES_CSV.keys(),
+        'exportaciones': EXPORTACIONES.keys(),
+    })
+
+
+@login_required(login_url='login')
+@user_passes_test(lambda u: u.is_staff, login_url='lista_bicicletas')
+def exportar_ventas_csv(request, reporte):
+    """
+    Exporta a CSV uno de los acumulados diarios para el rango de fechas.
+    """
+    if reporte not in REPORTES_CSV:
+        raise Http404('Reporte no encontrado')
+
+    form = RangoFechasForm(request.GET)
+    if not form.is_valid():
+        return HttpResponse('Rango de fechas inválido', status=400)
+
+    desde, hasta = form.cleaned_data['desde'], form.cleaned_data['hasta']
+    modelo, encabezados, campos = REPORTES_CSV[reporte]
+    filas = modelo.objects.filter(fecha__gte=desde, fecha__lte=hasta).order_by('fecha').values_list(*campos)
+
+    response = HttpResponse(content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="ventas_{reporte}_{desde}_{hasta}.csv"'
+    writer = csv.writer(response)
+    writer.writerow(encabezados)
+    writer.writerows(filas)
+    return response
+
+
+@login_required(login_url='login')
+@user_passes_test(lambda u: u.is_staff, login_url='lista_bicicletas')
+def exportar_datos(request, nombre, formato):
+    """
+    Descarga completa de órdenes, detalles, clientes o inscripciones en CSV
+    o JSON. La respuesta se va generando mientras se leen las filas.
+    """
+    if nombre not in EXPORTACIONES or formato not in FORMATOS:
+        raise Http404('Exportación no encontrada')
+
+    response = StreamingHttpResponse(exportar(nombre, formato), content_type=FORMATOS[formato])
+    response['Content-Disposition'] = f'attachment; filename="{nombre}.{formato}"'
+    return response
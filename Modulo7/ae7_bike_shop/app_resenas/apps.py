@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ResenasConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app_resenas'
+
+    def ready(self):
+        import app_resenas.signals
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from app_resenas.models import Resena, ResumenResenas
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye en bloque los resúmenes de calificación de todas las bicicletas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        # Una sola consulta agrupada por bicicleta
+        filas = (
+            Resena.objects.order_by()
+            .values('bicicleta_id')
+            .annotate(
+                total=Count('id'),
+                suma_puntuaciones=Sum('puntuacion'),
+                **{
+                    f'estrellas_{n}': Count('id', filter=Q(puntuacion=n))
+                    for n in range(1, 6)
+                }
+            )
+        )
+        resumenes = [ResumenResenas(**fila) for fila in filas]
+
+        with transaction.atomic():
+            ResumenResenas.objects.all().delete()
+            ResumenResenas.objects.bulk_create(resumenes, batch_size=options['batch_size'])
+
+        self.stdout.write(self.style.SUCCESS(f'{len(resumenes)} resúmenes recalculados'))
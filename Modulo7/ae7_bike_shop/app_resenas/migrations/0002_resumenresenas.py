@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_bicicletas', '0001_initial'),
+        ('app_resenas', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenResenas',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('suma_puntuaciones', models.PositiveIntegerField(default=0)),
+                ('estrellas_1', models.PositiveIntegerField(default=0)),
+                ('estrellas_2', models.PositiveIntegerField(default=0)),
+                ('estrellas_3', models.PositiveIntegerField(default=0)),
+                ('estrellas_4', models.PositiveIntegerField(default=0)),
+                ('estrellas_5', models.PositiveIntegerField(default=0)),
+                ('bicicleta', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='resumen_resenas', to='app_bicicletas.bicicleta')),
+            ],
+            options={
+                'verbose_name': 'Resumen de reseñas',
+                'verbose_name_plural': 'Resúmenes de reseñas',
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+from django.db import migrations
+from django.db.models import Count, Q, Sum
+
+
+def cargar_resumenes(apps, schema_editor):
+    # Las reseñas creadas antes de 0002 no pasaron por las señales: se cuentan aquí
+    # (misma consulta que el comando recalcular_resenas, con los modelos históricos)
+    Resena = apps.get_model('app_resenas', 'Resena')
+    ResumenResenas = apps.get_model('app_resenas', 'ResumenResenas')
+    filas = (
+        Resena.objects.order_by()
+        .values('bicicleta_id')
+        .annotate(
+            total=Count('id'),
+            suma_puntuaciones=Sum('puntuacion'),
+            **{f'estrellas_{n}': Count('id', filter=Q(puntuacion=n)) for n in range(1, 6)}
+        )
+    )
+    ResumenResenas.objects.all().delete()
+    ResumenResenas.objects.bulk_create([ResumenResenas(**fila) for fila in filas], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_resenas', '0002_resumenresenas'),
+    ]
+
+    operations = [
+        migrations.RunPython(cargar_resumenes, migrations.RunPython.noop),
+    ]
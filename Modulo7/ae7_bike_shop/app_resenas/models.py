@@ -49,3 +49,56 @@ class Resena(models.Model):
     def estrellas_vacias(self):
         """Devuelve el número de estrellas vacías"""
         return range(5 - self.puntuacion)
+
+
+class ResumenResenas(models.Model):
+    """
+    Resumen desnormalizado de las reseñas de una bicicleta.
+    Se mantiene de forma incremental con las señales de Resena
+    (ver app_resenas/signals.py) y se reconstruye con
+    `python manage.py recalcular_resenas`.
+    """
+    bicicleta = models.OneToOneField(
+        Bicicleta,
+        on_delete=models.CASCADE,
+        related_name='resumen_resenas'
+    )
+    total = models.PositiveIntegerField(default=0)
+    suma_puntuaciones = models.PositiveIntegerField(default=0)
+    estrellas_1 = models.PositiveIntegerField(default=0)
+    estrellas_2 = models.PositiveIntegerField(default=0)
+    estrellas_3 = models.PositiveIntegerField(default=0)
+    estrellas_4 = models.PositiveIntegerField(default=0)
+    estrellas_5 = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'Resumen de reseñas'
+        verbose_name_plural = 'Resúmenes de reseñas'
+
+    def __str__(self):
+        return f'{self.bicicleta} - {self.promedio:.1f}⭐ ({self.total})'
+
+    @property
+    def promedio(self):
+        """Puntuación promedio (0 si no hay reseñas)"""
+        if not self.total:
+            return 0
+        return self.suma_puntuaciones / self.total
+
+    @property
+    def histograma(self):
+        """Cantidad de reseñas por estrella, de 5 a 1"""
+        return [
+            (estrellas, getattr(self, f'estrellas_{estrellas}'))
+            for estrellas in range(5, 0, -1)
+        ]
+
+    @property
+    def estrellas_llenas(self):
+        """Estrellas llenas según el promedio redondeado"""
+        return range(round(self.promedio))
+
+    @property
+    def estrellas_vacias(self):
+        """Estrellas vacías según el promedio redondeado"""
+        return range(5 - round(self.promedio))
@@ -0,0 +1,72 @@
+from django.db.models import Count, F, Q, Sum
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from app_bicicletas.catalogo import invalidar_catalogo
+from .models import Resena, ResumenResenas
+
+
+def _recalcular_resumen(bicicleta_id):
+    """Vuelve a contar las reseñas de una bicicleta (solo si ya tiene resumen)."""
+    conteo = Resena.objects.filter(bicicleta_id=bicicleta_id).aggregate(
+        total=Count('id'),
+        suma_puntuaciones=Sum('puntuacion', default=0),
+        **{f'estrellas_{n}': Count('id', filter=Q(puntuacion=n)) for n in range(1, 6)}
+    )
+    ResumenResenas.objects.filter(bicicleta_id=bicicleta_id).update(**conteo)
+
+
+def _actualizar_resumen(bicicleta_id, puntuacion, signo):
+    """
+    Suma (signo=1) o resta (signo=-1) una reseña al resumen de la bicicleta
+    con un UPDATE atómico. Al restar, el UPDATE solo se aplica si los
+    contadores alcanzan (no pueden quedar negativos); si no alcanzan, el
+    resumen no incluía esa reseña y se recalcula desde la tabla de reseñas.
+    Devuelve False en ese caso.
+    """
+    resumenes = ResumenResenas.objects.filter(bicicleta_id=bicicleta_id)
+    if signo > 0:
+        ResumenResenas.objects.get_or_create(bicicleta_id=bicicleta_id)
+    else:
+        resumenes = resumenes.filter(**{
+            'total__gte': 1,
+            'suma_puntuaciones__gte': puntuacion,
+            f'estrellas_{puntuacion}__gte': 1,
+        })
+    actualizado = resumenes.update(**{
+        'total': F('total') + signo,
+        'suma_puntuaciones': F('suma_puntuaciones') + signo * puntuacion,
+        f'estrellas_{puntuacion}': F(f'estrellas_{puntuacion}') + signo,
+    })
+    if not actualizado and signo < 0:
+        _recalcular_resumen(bicicleta_id)
+    # Las estrellas se muestran en el catálogo cacheado
+    invalidar_catalogo()
+    return bool(actualizado) or signo > 0
+
+
+@receiver(pre_save, sender=Resena)
+def guardar_puntuacion_anterior(sender, instance, **kwargs):
+    """Recordar la puntuación y bicicleta previas para poder descontarlas al editar"""
+    instance._anterior = None
+    if instance.pk:
+        instance._anterior = Resena.objects.filter(pk=instance.pk).values_list(
+            'bicicleta_id', 'puntuacion'
+        ).first()
+
+
+@receiver(post_save, sender=Resena)
+def sumar_resena(sender, instance, created, **kwargs):
+    anterior = getattr(instance, '_anterior', None)
+    actual = (instance.bicicleta_id, int(instance.puntuacion))
+
+    if not created and anterior == actual:
+        return
+    if anterior and not _actualizar_resumen(anterior[0], anterior[1], -1) and anterior[0] == actual[0]:
+        # El recálculo ya cuenta la reseña con su puntuación nueva
+        return
+    _actualizar_resumen(actual[0], actual[1], 1)
+
+
+@receiver(post_delete, sender=Resena)
+def restar_resena(sender, instance, **kwargs):
+    _actualizar_resumen(instance.bicicleta_id, int(instance.puntuacion), -1)
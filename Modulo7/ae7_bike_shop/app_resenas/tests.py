@@ -1,3 +1,77 @@
-from django.test import TestCase
+from decimal import Decimal
+from importlib import import_module
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from app_bicicletas.models import Bicicleta
+from .models import Resena, ResumenResenas
 
-# Create your tests here.
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class ResumenResenasTest(TestCase):
+    """El resumen por bicicleta sigue a las reseñas al crearlas, editarlas y eliminarlas."""
+
+    def setUp(self):
+        self.trek, self.giant = Bicicleta.objects.bulk_create([
+            Bicicleta(marca='Trek', modelo='Marlin', tipo='mtb', precio=Decimal('450000'), anio=2024),
+            Bicicleta(marca='Giant', modelo='Escape', tipo='ruta', precio=Decimal('380000'), anio=2023),
+        ])
+        self.usuarios = [User.objects.create_user(f'u{i}') for i in range(3)]
+
+    def resumen(self, bicicleta):
+        resumen = ResumenResenas.objects.get(bicicleta=bicicleta)
+        return resumen.total, resumen.suma_puntuaciones, [n for _, n in resumen.histograma]
+
+    def resenar(self, bicicleta, usuario, puntuacion):
+        return Resena.objects.create(bicicleta=bicicleta, usuario=usuario, puntuacion=puntuacion, comentario='')
+
+    def test_crear_editar_y_eliminar(self):
+        primera = self.resenar(self.trek, self.usuarios[0], 5)
+        self.resenar(self.trek, self.usuarios[1], 3)
+        self.assertEqual(self.resumen(self.trek), (2, 8, [1, 0, 1, 0, 0]))
+
+        primera.puntuacion = 4
+        primera.save()
+        self.assertEqual(self.resumen(self.trek), (2, 7, [0, 1, 1, 0, 0]))
+
+        # Cambiar de bicicleta mueve la reseña de un resumen al otro
+        primera.bicicleta = self.giant
+        primera.save()
+        self.assertEqual(self.resumen(self.trek), (1, 3, [0, 0, 1, 0, 0]))
+        self.assertEqual(self.resumen(self.giant), (1, 4, [0, 1, 0, 0, 0]))
+
+        primera.delete()
+        self.assertEqual(self.resumen(self.giant), (0, 0, [0, 0, 0, 0, 0]))
+
+    def test_eliminar_sin_contar_en_el_resumen_no_queda_negativo(self):
+        # Reseñas que el resumen no incluye (por ejemplo, anteriores a la migración 0002)
+        viejas = Resena.objects.bulk_create([
+            Resena(bicicleta=self.trek, usuario=self.usuarios[0], puntuacion=2, comentario=''),
+            Resena(bicicleta=self.trek, usuario=self.usuarios[1], puntuacion=5, comentario=''),
+        ])
+        self.resenar(self.trek, self.usuarios[2], 4)
+        self.assertEqual(self.resumen(self.trek), (1, 4, [0, 1, 0, 0, 0]))
+
+        Resena.objects.get(pk=viejas[0].pk).delete()
+        self.assertEqual(self.resumen(self.trek), (2, 9, [1, 1, 0, 0, 0]))
+
+        # Editar una reseña no contada también recalcula en vez de restar
+        vieja = Resena.objects.get(pk=viejas[1].pk)
+        ResumenResenas.objects.filter(bicicleta=self.trek).update(
+            total=0, suma_puntuaciones=0, estrellas_4=0, estrellas_5=0
+        )
+        vieja.puntuacion = 1
+        vieja.save()
+        self.assertEqual(self.resumen(self.trek), (2, 5, [0, 1, 0, 0, 1]))
+
+    def test_migracion_carga_las_resenas_existentes(self):
+        Resena.objects.bulk_create([
+            Resena(bicicleta=self.trek, usuario=self.usuarios[0], puntuacion=5, comentario=''),
+            Resena(bicicleta=self.trek, usuario=self.usuarios[1], puntuacion=4, comentario=''),
+            Resena(bicicleta=self.giant, usuario=self.usuarios[0], puntuacion=1, comentario=''),
+        ])
+        migracion = import_module('app_resenas.migrations.0003_cargar_resumenes')
+        migracion.cargar_resumenes(apps, None)
+
+        self.assertEqual(self.resumen(self.trek), (2, 9, [1, 1, 0, 0, 0]))
+        self.assertEqual(self.resumen(self.giant), (1, 1, [0, 0, 0, 0, 1]))
@@ -1,7 +1,6 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Avg, Count
 from app_bicicletas.models import Bicicleta
 from .models import Resena
 from .forms import ResenaForm
@@ -11,14 +10,11 @@ def detalle_bicicleta_con_resenas(request, pk):
     """
     Vista para ver el detalle de una bicicleta con sus reseñas
     """
-    bicicleta = get_object_or_404(Bicicleta, pk=pk)
+    bicicleta = get_object_or_404(Bicicleta.objects.select_related('resumen_resenas'), pk=pk)
     resenas = bicicleta.resenas.all()
     
-    # Calcular estadísticas
-    stats = bicicleta.resenas.aggregate(
-        promedio=Avg('puntuacion'),
-        total=Count('id')
-    )
+    # Estadísticas precalculadas (ver app_resenas/signals.py)
+    calificacion = bicicleta.calificacion
     
     # Verificar si el usuario ya dejó reseña
     usuario_ya_reseno = False
@@ -33,8 +29,9 @@ def detalle_bicicleta_con_resenas(request, pk):
     context = {
         'bicicleta': bicicleta,
         'resenas': resenas,
-        'promedio': stats['promedio'],
-        'total_resenas': stats['total'],
+        'calificacion': calificacion,
+        'promedio': calificacion.promedio if calificacion else None,
+        'total_resenas': calificacion.total if calificacion else 0,
         'usuario_ya_reseno': usuario_ya_reseno,
         'resena_usuario': resena_usuario
     }
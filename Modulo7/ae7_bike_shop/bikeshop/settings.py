@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -48,9 +49,11 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'app_carrito.middleware.CarritoMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'app_clientes.middleware.ClienteMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -90,6 +93,20 @@ DATABASES = {
 }
 
 
+# Caché compartida por todos los procesos del servidor (gunicorn/uwsgi con varios
+# workers): el cliente y los grupos de cada usuario (app_clientes/identidad.py) y
+# el catálogo (app_bicicletas/catalogo.py) se invalidan con señales, y con la caché
+# local en memoria solo se enteraría el worker que atendió el cambio. FileBasedCache
+# no necesita dependencias pero solo se comparte dentro de una máquina; con varios
+# servidores usar Redis o Memcached (django.core.cache.backends.redis.RedisCache).
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': Path(tempfile.gettempdir()) / 'bikeshop_cache',
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -26,6 +26,7 @@ urlpatterns = [
     path('', include('app_resenas.urls')),
     path('', include('app_carrito.urls')),
     path('', include('app_eventos.urls')),
+    path('reportes/', include('app_ordenes.urls')),
 ]
 
 # Servir archivos media en desarrollo
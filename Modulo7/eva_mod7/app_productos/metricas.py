@@ -0,0 +1,71 @@
+"""
+Métricas del panel de inicio: totales generales y productos por categoría y
+por etiqueta. Se calculan con pocas consultas y quedan en caché hasta que
+cambia un producto, una categoría o una etiqueta (ver signals.py).
+"""
+from django.core.cache import cache
+from django.db.models import Count, F, Func, IntegerField, Max, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Categoria, Etiqueta, Producto
+
+CLAVE_RESUMEN = 'productos:metricas:resumen'
+CLAVE_POR_CATEGORIA = 'productos:metricas:por_categoria'
+CLAVE_POR_ETIQUETA = 'productos:metricas:por_etiqueta'
+# Las señales invalidan al cambiar los datos; el tiempo es solo un tope por si
+# la base se modifica fuera de Django. La invalidación llega a todos los
+# workers porque la caché es compartida (CACHES en tienda/settings.py)
+DURACION = 10 * 60
+
+
+def _contar(modelo):
+    """COUNT(*) de `modelo` como subconsulta escalar (0 si la tabla está vacía)."""
+    return Subquery(
+        modelo.objects.order_by().values(total=Func(F('pk'), function='COUNT')),
+        output_field=IntegerField(),
+    )
+
+
+def _calcular_resumen():
+    """Los cuatro totales en una sola consulta."""
+    categorias, etiquetas = _contar(Categoria), _contar(Etiqueta)
+    # aggregate() solo acepta agregados: las subconsultas van dentro de Max().
+    # Sin productos Max() da NULL, y Coalesce usa la subconsulta sola.
+    return Producto.objects.aggregate(
+        total_productos=Count('pk'),
+        productos_disponibles=Count('pk', filter=Q(disponible=True)),
+        total_categorias=Coalesce(Max(categorias), categorias),
+        total_etiquetas=Coalesce(Max(etiquetas), etiquetas),
+    )
+
+
+def resumen():
+    """Totales de productos, disponibles, categorías y etiquetas."""
+    return cache.get_or_set(CLAVE_RESUMEN, _calcular_resumen, DURACION)
+
+
+def _conteo_por(modelo):
+    return [
+        {'id': id, 'nombre': nombre, 'total': total}
+        for id, nombre, total in modelo.objects.annotate(total=Count('productos'))
+        .order_by('nombre').values_list('id', 'nombre', 'total')
+    ]
+
+
+def productos_por_categoria():
+    """[{'id', 'nombre', 'total'}] de cada categoría, ordenadas por nombre."""
+    return cache.get_or_set(CLAVE_POR_CATEGORIA, lambda: _conteo_por(Categoria), DURACION)
+
+
+def productos_por_etiqueta():
+    """[{'id', 'nombre', 'total'}] de cada etiqueta, ordenadas por nombre."""
+    return cache.get_or_set(CLAVE_POR_ETIQUETA, lambda: _conteo_por(Etiqueta), DURACION)
+
+
+def totales_por_id(conteo):
+    """{id: total} a partir de productos_por_categoria() o productos_por_etiqueta()."""
+    return {fila['id']: fila['total'] for fila in conteo}
+
+
+def invalidar():
+    cache.delete_many([CLAVE_RESUMEN, CLAVE_POR_CATEGORIA, CLAVE_POR_ETIQUETA])
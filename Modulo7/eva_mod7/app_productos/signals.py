@@ -0,0 +1,19 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from . import metricas
+from .models import Categoria, Etiqueta, Producto
+
+
+@receiver([post_save, post_delete], sender=Producto)
+@receiver([post_save, post_delete], sender=Categoria)
+@receiver([post_save, post_delete], sender=Etiqueta)
+def invalidar_metricas(sender, **kwargs):
+    """Cualquier cambio en productos, categorías o etiquetas cambia los totales."""
+    metricas.invalidar()
+
+
+@receiver(m2m_changed, sender=Producto.etiquetas.through)
+def invalidar_metricas_etiquetas(sender, action, **kwargs):
+    # Asignar o quitar etiquetas cambia el conteo por etiqueta
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        metricas.invalidar()
@@ -1,3 +1,71 @@
-from django.test import TestCase
+from decimal import Decimal
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from . import metricas
+from .models import Categoria, Etiqueta, Producto
+
+
+# Caché propia de las pruebas: no tocar la caché en archivo del servidor
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class MetricasInicioTest(TestCase):
+    """Los totales del inicio salen de la caché y se actualizan al cambiar los datos."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.ropa = Categoria.objects.create(nombre='Ropa')
+        cls.hogar = Categoria.objects.create(nombre='Hogar')
+        cls.oferta = Etiqueta.objects.create(nombre='Oferta')
+        cls.nuevo = Etiqueta.objects.create(nombre='Nuevo')
+        for i in range(5):
+            producto = Producto.objects.create(nombre=f'Polera {i}', precio=Decimal('9990'),
+                                               categoria=cls.ropa, disponible=i % 2 == 0)
+            producto.etiquetas.add(cls.oferta)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_resumen_en_una_consulta(self):
+        with self.assertNumQueries(1):
+            resumen = metricas.resumen()
+        self.assertEqual(resumen, {'total_productos': 5, 'productos_disponibles': 3,
+                                   'total_categorias': 2, 'total_etiquetas': 2})
+
+    def test_resumen_sin_productos(self):
+        Producto.objects.all().delete()
+        self.assertEqual(metricas.resumen(), {'total_productos': 0, 'productos_disponibles': 0,
+                                              'total_categorias': 2, 'total_etiquetas': 2})
+
+    def test_inicio_sin_consultas_con_la_cache_llena(self):
+        with self.assertNumQueries(3):
+            self.client.get(reverse('index'))
+        with self.assertNumQueries(0):
+            respuesta = self.client.get(reverse('index'))
+        self.assertEqual(respuesta.context['total_productos'], 5)
+        self.assertEqual(respuesta.context['productos_por_categoria'], [
+            {'id': self.hogar.id, 'nombre': 'Hogar', 'total': 0},
+            {'id': self.ropa.id, 'nombre': 'Ropa', 'total': 5},
+        ])
+
+    def test_invalidacion_por_senales(self):
+        metricas.resumen()
+        producto = Producto.objects.create(nombre='Lámpara', precio=Decimal('15000'), categoria=self.hogar)
+        self.assertEqual(metricas.resumen()['total_productos'], 6)
+
+        producto.etiquetas.add(self.nuevo)
+        por_etiqueta = metricas.totales_por_id(metricas.productos_por_etiqueta())
+        self.assertEqual(por_etiqueta, {self.nuevo.id: 1, self.oferta.id: 5})
+
+        self.ropa.delete()
+        self.assertEqual(metricas.resumen(), {'total_productos': 1, 'productos_disponibles': 1,
+                                              'total_categorias': 1, 'total_etiquetas': 2})
+        self.assertEqual(metricas.totales_por_id(metricas.productos_por_etiqueta()),
+                         {self.nuevo.id: 1, self.oferta.id: 0})
+
+    def test_listas_sin_count_por_fila(self):
+        with self.assertNumQueries(2):
+            respuesta = self.client.get(reverse('lista_categorias'))
+        totales = {c.nombre: c.total_productos for c in respuesta.context['categorias']}
+        self.assertEqual(totales, {'Ropa': 5, 'Hogar': 0})
@@ -2,22 +2,16 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from .models import Producto, Categoria, Etiqueta, DetalleProducto
 from .forms import ProductoForm
+from . import metricas
 
 # ============== VISTAS DE PRODUCTOS ==============
 
 def index(request):
     """Página de bienvenida"""
-    total_productos = Producto.objects.count()
-    total_categorias = Categoria.objects.count()
-    total_etiquetas = Etiqueta.objects.count()
-    productos_disponibles = Producto.objects.filter(disponible=True).count()
-    
-    context = {
-        'total_productos': total_productos,
-        'total_categorias': total_categorias,
-        'total_etiquetas': total_etiquetas,
-        'productos_disponibles': productos_disponibles,
-    }
+    # Totales en caché (ver metricas.py): sin consultas mientras no cambien los datos
+    context = dict(metricas.resumen())
+    context['productos_por_categoria'] = metricas.productos_por_categoria()
+    context['productos_por_etiqueta'] = metricas.productos_por_etiqueta()
     return render(request, 'index.html', context)
 
 def lista_productos(request):
@@ -105,7 +99,11 @@ def eliminar_producto(request, id):
 
 def lista_categorias(request):
     """Lista todas las categorías"""
-    categorias = Categoria.objects.all()
+    categorias = list(Categoria.objects.all())
+    # Productos por categoría desde la caché, en vez de un COUNT por fila
+    totales = metricas.totales_por_id(metricas.productos_por_categoria())
+    for categoria in categorias:
+        categoria.total_productos = totales.get(categoria.id, 0)
     return render(request, 'categorias/lista_categorias.html', {'categorias': categorias})
 
 def crear_categoria(request):
@@ -158,7 +156,10 @@ def eliminar_categoria(request, id):
 
 def lista_etiquetas(request):
     """Lista todas las etiquetas"""
-    etiquetas = Etiqueta.objects.all()
+    etiquetas = list(Etiqueta.objects.all())
+    totales = metricas.totales_por_id(metricas.productos_por_etiqueta())
+    for etiqueta in etiquetas:
+        etiqueta.total_productos = totales.get(etiqueta.id, 0)
     return render(request, 'etiquetas/lista_etiquetas.html', {'etiquetas': etiquetas})
 
 def crear_etiqueta(request):
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -81,6 +82,20 @@ DATABASES = {
 }
 
 
+# Caché compartida por todos los procesos del servidor (gunicorn/uwsgi con varios
+# workers): las métricas del inicio (app_productos/metricas.py) se invalidan con
+# señales, y con la caché local en memoria cada worker tendría su propia copia y
+# seguiría mostrando totales viejos. FileBasedCache no necesita dependencias pero
+# solo se comparte dentro de una máquina; con varios servidores usar Redis o
+# Memcached (django.core.cache.backends.redis.RedisCache).
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': Path(tempfile.gettempdir()) / 'tienda_cache',
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -1,5 +1,6 @@
 from django.contrib import admin
 from .models import Producto, Pedido, PedidoProducto, Direccion
+from .servicios import cancelar_pedidos
 
 @admin.register(Producto)
 class ProductoAdmin(admin.ModelAdmin):
@@ -8,6 +9,12 @@ class ProductoAdmin(admin.ModelAdmin):
 @admin.register(Pedido)
 class PedidoAdmin(admin.ModelAdmin):
     list_display = ('usuario', 'fecha_pedido', 'total')
+    actions = ['cancelar_seleccionados']
+
+    @admin.action(description='Cancelar pedidos seleccionados (devuelve stock)')
+    def cancelar_seleccionados(self, request, queryset):
+        cancelados = cancelar_pedidos(queryset)
+        self.message_user(request, f"{cancelados} pedido(s) cancelados y su stock devuelto.")
 
 @admin.register(PedidoProducto)
 class PedidoProductoAdmin(admin.ModelAdmin):
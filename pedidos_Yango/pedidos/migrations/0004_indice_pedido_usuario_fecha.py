@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:11
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pedidos', '0003_remove_direccion_cliente_direccion_usuario_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='pedido',
+            index=models.Index(fields=['usuario', 'fecha_pedido'], name='pedido_usuario_fecha_idx'),
+        ),
+    ]
@@ -33,10 +33,19 @@ class Pedido(models.Model):
     def __str__(self):
         return f"Pedido {self.id} de {self.usuario.username}"
 
+    class Meta:
+        indexes = [
+            # Historial de pedidos de un usuario, ordenado por fecha
+            models.Index(fields=['usuario', 'fecha_pedido'], name='pedido_usuario_fecha_idx'),
+        ]
+
 class PedidoProducto(models.Model):
     pedido = models.ForeignKey(Pedido, on_delete=models.CASCADE)
     producto = models.ForeignKey(Producto, on_delete=models.CASCADE)
     cantidad = models.IntegerField()
 
+    def subtotal(self):
+        return self.producto.precio * self.cantidad
+
     def __str__(self):
         return f"{self.cantidad} x {self.producto.nombre} en Pedido {self.pedido.id}"
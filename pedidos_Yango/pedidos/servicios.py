@@ -0,0 +1,117 @@
+"""
+Creación de pedidos con descuento de stock seguro ante pedidos simultáneos.
+
+El stock nunca se lee y se vuelve a guardar desde Python: cada producto se
+descuenta con un UPDATE condicional (... WHERE stock >= cantidad) usando
+F(), dentro de la misma transacción que crea el pedido y sus líneas.
+"""
+from collections import OrderedDict
+from django.db import transaction
+from django.db.models import F, Sum
+from .models import Producto, Pedido, PedidoProducto
+
+
+def normalizar_items(productos_ids, cantidades):
+    """
+    Convierte los productos marcados en el formulario en {producto_id: cantidad}.
+
+    `cantidades` asocia cada id de producto, tal como llegó, con la cantidad
+    escrita en su campo, así cada cantidad queda con su producto aunque haya
+    campos vacíos de productos no marcados. Devuelve (items, invalidos):
+    invalidos son los productos marcados sin cantidad o con una cantidad que
+    no es un entero positivo.
+    """
+    items = OrderedDict()
+    invalidos = []
+    for valor in productos_ids:
+        try:
+            prod_id = int(valor)
+        except (TypeError, ValueError):
+            continue
+        try:
+            cantidad = int(cantidades.get(valor))
+        except (TypeError, ValueError):
+            cantidad = 0
+        if cantidad <= 0:
+            invalidos.append(prod_id)
+        elif prod_id not in items:
+            items[prod_id] = cantidad
+    return items, invalidos
+
+
+def crear_pedido(usuario, direccion, items):
+    """
+    Crea un pedido con los productos de `items` ({producto_id: cantidad}).
+
+    Los productos inexistentes o sin stock suficiente se omiten, igual que
+    antes. Devuelve (pedido, omitidos); pedido es None si ninguna línea
+    pudo reservarse, y en ese caso no se guarda nada.
+    """
+    productos = Producto.objects.only('id', 'nombre', 'precio').in_bulk(list(items))
+    omitidos = [prod_id for prod_id in items if prod_id not in productos]
+
+    with transaction.atomic():
+        lineas = []
+        total = 0
+        # Se descuenta en orden de id para que dos pedidos con los mismos
+        # productos tomen los bloqueos de fila en el mismo orden
+        for prod_id, cantidad in sorted(items.items()):
+            producto = productos.get(prod_id)
+            if producto is None:
+                continue
+            descontado = Producto.objects.filter(
+                pk=prod_id, stock__gte=cantidad
+            ).update(stock=F('stock') - cantidad)
+            if not descontado:
+                omitidos.append(prod_id)
+                continue
+            lineas.append(PedidoProducto(producto=producto, cantidad=cantidad))
+            total += producto.precio * cantidad
+
+        if not lineas:
+            return None, omitidos
+
+        pedido = Pedido.objects.create(usuario=usuario, direccion=direccion, total=total)
+        for linea in lineas:
+            linea.pedido = pedido
+        PedidoProducto.objects.bulk_create(lineas)
+
+    return pedido, omitidos
+
+
+def cancelar_pedidos(pedidos):
+    """
+    Elimina los pedidos del queryset `pedidos` y devuelve su stock.
+
+    Las cantidades se suman por producto en una sola consulta agrupada y el
+    stock se repone con UPDATE ... SET stock = stock + n, un UPDATE por cada
+    cantidad distinta (no uno por línea). Todo ocurre en una transacción; si
+    otro proceso ya canceló un pedido, no se repone dos veces.
+    Devuelve la cantidad de pedidos cancelados.
+    """
+    with transaction.atomic():
+        ids = list(pedidos.select_for_update().order_by('pk').values_list('pk', flat=True))
+        if not ids:
+            return 0
+
+        por_cantidad = {}
+        devoluciones = (
+            PedidoProducto.objects.filter(pedido_id__in=ids)
+            .values_list('producto_id')
+            .annotate(total=Sum('cantidad'))
+            .order_by('producto_id')
+        )
+        for producto_id, total in devoluciones:
+            por_cantidad.setdefault(total, []).append(producto_id)
+
+        for total, productos_ids in por_cantidad.items():
+            Producto.objects.filter(pk__in=productos_ids).update(stock=F('stock') + total)
+
+        Pedido.objects.filter(pk__in=ids).delete()
+
+    return len(ids)
+
+
+def cancelar_pedido(pedido):
+    """Cancela un solo pedido devolviendo su stock (ver cancelar_pedidos)."""
+    return cancelar_pedidos(Pedido.objects.filter(pk=pedido.pk)) == 1
@@ -1,3 +1,216 @@
-from django.test import TestCase
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from django.contrib.auth.models import User
+from django.db import connection, OperationalError
+from django.db.models import Sum
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from .models import Producto, Pedido, PedidoProducto, Direccion
+from .servicios import cancelar_pedido, cancelar_pedidos, crear_pedido
 
-# Create your tests here.
+
+class PedidoConcurrenteTest(TransactionTestCase):
+    """
+    Prueba de carga: muchos pedidos en paralelo sobre los mismos productos
+    nunca deben dejar stock negativo ni vender más de lo que había.
+
+    Corre contra la base configurada en DATABASES (MySQL en settings.py).
+    Con SQLite también corre sobre la base de pruebas en memoria: Django la
+    abre en modo caché compartida, así todos los hilos ven la misma base, y
+    los bloqueos de tabla se reintentan igual que los deadlocks.
+    """
+    PRODUCTOS = 10
+    STOCK = 40
+    PEDIDOS = 300
+    HILOS = 32
+
+    def setUp(self):
+        self.usuario = User.objects.create_user('carga', password='clave')
+        self.direccion = Direccion.objects.create(
+            usuario=self.usuario, calle='Av. Siempre Viva', numero='742',
+            ciudad='Santiago', codigo_postal='8320000'
+        )
+        self.productos = Producto.objects.bulk_create([
+            Producto(nombre=f'Producto {i}', descripcion='Carga', precio=Decimal('1990'), stock=self.STOCK)
+            for i in range(self.PRODUCTOS)
+        ])
+
+    def _pedir(self, semilla):
+        azar = random.Random(semilla)
+        items = {
+            producto.pk: azar.randint(1, 3)
+            for producto in azar.sample(self.productos, 3)
+        }
+        try:
+            # SQLite bloquea la base completa al escribir (y MySQL puede abortar por
+            # deadlock): se reintenta con espera exponencial y algo de azar
+            espera = 0.005
+            for _ in range(20):
+                try:
+                    return crear_pedido(self.usuario, self.direccion, items)
+                except OperationalError:
+                    time.sleep(espera + azar.uniform(0, espera))
+                    espera = min(espera * 2, 0.5)
+            raise AssertionError('No se pudo crear el pedido')
+        finally:
+            connection.close()
+
+    def test_stock_nunca_negativo(self):
+        with ThreadPoolExecutor(max_workers=self.HILOS) as pool:
+            resultados = list(pool.map(self._pedir, range(self.PEDIDOS)))
+
+        vendidos = dict(
+            PedidoProducto.objects.values_list('producto').annotate(total=Sum('cantidad'))
+        )
+        for producto in Producto.objects.all():
+            self.assertGreaterEqual(producto.stock, 0)
+            self.assertEqual(producto.stock + vendidos.get(producto.pk, 0), self.STOCK)
+
+        creados = [pedido for pedido, _ in resultados if pedido]
+        self.assertEqual(Pedido.objects.count(), len(creados))
+        self.assertTrue(any(omitidos for _, omitidos in resultados))
+
+
+class CrearPedidoTest(TestCase):
+
+    def setUp(self):
+        self.usuario = User.objects.create_user('cliente', password='clave')
+        self.direccion = Direccion.objects.create(
+            usuario=self.usuario, calle='Los Olmos', numero='10',
+            ciudad='Valparaíso', codigo_postal='2340000'
+        )
+        self.productos = Producto.objects.bulk_create([
+            Producto(nombre=f'P{i}', descripcion='', precio=Decimal('1000'), stock=5)
+            for i in range(30)
+        ])
+
+    def test_consultas_no_crecen_por_linea(self):
+        items = {producto.pk: 2 for producto in self.productos}
+        with CaptureQueriesContext(connection) as consultas:
+            pedido, omitidos = crear_pedido(self.usuario, self.direccion, items)
+
+        self.assertEqual(omitidos, [])
+        self.assertEqual(pedido.total, Decimal('60000'))
+        self.assertEqual(pedido.pedidoproducto_set.count(), 30)
+        # in_bulk + un UPDATE por producto + pedido + bulk_create (antes ~90)
+        self.assertLessEqual(len(consultas), 30 + 5)
+
+    def test_vista_omite_productos_sin_stock(self):
+        self.client.force_login(self.usuario)
+        respuesta = self.client.post(reverse('pedido_create'), {
+            'direccion': self.direccion.pk,
+            'productos': [self.productos[0].pk, self.productos[2].pk],
+            # El producto 1 no está marcado: su campo llega vacío y no corre las cantidades
+            f'cantidad_{self.productos[0].pk}': '2',
+            f'cantidad_{self.productos[1].pk}': '',
+            f'cantidad_{self.productos[2].pk}': '9',
+        })
+
+        self.assertRedirects(respuesta, reverse('pedido_list'))
+        pedido = Pedido.objects.get()
+        self.assertEqual(pedido.total, Decimal('2000'))
+        self.assertEqual(Producto.objects.get(pk=self.productos[0].pk).stock, 3)
+        self.assertEqual(Producto.objects.get(pk=self.productos[1].pk).stock, 5)
+        self.assertEqual(Producto.objects.get(pk=self.productos[2].pk).stock, 5)
+
+    def test_vista_rechaza_productos_marcados_sin_cantidad_valida(self):
+        self.client.force_login(self.usuario)
+        for cantidad in ['', '0', 'dos']:
+            respuesta = self.client.post(reverse('pedido_create'), {
+                'direccion': self.direccion.pk,
+                'productos': [self.productos[0].pk, self.productos[1].pk],
+                f'cantidad_{self.productos[0].pk}': '2',
+                f'cantidad_{self.productos[1].pk}': cantidad,
+            })
+
+            self.assertEqual(respuesta.status_code, 200)
+            self.assertContains(respuesta, 'Indique una cantidad válida')
+        self.assertFalse(Pedido.objects.exists())
+        self.assertEqual(Producto.objects.get(pk=self.productos[0].pk).stock, 5)
+
+
+class CancelarPedidosTest(TestCase):
+
+    def setUp(self):
+        self.usuario = User.objects.create_user('limpieza', password='clave')
+        self.productos = Producto.objects.bulk_create([
+            Producto(nombre=f'P{i}', descripcion='', precio=Decimal('500'), stock=0)
+            for i in range(50)
+        ])
+        self.pedidos = Pedido.objects.bulk_create([
+            Pedido(usuario=self.usuario, total=Decimal('1500')) for _ in range(2000)
+        ])
+        PedidoProducto.objects.bulk_create([
+            PedidoProducto(pedido=pedido, producto=self.productos[(i + j) % 50], cantidad=j + 1)
+            for i, pedido in enumerate(self.pedidos)
+            for j in range(3)
+        ])
+
+    def test_cancelacion_masiva_devuelve_stock_agrupado(self):
+        with CaptureQueriesContext(connection) as consultas:
+            cancelados = cancelar_pedidos(Pedido.objects.all())
+
+        self.assertEqual(cancelados, 2000)
+        self.assertFalse(Pedido.objects.exists())
+        self.assertFalse(PedidoProducto.objects.exists())
+        self.assertEqual(Producto.objects.aggregate(total=Sum('stock'))['total'], 2000 * (1 + 2 + 3))
+        # Sin consultas por línea: solo el DELETE de Django va en lotes de 100 pedidos
+        self.assertLess(len(consultas), 2000 // 50)
+
+    def test_cancelar_dos_veces_no_duplica_stock(self):
+        pedido = self.pedidos[0]
+        self.assertTrue(cancelar_pedido(pedido))
+        self.assertFalse(cancelar_pedido(pedido))
+        self.assertEqual(Producto.objects.aggregate(total=Sum('stock'))['total'], 1 + 2 + 3)
+
+
+class PresupuestoConsultasTest(TestCase):
+    """
+    Regresión de consultas: las páginas de pedidos y productos deben hacer
+    una cantidad fija de consultas, sin importar cuántas filas o líneas haya.
+    """
+    # sesión + usuario + count + página + líneas con producto
+    PRESUPUESTO_LISTA = 5
+    PRESUPUESTO_DETALLE = 4
+    PRESUPUESTO_PRODUCTOS = 2
+
+    def setUp(self):
+        self.usuario = User.objects.create_user('historial', password='clave')
+        self.direccion = Direccion.objects.create(
+            usuario=self.usuario, calle='Condell', numero='1',
+            ciudad='Concepción', codigo_postal='4030000'
+        )
+        self.productos = Producto.objects.bulk_create([
+            Producto(nombre=f'Producto {i}', descripcion='', precio=Decimal('990'), stock=100)
+            for i in range(60)
+        ])
+        pedidos = Pedido.objects.bulk_create([
+            Pedido(usuario=self.usuario, direccion=self.direccion, total=Decimal('4950'))
+            for _ in range(120)
+        ])
+        PedidoProducto.objects.bulk_create([
+            PedidoProducto(pedido=pedido, producto=self.productos[(i + j) % 60], cantidad=1)
+            for i, pedido in enumerate(pedidos)
+            for j in range(5)
+        ])
+        self.pedido = pedidos[0]
+        self.client.force_login(self.usuario)
+
+    def test_lista_de_pedidos(self):
+        with self.assertNumQueries(self.PRESUPUESTO_LISTA):
+            respuesta = self.client.get(reverse('pedido_list'), {'page': 2})
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(len(respuesta.context['pedidos']), 20)
+
+    def test_detalle_de_pedido(self):
+        with self.assertNumQueries(self.PRESUPUESTO_DETALLE):
+            respuesta = self.client.get(reverse('pedido_detail', args=[self.pedido.pk]))
+        self.assertContains(respuesta, 'Subtotal: $990')
+
+    def test_lista_de_productos(self):
+        with self.assertNumQueries(self.PRESUPUESTO_PRODUCTOS):
+            respuesta = self.client.get(reverse('producto_list'))
+        self.assertEqual(len(respuesta.context['productos']), 24)
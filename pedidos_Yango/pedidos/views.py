@@ -1,17 +1,34 @@
 from django.shortcuts import render, get_object_or_404, redirect
+from django.core.paginator import Paginator
+from django.db.models import Prefetch
+from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 from django.urls import reverse_lazy
 from django.contrib.auth import login, authenticate
 from django.contrib.auth.forms import UserCreationForm
 from .models import Producto, Pedido, PedidoProducto, Direccion
+from .servicios import cancelar_pedido, crear_pedido, normalizar_items
 
 # Create your views here.
 
+PEDIDOS_POR_PAGINA = 20
+PRODUCTOS_POR_PAGINA = 24
+
+
+def pedidos_con_detalle():
+    """Pedidos con su dirección y líneas (con producto) ya cargadas."""
+    return Pedido.objects.select_related('direccion').prefetch_related(
+        Prefetch('pedidoproducto_set', queryset=PedidoProducto.objects.select_related('producto'))
+    )
+
+
 class ProductoListView(ListView):
     model = Producto
     template_name = 'pedidos/producto_list.html'
     context_object_name = 'productos'
+    paginate_by = PRODUCTOS_POR_PAGINA
+    ordering = ['nombre', 'id']
 
 class ProductoDetailView(DetailView):
     model = Producto
@@ -71,36 +88,35 @@ class DireccionDeleteView(DeleteView):
 
 @login_required
 def pedido_list(request):
-    pedidos = Pedido.objects.filter(usuario=request.user)
-    return render(request, 'pedidos/pedido_list.html', {'pedidos': pedidos})
+    pedidos = pedidos_con_detalle().filter(usuario=request.user).order_by('-fecha_pedido', '-id')
+    page_obj = Paginator(pedidos, PEDIDOS_POR_PAGINA).get_page(request.GET.get('page'))
+    return render(request, 'pedidos/pedido_list.html', {
+        'pedidos': page_obj.object_list,
+        'page_obj': page_obj,
+    })
 
 @login_required
 def pedido_create(request):
     if request.method == 'POST':
         # Obtener productos, cantidades y dirección
         productos_ids = request.POST.getlist('productos')
-        cantidades = request.POST.getlist('cantidades')
         direccion_id = request.POST.get('direccion')
-        
-        if productos_ids and cantidades and direccion_id:
+        # Cada producto tiene su propio campo cantidad_<id>
+        cantidades = {
+            prod_id: request.POST.get(f'cantidad_{prod_id}') for prod_id in productos_ids
+        }
+        items, invalidos = normalizar_items(productos_ids, cantidades)
+
+        if invalidos:
+            messages.error(request, f"Indique una cantidad válida para {len(invalidos)} producto(s) seleccionado(s).")
+        elif items and direccion_id:
             try:
                 direccion = Direccion.objects.get(id=direccion_id, usuario=request.user)
-                pedido = Pedido.objects.create(usuario=request.user, direccion=direccion, total=0)
-                total = 0
-                for prod_id, cant in zip(productos_ids, cantidades):
-                    try:
-                        producto = Producto.objects.get(id=prod_id)
-                        cantidad = int(cant)
-                        if cantidad > 0 and producto.stock >= cantidad:
-                            PedidoProducto.objects.create(pedido=pedido, producto=producto, cantidad=cantidad)
-                            total += producto.precio * cantidad
-                            producto.stock -= cantidad
-                            producto.save()
-                    except (Producto.DoesNotExist, ValueError):
-                        pass
-                pedido.total = total
-                pedido.save()
-                return redirect('pedido_list')
+                pedido, omitidos = crear_pedido(request.user, direccion, items)
+                if omitidos:
+                    messages.warning(request, f"{len(omitidos)} producto(s) no se agregaron (inexistentes o sin stock suficiente).")
+                if pedido:
+                    return redirect('pedido_list')
             except Direccion.DoesNotExist:
                 pass
     productos = Producto.objects.all()
@@ -109,18 +125,15 @@ def pedido_create(request):
 
 @login_required
 def pedido_detail(request, pk):
-    pedido = get_object_or_404(Pedido, pk=pk, usuario=request.user)
+    pedido = get_object_or_404(pedidos_con_detalle(), pk=pk, usuario=request.user)
     return render(request, 'pedidos/pedido_detail.html', {'pedido': pedido})
 
 @login_required
 def pedido_delete(request, pk):
     pedido = get_object_or_404(Pedido, pk=pk, usuario=request.user)
     if request.method == 'POST':
-        # Restaurar stock
-        for pp in pedido.pedidoproducto_set.all():
-            pp.producto.stock += pp.cantidad
-            pp.producto.save()
-        pedido.delete()
+        # Restaurar stock y eliminar el pedido en una sola transacción
+        cancelar_pedido(pedido)
         return redirect('pedido_list')
     return render(request, 'pedidos/pedido_confirm_delete.html', {'pedido': pedido})
 